@@ -1,10 +1,13 @@
-import json
+import asyncio
 import os
-from typing import Optional
+import re
+from typing import List, Optional
 
 from pydantic import BaseModel
 
-from services.llm_client import chat_json, resolve_llm_settings
+from services.llm_client import achat_json, chat_json, resolve_llm_settings
+from services.master_resume import get_master_resume
+from utils.relevance import mentioned_terms
 
 # --- Schema ---
 class JobAssessment(BaseModel):
@@ -12,35 +15,132 @@ class JobAssessment(BaseModel):
     is_suitable: bool
     reasoning: str
 
-def assess_job_suitability(
-    jd_text,
-    master_json_path,
-    llm_settings: Optional[dict] = None,
-):
+class BatchJobAssessment(JobAssessment):
+    job_id: int
+
+class BatchAssessment(BaseModel):
+    assessments: List[BatchJobAssessment]
+
+# Default number of JDs scored per LLM call by assess_jobs_batch
+FILTER_BATCH_SIZE = 5
+
+# --- Local Pre-Filter ---
+# Deterministic version of the system prompt's obvious cases, so clear rejects
+# and clear accepts never cost an LLM call.
+SENIOR_TITLE_RE = re.compile(
+    r"\b(senior|sr\.?|principal|staff|architect|vp|vice president|director|head of)\b",
+    re.IGNORECASE,
+)
+JUNIOR_TITLE_RE = re.compile(
+    r"\b(intern|internship|junior|jr\.?|entry[- ]level|new grad(uate)?|graduate|associate|early career)\b",
+    re.IGNORECASE,
+)
+# Years *required* of the candidate: "at least 5 years", "minimum of 3-5 years", "5+ years",
+# "4 years of professional experience" ... followed by "experience" in the same sentence.
+# Bare "20 years of experience" is usually the company talking about itself.
+YEARS_RE = re.compile(
+    r"(?:"
+    r"\b(?:at least|minimum(?: of)?|min\.?|requires?|required|must have)\s+(\d{1,2})\s*\+?\s*"
+    r"(?:(?:-|–|to)\s*\d{1,2}\s*)?(?:years?|yrs?)\b"
+    r"|\b(\d{1,2})\s*\+\s*(?:years?|yrs?)\b"
+    r"|\b(\d{1,2})\s*(?:(?:-|–|to)\s*\d{1,2}\s*)?(?:years?|yrs?)\s+of\s+(?:professional|relevant|industry|work|hands-on)\b"
+    r")[^.\n]{0,40}?\bexperience",
+    re.IGNORECASE,
+)
+# Requirement stated after the experience: "5 years of experience required"
+YEARS_REQUIRED_AFTER_RE = re.compile(
+    r"\b(\d{1,2})\s*\+?\s*(?:(?:-|–|to)\s*\d{1,2}\s*)?(?:years?|yrs?)\b[^.\n]{0,40}?\bexperience\b"
+    r"[^.\n]{0,15}?\b(?:required|needed|a must)\b",
+    re.IGNORECASE,
+)
+# Company-tenure wording just before a years match ("we have 20+ years", "our firm has
+# over 15 years", "for over 10 years"); anything else counts as a requirement
+COMPANY_YEARS_PREFIX_RE = re.compile(
+    r"\b(?:we(?:'ve|\s+have|\s+bring)|our\s+(?:company|firm|team|agency)\s+(?:has|have|brings))\b[^.!?\n]{0,15}$"
+    r"|\bfor\s+(?:over|more than)\s*$",
+    re.IGNORECASE,
+)
+# Any years figure at all; a local accept needs every one of them to be small
+ANY_YEARS_RE = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:(?:-|–|to)\s*\d{1,2}\s*)?(?:years?|yrs?)\b", re.IGNORECASE)
+FOREIGN_STACK_RE = re.compile(
+    r"\b(rust|embedded c|cobol|salesforce|apex|firmware|fpga|verilog|vhdl|abap|mainframe)\b",
+    re.IGNORECASE,
+)
+# Specialised domains the LLM is told to weigh (rule 3); a local accept never skips them
+SPECIALIZED_DOMAIN_RE = re.compile(
+    r"\b(quantitative|trading algorithms?|hft|medical devices?|clinical|actuarial|avionics|"
+    r"safety[- ]critical|semiconductor|bioinformatics|computational chemistry)\b",
+    re.IGNORECASE,
+)
+PREFILTER_MAX_YEARS = 5
+PREFILTER_ACCEPT_OVERLAP = 3
+PREFILTER_ACCEPT_MAX_YEARS = 2
+
+def load_candidate_skills(master_json_path):
+    """Lower-cased skill and project technology names from the master resume."""
+    return get_master_resume(master_json_path).skills
+
+def required_years(jd_text):
+    """Largest lower bound of the 'N years ... experience' requirements in a JD, or None."""
+    jd_text = jd_text or ""
+    years = []
+    for pattern in (YEARS_RE, YEARS_REQUIRED_AFTER_RE):
+        for match in pattern.finditer(jd_text):
+            if COMPANY_YEARS_PREFIX_RE.search(jd_text[max(0, match.start() - 30):match.start()]):
+                continue
+            years.append(int(next(group for group in match.groups() if group)))
+    return max(years) if years else None
+
+def mentioned_years(jd_text):
+    """Largest years figure anywhere in a JD (requirement or not), or None."""
+    years = [int(n) for n in ANY_YEARS_RE.findall(jd_text or "")]
+    return max(years) if years else None
+
+def stack_overlap(jd_text, skills):
+    """Candidate skills mentioned in the JD (whole-word, case-insensitive)."""
+    return mentioned_terms(jd_text, skills)
+
+def prefilter_job(jd_text, skills, title="") -> Optional[JobAssessment]:
     """
-    Evaluates if the candidate is realistically qualified for the job.
-    Uses gpt-4o-mini to save costs on high-volume filtering.
+    Rule-based verdict for obvious cases, or None when the LLM should decide.
+    Rejects senior titles, 5+ year requirements and foreign stacks with no overlap;
+    accepts junior titles with strong stack overlap, no years figure above 2 anywhere
+    in the JD and no specialised domain. Conflicting signals (e.g. a junior title asking for
+    5+ years) are borderline and go to the LLM.
     """
-    
-    settings = resolve_llm_settings(llm_settings)
-    if settings["provider"] == "openai" and not os.environ.get("OPENAI_API_KEY") and not settings.get("api_key"):
-        print("   ⚠️ No OpenAI Key found. Skipping Assessment.")
-        return JobAssessment(match_score=0, is_suitable=False, reasoning="Missing API Key")
+    title = title or (jd_text or "")[:120]
+    years = required_years(jd_text)
+    overlap = stack_overlap(jd_text, skills)
+    foreign = FOREIGN_STACK_RE.search(jd_text or "")
+    junior = JUNIOR_TITLE_RE.search(title)
 
-    with open(master_json_path, 'r') as f:
-        resume_data = json.load(f)
-        
-    # Extract just the skills and latest role for a cheaper token count
-    candidate_profile = {
-        "skills": resume_data.get("skills", {}),
-        "experience_summary": [
-            f"{job['position']} at {job['company']}" for job in resume_data.get("experience", [])
-        ],
-        # Ideally, calculate this dynamically, but hardcoded is fine for now
-        "years_experience": "Entry Level / Junior (approx 1-2 years including internships)" 
-    }
+    if SENIOR_TITLE_RE.search(title) and not junior:
+        return JobAssessment(match_score=20, is_suitable=False, reasoning=f"Pre-filter: senior title ({title.strip()[:60]})")
+    if years is not None and years >= PREFILTER_MAX_YEARS and not junior:
+        return JobAssessment(match_score=20, is_suitable=False, reasoning=f"Pre-filter: requires {years}+ years")
+    if foreign and not overlap:
+        return JobAssessment(match_score=15, is_suitable=False, reasoning=f"Pre-filter: {foreign.group(1)} stack with no skill overlap")
+    if (
+        junior
+        and not foreign
+        and not SPECIALIZED_DOMAIN_RE.search(jd_text or "")
+        and len(overlap) >= PREFILTER_ACCEPT_OVERLAP
+        and (mentioned_years(jd_text) or 0) <= PREFILTER_ACCEPT_MAX_YEARS
+    ):
+        return JobAssessment(
+            match_score=min(90, 60 + 5 * len(overlap)),
+            is_suitable=True,
+            reasoning=f"Pre-filter: junior role matching {', '.join(sorted(overlap))}",
+        )
+    return None
 
-    print("   ⚖️  Assessing suitability (via gpt-4o-mini)...")
+def _missing_openai_key(llm_settings):
+    settings = resolve_llm_settings(llm_settings)
+    return settings["provider"] == "openai" and not os.environ.get("OPENAI_API_KEY") and not settings.get("api_key")
+
+def _build_profile_and_system_prompt(master_json_path):
+    # Profile JSON is pre-serialized once per master resume version
+    profile_json = get_master_resume(master_json_path).profile_json
 
     system_prompt = """
     You are a Career Coach. Evaluate if a Candidate is a reasonable match for a Job Description.
@@ -56,16 +156,82 @@ def assess_job_suitability(
     Return a score (0-100) and a boolean 'is_suitable'. 
     Set 'is_suitable' to True ONLY if the score is >= 60.
     """
+    return profile_json, system_prompt
+
+def _build_prompts(jd_text, master_json_path):
+    profile_json, system_prompt = _build_profile_and_system_prompt(master_json_path)
 
     user_prompt = f"""
     CANDIDATE PROFILE:
-    {json.dumps(candidate_profile)}
+    {profile_json}
 
     JOB DESCRIPTION:
     {jd_text[:3000]}
     """
 
     system_prompt += "\nReturn ONLY valid JSON with no extra commentary."
+    return system_prompt, user_prompt
+
+def _build_batch_prompts(jd_texts, master_json_path):
+    """One candidate profile, K numbered job descriptions."""
+    profile_json, system_prompt = _build_profile_and_system_prompt(master_json_path)
+
+    system_prompt += """
+    You will receive several numbered JOB DESCRIPTIONS. Assess each one independently
+    against the same candidate and return one entry per job in 'assessments',
+    with 'job_id' set to the job's number.
+    """
+    jobs_block = "\n".join(
+        f"""
+    JOB {i}:
+    {jd_text[:3000]}
+    """
+        for i, jd_text in enumerate(jd_texts)
+    )
+    user_prompt = f"""
+    CANDIDATE PROFILE:
+    {profile_json}
+
+    JOB DESCRIPTIONS:
+    {jobs_block}
+    """
+
+    system_prompt += "\nReturn ONLY valid JSON with no extra commentary."
+    return system_prompt, user_prompt
+
+def _batch_results(result, count):
+    """Maps the model's answers back onto input order; ids it skipped come back as None."""
+    by_id = {}
+    for entry in BatchAssessment(**result).assessments:
+        if 0 <= entry.job_id < count:
+            by_id[entry.job_id] = JobAssessment(
+                match_score=entry.match_score,
+                is_suitable=entry.is_suitable,
+                reasoning=entry.reasoning,
+            )
+    return [by_id.get(i) for i in range(count)]
+
+def _chunks(items, size):
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def assess_job_suitability(
+    jd_text,
+    master_json_path,
+    llm_settings: Optional[dict] = None,
+):
+    """
+    Evaluates if the candidate is realistically qualified for the job.
+    Uses gpt-4o-mini to save costs on high-volume filtering.
+    """
+    
+    if _missing_openai_key(llm_settings):
+        print("   ⚠️ No OpenAI Key found. Skipping Assessment.")
+        return JobAssessment(match_score=0, is_suitable=False, reasoning="Missing API Key")
+
+    system_prompt, user_prompt = _build_prompts(jd_text, master_json_path)
+    print("   ⚖️  Assessing suitability (via gpt-4o-mini)...")
 
     try:
         result = chat_json(
@@ -80,6 +246,106 @@ def assess_job_suitability(
         # Default to False (Safety)
         return JobAssessment(match_score=0, is_suitable=False, reasoning=f"Error: {e}")
 
+async def aassess_job_suitability(
+    jd_text,
+    master_json_path,
+    llm_settings: Optional[dict] = None,
+):
+    """Async version of assess_job_suitability for the workflow's event loop."""
+    if _missing_openai_key(llm_settings):
+        print("   ⚠️ No OpenAI Key found. Skipping Assessment.")
+        return JobAssessment(match_score=0, is_suitable=False, reasoning="Missing API Key")
+
+    system_prompt, user_prompt = _build_prompts(jd_text, master_json_path)
+    print("   ⚖️  Assessing suitability (via gpt-4o-mini)...")
+
+    try:
+        result = await achat_json(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            llm_settings=llm_settings,
+            schema=JobAssessment,
+        )
+        return JobAssessment(**result)
+    except Exception as e:
+        print(f"   ❌ Filter Agent Failed: {e}")
+        # Default to False (Safety)
+        return JobAssessment(match_score=0, is_suitable=False, reasoning=f"Error: {e}")
+
+def assess_jobs_batch(
+    jd_texts,
+    master_json_path,
+    llm_settings: Optional[dict] = None,
+    batch_size: int = FILTER_BATCH_SIZE,
+) -> List[JobAssessment]:
+    """
+    Scores several job descriptions with one LLM call per `batch_size` JDs,
+    sending the candidate profile once per call instead of once per job.
+    Returns assessments in input order. Jobs the model left out of its answer
+    are re-assessed individually.
+    """
+    jd_texts = list(jd_texts)
+    if not jd_texts:
+        return []
+    if _missing_openai_key(llm_settings):
+        print("   ⚠️ No OpenAI Key found. Skipping Assessment.")
+        return [JobAssessment(match_score=0, is_suitable=False, reasoning="Missing API Key") for _ in jd_texts]
+
+    assessments = []
+    for chunk in _chunks(jd_texts, batch_size):
+        print(f"   ⚖️  Assessing suitability of {len(chunk)} jobs in one call...")
+        try:
+            system_prompt, user_prompt = _build_batch_prompts(chunk, master_json_path)
+            result = chat_json(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                llm_settings=llm_settings,
+                schema=BatchAssessment,
+            )
+            results = _batch_results(result, len(chunk))
+        except Exception as e:
+            print(f"   ❌ Batch assessment failed, falling back to single calls: {e}")
+            results = [None] * len(chunk)
+        for jd_text, assessment in zip(chunk, results):
+            assessments.append(assessment or assess_job_suitability(jd_text, master_json_path, llm_settings))
+    return assessments
+
+async def aassess_jobs_batch(
+    jd_texts,
+    master_json_path,
+    llm_settings: Optional[dict] = None,
+    batch_size: int = FILTER_BATCH_SIZE,
+) -> List[JobAssessment]:
+    """Async version of assess_jobs_batch; chunks are scored concurrently."""
+    jd_texts = list(jd_texts)
+    if not jd_texts:
+        return []
+    if _missing_openai_key(llm_settings):
+        print("   ⚠️ No OpenAI Key found. Skipping Assessment.")
+        return [JobAssessment(match_score=0, is_suitable=False, reasoning="Missing API Key") for _ in jd_texts]
+
+    async def assess_chunk(chunk):
+        print(f"   ⚖️  Assessing suitability of {len(chunk)} jobs in one call...")
+        try:
+            system_prompt, user_prompt = _build_batch_prompts(chunk, master_json_path)
+            result = await achat_json(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                llm_settings=llm_settings,
+                schema=BatchAssessment,
+            )
+            results = _batch_results(result, len(chunk))
+        except Exception as e:
+            print(f"   ❌ Batch assessment failed, falling back to single calls: {e}")
+            results = [None] * len(chunk)
+        return [
+            assessment or await aassess_job_suitability(jd_text, master_json_path, llm_settings)
+            for jd_text, assessment in zip(chunk, results)
+        ]
+
+    chunk_results = await asyncio.gather(*(assess_chunk(chunk) for chunk in _chunks(jd_texts, batch_size)))
+    return [assessment for chunk in chunk_results for assessment in chunk]
+
 if __name__ == "__main__":
     # Test Block
     import sys
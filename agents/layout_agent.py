@@ -1,20 +1,19 @@
 import json
-import os
+import math
+import fitz  # PyMuPDF
 from jinja2 import Environment, FileSystemLoader
-from playwright.async_api import async_playwright
 
-async def render_resume(json_path, output_pdf_path, scale=1.0):
-    """
-    Renders PDF with a specific scaling factor.
-    scale=1.0 : Standard (10pt font, 0.5in margin)
-    scale=0.9 : Compact (9pt font, 0.45in margin)
-    """
-    
-    # 1. Load Data
-    with open(json_path, 'r') as f:
-        resume_data = json.load(f)
+from services.browser_pool import open_page
+
+# US Letter, in CSS pixels (96 px per inch)
+PAGE_WIDTH_IN = 8.5
+PAGE_HEIGHT_IN = 11.0
+PX_PER_IN = 96
 
-    # 2. Calculate Dynamic Styles
+# Leave a little room for Chromium's print pagination differing from screen layout
+FIT_SLACK = 0.98
+
+def _build_css_context(scale):
     # Base values
     base_body = 10.0
     base_header = 24.0
@@ -23,45 +22,97 @@ async def render_resume(json_path, output_pdf_path, scale=1.0):
     base_line_height = 1.4
 
     # Apply Scale
-    css_context = {
+    return {
         "margin": f"{base_margin * scale:.2f}in",
         "body_font": f"{base_body * scale:.1f}pt",
         "header_font": f"{base_header * scale:.1f}pt",
         "sub_font": f"{base_sub * scale:.1f}pt",
         "line_height": f"{base_line_height * (scale if scale < 1 else 1.0):.2f}" # Shrink spacing too
     }
-    
-    print(f"   📐 Rendering with Scale {scale} (Font: {css_context['body_font']}, Margin: {css_context['margin']})...")
 
-    # 3. Setup Jinja2
+def _render_html(resume_data, scale):
     env = Environment(loader=FileSystemLoader('templates'))
     template = env.get_template('resume.html')
+    css_context = _build_css_context(scale)
+    return template.render(resume=resume_data, style=css_context), css_context
+
+def _printable_area_px(css_context):
+    margin_in = float(css_context["margin"].rstrip("in"))
+    width = (PAGE_WIDTH_IN - 2 * margin_in) * PX_PER_IN
+    height = (PAGE_HEIGHT_IN - 2 * margin_in) * PX_PER_IN
+    return width, height
+
+async def _write_pdf(page, output_pdf_path, css_context):
+    margin = css_context["margin"]
+    await page.pdf(
+        path=output_pdf_path,
+        format="Letter",
+        print_background=True,
+        margin={"top": margin, "bottom": margin, "left": margin, "right": margin}
+    )
+
+async def _measure(page, resume_data, scale):
+    """Lays the resume out at `scale` in the live page and returns (content_px, printable_px)."""
+    html_content, css_context = _render_html(resume_data, scale)
+    width, height = _printable_area_px(css_context)
+    await page.set_viewport_size({"width": int(width), "height": int(height)})
+    await page.set_content(html_content)
+    content_height = await page.evaluate("document.body.scrollHeight")
+    return content_height, height
+
+async def fit_resume(
+    json_path,
+    output_pdf_path,
+    browser_pool=None,
+    min_scale=0.8,
+    max_scale=1.0,
+    tolerance=0.01,
+):
+    """
+    Finds the largest scale in [min_scale, max_scale] whose content fits on one page
+    by measuring the live layout (no PDF per attempt), then prints exactly one PDF.
+    Returns {"scale", "page_count", "measurements"}.
+    """
+    with open(json_path, 'r') as f:
+        resume_data = json.load(f)
+
+    measurements = 0
+
+    async with open_page(browser_pool) as page:
+        await page.emulate_media(media="print")
+
+        async def fits(scale):
+            nonlocal measurements
+            measurements += 1
+            content_height, printable_height = await _measure(page, resume_data, scale)
+            return content_height <= printable_height * FIT_SLACK, content_height / printable_height
+
+        fit_at_max, ratio = await fits(max_scale)
+        if fit_at_max:
+            best = max_scale
+        else:
+            fit_at_min, _ = await fits(min_scale)
+            if not fit_at_min:
+                best = min_scale
+            else:
+                # Binary search; the first probe is the proportional estimate from the overflow
+                lo, hi = min_scale, max_scale
+                probe = min(max(max_scale / ratio, lo + tolerance), hi - tolerance)
+                while hi - lo > tolerance:
+                    if (await fits(probe))[0]:
+                        lo = probe
+                    else:
+                        hi = probe
+                    probe = (lo + hi) / 2
+                best = lo
+
+        best = math.floor(best * 1000) / 1000  # never round up past a measured fit
+        html_content, css_context = _render_html(resume_data, best)
+        print(f"   📐 Rendering with Scale {best} (Font: {css_context['body_font']}, Margin: {css_context['margin']})...")
+        await page.set_content(html_content)
+        await _write_pdf(page, output_pdf_path, css_context)
+
+    with fitz.open(output_pdf_path) as doc:
+        page_count = len(doc)
 
-    # 4. Render HTML
-    html_content = template.render(resume=resume_data, style=css_context)
-    
-    temp_html_path = os.path.abspath(f"temp_resume_{scale}.html")
-    with open(temp_html_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    # 5. Playwright Rendering
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
-        await page.goto(f"file:///{temp_html_path}")
-        
-        await page.pdf(
-            path=output_pdf_path, 
-            format="Letter", 
-            print_background=True, 
-            margin={
-                "top": css_context["margin"],
-                "bottom": css_context["margin"],
-                "left": css_context["margin"],
-                "right": css_context["margin"]
-            }
-        )
-        await browser.close()
-
-    if os.path.exists(temp_html_path):
-        os.remove(temp_html_path)
\ No newline at end of file
+    return {"scale": best, "page_count": page_count, "measurements": measurements}
@@ -1,10 +1,13 @@
 import fitz  # PyMuPDF
 import os
-from typing import Optional
+import re
+from typing import Optional, Union
 
 from pydantic import BaseModel
 
-from services.llm_client import chat_json, resolve_llm_settings
+from services.llm_client import achat_json, chat_json, resolve_llm_settings
+from services.master_resume import get_master_resume
+from utils.relevance import mentioned_terms
 
 # --- 1. Define Schema ---
 class Critique(BaseModel):
@@ -12,23 +15,20 @@ class Critique(BaseModel):
     missing_keywords: list[str]
     feedback: str
 
-def proofread_resume(
-    pdf_path: str,
-    job_description: str,
-    llm_settings: Optional[dict] = None,
-) -> dict:
-    print(f"🧐 Proofreading {pdf_path}...")
+def _skipped_result():
+    print("   ⚠️ No OpenAI Key found. Skipping Semantic Check.")
+    return {
+        "length_passed": True,
+        "content_passed": True,
+        "feedback": "Skipped (No API Key)",
+        "page_count": 0,
+    }
 
+def _missing_openai_key(llm_settings):
     settings = resolve_llm_settings(llm_settings)
-    if settings["provider"] == "openai" and not os.environ.get("OPENAI_API_KEY") and not settings.get("api_key"):
-        print("   ⚠️ No OpenAI Key found. Skipping Semantic Check.")
-        return {
-            "length_passed": True,
-            "content_passed": True,
-            "feedback": "Skipped (No API Key)",
-            "page_count": 0,
-        }
+    return settings["provider"] == "openai" and not os.environ.get("OPENAI_API_KEY") and not settings.get("api_key")
 
+def _read_pdf(pdf_path):
     # --- 1. PHYSICAL CHECK (Length Only) ---
     doc = fitz.open(pdf_path)
     num_pages = len(doc)
@@ -42,7 +42,139 @@ def proofread_resume(
         print(f"   ⚠️ Length Alert: Resume is {num_pages} pages.")
     else:
         print("   ✅ Length OK: 1 page.")
+    return text_content, num_pages, length_passed
+
+def resume_to_text(resume):
+    """Plain text of a tailored resume dict, in the same order the PDF template prints it."""
+    basics = resume.get("basics") or {}
+    lines = [
+        basics.get("name", ""),
+        " | ".join(str(basics.get(key, "")) for key in ("location", "email", "phone", "linkedin", "github")),
+        "EXPERIENCE",
+    ]
+    for job in resume.get("experience") or []:
+        lines.append(f"{job.get('position', '')}  {job.get('startDate', '')} – {job.get('endDate', '')}")
+        lines.append(f"{job.get('company', '')}  {job.get('location') or ''}")
+        lines.extend(f"• {bullet}" for bullet in job.get("bullets") or [])
+    lines.append("PROJECTS")
+    for project in resume.get("projects") or []:
+        lines.append(f"{project.get('name', '')}  {' | '.join(project.get('technologies') or [])}")
+        lines.extend(f"• {bullet}" for bullet in project.get("bullets") or [])
+    lines.append("EDUCATION")
+    for school in resume.get("education") or []:
+        lines.append(f"{school.get('institution', '')}  {school.get('startDate', '')} – {school.get('endDate', '')}")
+        lines.append(f"{school.get('studyType', '')} in {school.get('area', '')}")
+        if school.get("courses"):
+            lines.append(f"Coursework: {', '.join(school['courses'])}")
+    skills = resume.get("skills") or {}
+    lines.append("SKILLS")
+    lines.append(f"Languages: {', '.join(skills.get('languages') or [])}")
+    lines.append(f"Web Dev: {', '.join(skills.get('frameworks') or [])}")
+    lines.append(f"DevOps & Tools: {', '.join(skills.get('tools') or [])}")
+    return "\n".join(lines)
+
+def _resume_content(resume, page_count=None):
+    """
+    (text, num_pages, length_passed) for either a tailored resume dict or a PDF path.
+    For dicts the page count comes from the layout step, when known.
+    """
+    if isinstance(resume, dict):
+        length_passed = page_count is None or page_count == 1
+        return resume_to_text(resume), page_count or 0, length_passed
+    return _read_pdf(resume)
+
+# --- Local (deterministic) checks ---
+DATE_RE = re.compile(r"^((Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) \d{4}|Present)$")
+# "5,000+", "30%", "2.5x", "12" ... compared without thousands separators
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+MIN_KEYWORD_COVERAGE = 0.6
+MIN_SECTION_ENTRIES = 3
+
+def _numbers(text):
+    return {match.replace(",", "") for match in NUMBER_RE.findall(str(text or ""))}
+
+def _entry_key(section, entry):
+    # Several roles can share a company, so experience is matched on the role too
+    fields = ("company", "position", "startDate") if section == "experience" else ("name",)
+    return tuple(str(entry.get(field) or "").strip().lower() for field in fields)
+
+def local_checks(resume, job_description, reference_resume, candidate_skills=()):
+    """
+    Mechanical rules verified without an LLM:
+    bullet counts per entry vs. the master (tailor rule 2), metrics kept,
+    section sizes (rules 4/5), "Mon YYYY" dates and coverage of the JD skills
+    the candidate actually has. Returns (violations, missing_keywords, coverage).
+    """
+    violations = []
+    for section in ("experience", "projects"):
+        entries = resume.get(section) or []
+        tailored = {_entry_key(section, entry): entry for entry in entries}
+        # Reformatted start dates shouldn't hide a role; fall back to a unique company + position match
+        by_role = {}
+        for entry in entries:
+            by_role.setdefault(_entry_key(section, entry)[:2], []).append(entry)
+        reference_entries = reference_resume.get(section) or []
 
+        required = min(MIN_SECTION_ENTRIES, len(reference_entries))
+        if len(entries) < required:
+            violations.append(f"Include at least {required} {section} entries (found {len(entries)}).")
+
+        for ref in reference_entries:
+            entry = tailored.get(_entry_key(section, ref))
+            if entry is None and len(by_role.get(_entry_key(section, ref)[:2], [])) == 1:
+                entry = by_role[_entry_key(section, ref)[:2]][0]
+            if entry is None:
+                continue
+            label = " - ".join(filter(None, (ref.get("company"), ref.get("position")))) or ref.get("name")
+            ref_bullets = ref.get("bullets") or []
+            bullets = entry.get("bullets") or []
+            if len(bullets) < len(ref_bullets):
+                violations.append(f"'{label}' needs at least {len(ref_bullets)} bullet points (has {len(bullets)}).")
+            lost = _numbers(" ".join(ref_bullets)) - _numbers(" ".join(bullets))
+            if lost:
+                violations.append(f"'{label}' dropped metrics: {', '.join(sorted(lost))}.")
+
+    for section in ("experience", "education"):
+        # Dates copied verbatim from the master are the candidate's own format; leave them be
+        master_dates = {
+            str(entry.get(field, "")) for entry in reference_resume.get(section) or [] for field in ("startDate", "endDate")
+        }
+        for entry in resume.get(section) or []:
+            for field in ("startDate", "endDate"):
+                value = str(entry.get(field, ""))
+                if not DATE_RE.match(value) and value not in master_dates:
+                    violations.append(f"Date '{value}' should look like 'Sep 2024' or 'Present'.")
+
+    jd_skills = mentioned_terms(job_description, candidate_skills)
+    missing = sorted(jd_skills - mentioned_terms(resume_to_text(resume), jd_skills))
+    coverage = (1 - len(missing) / len(jd_skills)) if jd_skills else None
+    if coverage is not None and coverage < MIN_KEYWORD_COVERAGE:
+        violations.append(f"Mention these JD skills the candidate has: {', '.join(missing)}.")
+    return violations, missing, coverage
+
+def _local_verdict(resume, job_description, master_resume, reference_resume, length_passed, num_pages):
+    """
+    Audit result decided locally, or None to escalate to the LLM.
+    Only mechanical violations are decided here (they fail immediately); a clean
+    draft still goes to the LLM for the semantic and grammar audit.
+    """
+    if master_resume is None or not isinstance(resume, dict):
+        return None
+    master_resume = get_master_resume(master_resume)
+    violations, _, _ = local_checks(
+        resume, job_description, reference_resume or master_resume.data, master_resume.skills
+    )
+    if violations:
+        print(f"   ⚡ Local proofread failed ({len(violations)} issue(s)); skipping LLM audit.")
+        return {
+            "length_passed": length_passed,
+            "content_passed": False,
+            "feedback": " ".join(violations),
+            "page_count": num_pages,
+        }
+    return None
+
+def _build_prompts(job_description, text_content):
     # --- 2. SEMANTIC CHECK (Content Only) ---
     system_prompt = """
     You are an expert Resume Auditor. 
@@ -67,6 +199,55 @@ def proofread_resume(
     """
 
     system_prompt += "\nReturn ONLY valid JSON with no extra commentary."
+    return system_prompt, user_prompt
+
+def _audit_result(result, length_passed, num_pages):
+    return {
+        "length_passed": length_passed,
+        "content_passed": result["content_passed"],
+        "feedback": result["feedback"],
+        "page_count": num_pages,
+    }
+
+def _audit_error(e, length_passed, num_pages):
+    print(f"   ❌ Semantic Check Failed: {e}")
+    # Fallback to passing content if AI fails, so we don't lose the PDF
+    return {
+        "length_passed": length_passed,
+        "content_passed": True, 
+        "feedback": f"AI Error: {e}",
+        "page_count": num_pages,
+    }
+
+def proofread_resume(
+    resume: Union[dict, str],
+    job_description: str,
+    llm_settings: Optional[dict] = None,
+    status_callback=None,
+    stream: bool = False,
+    page_count: Optional[int] = None,
+    master_resume=None,
+    reference_resume: Optional[dict] = None,
+) -> dict:
+    """
+    Audits a tailored resume against the JD. `resume` is the tailored dict
+    (preferred: no PDF needed, so it can run alongside rendering) or a PDF path.
+    `page_count` comes from the layout step when auditing a dict.
+    With `master_resume` (path or MasterResume), mechanical rules are checked
+    locally first against `reference_resume` (the master sections the tailor
+    saw; defaults to the whole master) and only ambiguous drafts reach the LLM.
+    """
+    print("🧐 Proofreading tailored resume..." if isinstance(resume, dict) else f"🧐 Proofreading {resume}...")
+
+    text_content, num_pages, length_passed = _resume_content(resume, page_count)
+    verdict = _local_verdict(resume, job_description, master_resume, reference_resume, length_passed, num_pages)
+    if verdict is not None:
+        return verdict
+
+    if _missing_openai_key(llm_settings):
+        return _skipped_result()
+
+    system_prompt, user_prompt = _build_prompts(job_description, text_content)
 
     try:
         result = chat_json(
@@ -74,23 +255,46 @@ def proofread_resume(
             user_prompt=user_prompt,
             llm_settings=llm_settings,
             schema=Critique,
+            stream_callback=status_callback if stream else None,
         )
+        return _audit_result(result, length_passed, num_pages)
+    except Exception as e:
+        return _audit_error(e, length_passed, num_pages)
 
-        return {
-            "length_passed": length_passed,
-            "content_passed": result["content_passed"],
-            "feedback": result["feedback"],
-            "page_count": num_pages,
-        }
+async def aproofread_resume(
+    resume: Union[dict, str],
+    job_description: str,
+    llm_settings: Optional[dict] = None,
+    status_callback=None,
+    stream: bool = False,
+    page_count: Optional[int] = None,
+    master_resume=None,
+    reference_resume: Optional[dict] = None,
+) -> dict:
+    """Async version of proofread_resume for the workflow's event loop."""
+    print("🧐 Proofreading tailored resume..." if isinstance(resume, dict) else f"🧐 Proofreading {resume}...")
+
+    text_content, num_pages, length_passed = _resume_content(resume, page_count)
+    verdict = _local_verdict(resume, job_description, master_resume, reference_resume, length_passed, num_pages)
+    if verdict is not None:
+        return verdict
+
+    if _missing_openai_key(llm_settings):
+        return _skipped_result()
+
+    system_prompt, user_prompt = _build_prompts(job_description, text_content)
+
+    try:
+        result = await achat_json(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            llm_settings=llm_settings,
+            schema=Critique,
+            stream_callback=status_callback if stream else None,
+        )
+        return _audit_result(result, length_passed, num_pages)
     except Exception as e:
-        print(f"   ❌ Semantic Check Failed: {e}")
-        # Fallback to passing content if AI fails, so we don't lose the PDF
-        return {
-            "length_passed": length_passed,
-            "content_passed": True, 
-            "feedback": f"AI Error: {e}",
-            "page_count": num_pages,
-        }
+        return _audit_error(e, length_passed, num_pages)
 
 if __name__ == "__main__":
     # Test Block
@@ -1,21 +1,294 @@
+import asyncio
 import pandas as pd
 import re
 import json
+import hashlib
+import os
+import time
+import weakref
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+import httpx
+from bs4 import BeautifulSoup
 from jobspy import scrape_jobs
-from playwright.async_api import async_playwright
 
-async def fetch_job_page_data(url):
+from services.browser_pool import open_page
+from services.page_cache import get_page_cache
+from utils.rate_limiter import site_for_url, site_rate_limiter
+from utils.url_utils import canonical_job_url
+
+# Upper bound on concurrent jobspy scrapes (one per site x job type)
+SCRAPE_WORKERS = 4
+
+# ScrapeSession: results fetched per bulk scrape, and where windows are cached
+SCRAPE_WINDOW = 50
+SCRAPE_CACHE_DIR = ".scrape_cache"
+SCRAPE_CACHE_MAX_AGE_DAYS = 2
+# search_jobs kwargs that change what a scrape returns (part of the cache key)
+SCRAPE_FILTER_KEYS = ("is_remote", "job_type", "distance", "fetch_full_desc", "blacklist")
+
+# Scraped descriptions shorter than this are usually login walls / stubs
+MIN_DESCRIPTION_CHARS = 100
+MAX_DESCRIPTION_CHARS = 5000
+
+SCRAPE_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Static HTML fast path for job pages (pooled HTTP client, one per event loop)
+PAGE_HTTP_TIMEOUT = 10.0
+PAGE_HTTP_CONNECTIONS = 10
+_page_http_clients = weakref.WeakKeyDictionary()
+
+# Browser tier: only these resource types load; images, fonts, media, CSS etc. are aborted
+ALLOWED_RESOURCE_TYPES = ("document",)
+# Per-site additions for boards that render the posting client-side; override via
+# scrape_config["resource_allowlist"], e.g. {"linkedin": ["script", "xhr"]}.
+# LinkedIn keeps its scripts: the browser tier only runs when the static HTML fell
+# short, and a script-less render of the same page rarely gets any further.
+SITE_RESOURCE_ALLOWLIST = {
+    "linkedin": ("script",),
+    "indeed": ("script", "xhr", "fetch"),
+    "glassdoor": ("script", "xhr", "fetch"),
+    "zip_recruiter": ("script", "xhr", "fetch"),
+}
+# Trackers / ad networks aborted whatever their resource type
+BLOCKED_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "facebook.com/tr", "hotjar.com", "segment.io", "segment.com",
+    "scorecardresearch.com", "bat.bing.com", "clarity.ms", "ads.linkedin.com",
+    "snap.licdn.com", "nr-data.net", "newrelic.com", "optimizely.com", "quantserve.com",
+    "criteo.com", "criteo.net", "adsrvr.org", "demdex.net", "omtrdc.net",
+)
+
+
+class ResourcePolicy:
+    """Decides which sub-resources a scraping browser context may load, per site."""
+
+    def __init__(self, allowlist=None, blocked_domains=BLOCKED_DOMAINS):
+        self.allowlist = {site: tuple(types) for site, types in SITE_RESOURCE_ALLOWLIST.items()}
+        self.blocked_domains = tuple(blocked_domains)
+        if allowlist:
+            self.configure(allowlist)
+
+    def configure(self, allowlist):
+        """Overrides per-site allowed resource types, e.g. {"linkedin": ["script", "xhr"]}."""
+        for site, types in (allowlist or {}).items():
+            self.allowlist[site] = tuple(types)
+
+    def allows(self, site, resource_type, url) -> bool:
+        url = url.lower()
+        if any(domain in url for domain in self.blocked_domains):
+            return False
+        return resource_type in ALLOWED_RESOURCE_TYPES or resource_type in self.allowlist.get(site, ())
+
+
+# Shared by every scraping context; run_daily_workflow applies profile overrides
+scrape_resource_policy = ResourcePolicy()
+
+
+class PageFetchStats:
+    """
+    Counts which tier resolved each job page (cache, static HTTP, headless
+    browser, or neither) and the network cost of every live load.
+    """
+
+    TIERS = ("cache", "http", "browser", "incomplete")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = dict.fromkeys(self.TIERS, 0)
+        # (url, tier, bytes, load seconds, blocked requests) per live fetch
+        self.loads = []
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, data, url=None):
+        tier = data.get("tier") if page_data_complete(data) else "incomplete"
+        self.counts[tier if tier in self.counts else "incomplete"] += 1
+        if "bytes" in data:
+            self.loads.append((
+                url, data.get("tier"), data["bytes"], data.get("load_seconds", 0.0), data.get("blocked_requests", 0),
+            ))
+
+    def hit_rates(self) -> dict:
+        total = self.total
+        return {tier: (count / total if total else 0.0) for tier, count in self.counts.items()}
+
+    def summary(self) -> str:
+        rates = self.hit_rates()
+        parts = ", ".join(f"{tier} {self.counts[tier]} ({rates[tier]:.0%})" for tier in self.TIERS)
+        return f"{parts} of {self.total} page(s)"
+
+    def load_summary(self) -> str:
+        parts = []
+        for tier in ("http", "browser"):
+            loads = [load for load in self.loads if load[1] == tier]
+            if not loads:
+                continue
+            avg_kb = sum(load[2] for load in loads) / len(loads) / 1024
+            avg_secs = sum(load[3] for load in loads) / len(loads)
+            blocked = sum(load[4] for load in loads)
+            part = f"{tier} avg {avg_kb:.0f} KB / {avg_secs:.2f}s over {len(loads)} load(s)"
+            if blocked:
+                part += f", {blocked} request(s) blocked"
+            parts.append(part)
+        return "; ".join(parts)
+
+
+# Run-wide tier counts; run_daily_workflow resets and reports them
+page_fetch_stats = PageFetchStats()
+
+
+def page_data_complete(data) -> bool:
+    """Title, company and a real description (not a login wall / stub)."""
+    return bool(
+        data.get("title")
+        and data.get("company")
+        and len(data.get("description") or "") >= MIN_DESCRIPTION_CHARS
+    )
+
+
+def _apply_job_posting(structured_data, data):
+    # Sometimes it's a list, sometimes a dict
+    if isinstance(structured_data, list):
+        structured_data = structured_data[0] if structured_data else {}
+    if not isinstance(structured_data, dict):
+        return
+
+    # Extract Clean Data
+    if "title" in structured_data:
+        data["title"] = structured_data["title"]
+
+    if "hiringOrganization" in structured_data:
+        org = structured_data["hiringOrganization"]
+        if isinstance(org, dict):
+            data["company"] = org.get("name")
+        elif isinstance(org, str):
+            data["company"] = org
+
+
+def _apply_page_title(raw_title, data):
+    # Pattern: "Company hiring Role in Location | LinkedIn"
+    match = re.search(r"(.*?) hiring (.*?) in (.*?) \| LinkedIn", raw_title)
+    if match:
+        data["company"] = match.group(1).strip() # BCforward
+        data["title"] = match.group(2).strip()   # Software Engineer
+
+    # Pattern: "Role at Company | LinkedIn"
+    elif " at " in raw_title:
+        parts = raw_title.split(" at ")
+        data["title"] = parts[0].strip()
+        if len(parts) > 1:
+            data["company"] = parts[1].replace("| LinkedIn", "").strip()
+
+
+def parse_job_html(html):
+    """
+    Extracts title/company/description from raw job page HTML, using the same
+    strategies as the browser path: JSON-LD, then the <title> string, with the
+    description from `.description__text` (or the JSON-LD description).
+    """
     data = {"description": "", "title": None, "company": None}
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    soup = BeautifulSoup(html, "lxml")
+
+    posting_description = ""
+    script = soup.find("script", attrs={"type": "application/ld+json"})
+    if script is not None:
+        try:
+            structured_data = json.loads(script.string or script.get_text())
+            _apply_job_posting(structured_data, data)
+            if isinstance(structured_data, dict):
+                posting_description = structured_data.get("description") or ""
+        except (ValueError, TypeError, IndexError):
+            pass
+
+    if (not data["title"] or not data["company"]) and soup.title is not None:
+        _apply_page_title(soup.title.get_text(strip=True), data)
+
+    container = soup.select_one(".description__text")
+    if container is not None:
+        data["description"] = container.get_text("\n", strip=True)
+    elif posting_description:
+        # JSON-LD descriptions are HTML fragments
+        data["description"] = BeautifulSoup(posting_description, "lxml").get_text("\n", strip=True)
+    return data
+
+
+def _page_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _page_http_clients:
+        _page_http_clients[loop] = httpx.AsyncClient(
+            headers={"User-Agent": SCRAPE_USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+            follow_redirects=True,
+            timeout=PAGE_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=PAGE_HTTP_CONNECTIONS, max_keepalive_connections=PAGE_HTTP_CONNECTIONS
+            ),
         )
-        page = await context.new_page()
+    return _page_http_clients[loop]
+
+
+async def close_page_http_client():
+    """Closes the pooled page client of the running loop (call at the end of a run)."""
+    client = _page_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _fetch_static_page(url):
+    """Tier 1: plain GET + HTML parsing, no browser."""
+    try:
+        started = time.monotonic()
+        response = await _page_http_client().get(url)
+        metrics = {
+            "status": response.status_code,
+            "bytes": response.num_bytes_downloaded or len(response.content),
+            "load_seconds": time.monotonic() - started,
+        }
+        if response.status_code != 200:
+            return {"description": "", "title": None, "company": None, **metrics}
+        return {**parse_job_html(response.text), **metrics}
+    except httpx.HTTPError as e:
+        print(f"   ⚠️ Static fetch failed: {e}")
+        return {"description": "", "title": None, "company": None, "status": None}
+
 
+async def _fetch_rendered_page(url, browser_pool=None):
+    """
+    Tier 2: headless Chromium for pages whose static HTML is incomplete.
+    Sub-resources outside the site's allowlist are aborted; transferred bytes,
+    load time and blocked requests are recorded on the result.
+    """
+    data = {"description": "", "title": None, "company": None, "status": None}
+    site = site_for_url(url)
+    blocked = 0
+    sizes = []
+
+    async def _route(route):
+        nonlocal blocked
+        request = route.request
+        if scrape_resource_policy.allows(site, request.resource_type, request.url):
+            await route.continue_()
+        else:
+            blocked += 1
+            await route.abort()
+
+    def _finished(request):
+        sizes.append(asyncio.ensure_future(request.sizes()))
+
+    async with open_page(browser_pool, user_agent=SCRAPE_USER_AGENT) as page:
+        await page.context.route("**/*", _route)
+        page.on("requestfinished", _finished)
+        started = time.monotonic()
         try:
-            await page.goto(url, timeout=15000, wait_until="domcontentloaded")
+            response = await page.goto(url, timeout=15000, wait_until="domcontentloaded")
+            data["load_seconds"] = time.monotonic() - started
+            if response is not None:
+                data["status"] = response.status
             
             # --- STRATEGY 1: HIDDEN JSON DATA (Gold Standard) ---
             # LinkedIn often embeds a JSON object for SEO. We can parse this directly.
@@ -24,23 +297,7 @@ async def fetch_job_page_data(url):
                 json_handle = await page.query_selector('script[type="application/ld+json"]')
                 if json_handle:
                     json_content = await json_handle.inner_text()
-                    structured_data = json.loads(json_content)
-                    
-                    # Sometimes it's a list, sometimes a dict
-                    if isinstance(structured_data, list):
-                        structured_data = structured_data[0]
-
-                    # Extract Clean Data
-                    if "title" in structured_data:
-                        data["title"] = structured_data["title"]
-                    
-                    if "hiringOrganization" in structured_data:
-                        org = structured_data["hiringOrganization"]
-                        if isinstance(org, dict):
-                            data["company"] = org.get("name")
-                        elif isinstance(org, str):
-                            data["company"] = org
-                            
+                    _apply_job_posting(json.loads(json_content), data)
                     print(f"   ✨ Extracted via JSON: {data['title']} @ {data['company']}")
             except Exception as e:
                 print(f"   ❌ JSON extraction failed: {e}")
@@ -50,19 +307,7 @@ async def fetch_job_page_data(url):
             # --- STRATEGY 2: PAGE TITLE REGEX (Fallback) ---
             # If JSON failed, try to parse the messy title string
             if not data["title"] or not data["company"]:
-                raw_title = await page.title()
-                # Pattern: "Company hiring Role in Location | LinkedIn"
-                match = re.search(r"(.*?) hiring (.*?) in (.*?) \| LinkedIn", raw_title)
-                if match:
-                    data["company"] = match.group(1).strip() # BCforward
-                    data["title"] = match.group(2).strip()   # Software Engineer
-                
-                # Pattern: "Role at Company | LinkedIn"
-                elif " at " in raw_title:
-                    parts = raw_title.split(" at ")
-                    data["title"] = parts[0].strip()
-                    if len(parts) > 1:
-                        data["company"] = parts[1].replace("| LinkedIn", "").strip()
+                _apply_page_title(await page.title(), data)
 
             # --- GET DESCRIPTION ---
             try:
@@ -75,13 +320,106 @@ async def fetch_job_page_data(url):
 
         except Exception as e:
             print(f"   ⚠️ Scraping Error: {e}")
-            
-        await browser.close()
-        return data
 
-def search_jobs(role, location, num_results, offset=0, hours_old=72, sites=["linkedin"], **kwargs):
+        data.setdefault("load_seconds", time.monotonic() - started)
+        data["blocked_requests"] = blocked
+        data["bytes"] = sum(
+            size["requestHeadersSize"] + size["requestBodySize"] + size["responseHeadersSize"] + size["responseBodySize"]
+            for size in await asyncio.gather(*sizes, return_exceptions=True)
+            if isinstance(size, dict)
+        )
+
+    return data
+
+
+async def _fetch_live_page(url, browser_pool=None, static_first=True):
+    # Politeness delay per site, one token per URL whichever tiers it takes;
+    # only sleeps when this site's budget is spent
+    await site_rate_limiter.wait(site_for_url(url))
+    static_data = None
+    if static_first:
+        static_data = await _fetch_static_page(url)
+        if page_data_complete(static_data):
+            static_data["tier"] = "http"
+            return static_data
+
+    data = await _fetch_rendered_page(url, browser_pool=browser_pool)
+    if static_data:
+        # Keep whatever the static page did provide
+        for key in ("title", "company", "status"):
+            data[key] = data.get(key) or static_data.get(key)
+        if len(static_data.get("description") or "") > len(data.get("description") or ""):
+            data["description"] = static_data["description"]
+        # The static attempt's traffic counts towards this page too
+        for key in ("bytes", "load_seconds"):
+            if key in static_data:
+                data[key] = data.get(key, 0) + static_data[key]
+    data["tier"] = "browser"
+    return data
+
+
+async def fetch_job_page_data(url, browser_pool=None, static_first=True):
+    """
+    Tiered job page fetch. The on-disk page cache (keyed by canonical job URL)
+    is consulted first; then the static HTML (pooled HTTP GET), which usually
+    carries the JSON-LD, <title> and description already; Chromium is only
+    started when it doesn't. The result's "tier" says which one produced it.
+    Incomplete results are cached too, so known-bad pages aren't refetched
+    until their (shorter) negative TTL runs out.
+    """
+    cache = get_page_cache()
+    cache_key = canonical_job_url(url)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            cached["tier"] = "cache"
+            page_fetch_stats.record(cached)
+            return cached
+
+    data = await _fetch_live_page(url, browser_pool=browser_pool, static_first=static_first)
+    page_fetch_stats.record(data, url=url)
+    if cache is not None:
+        cache.set(cache_key, data, ok=page_data_complete(data))
+    return data
+
+@lru_cache(maxsize=32)
+def _blacklist_pattern(words):
+    words = [re.escape(word) for word in words if word]
+    return re.compile("|".join(words), re.IGNORECASE) if words else None
+
+def filter_scraped_jobs(all_jobs_df, blacklist=()):
+    """
+    Drops blacklisted titles and short descriptions with vectorized pandas ops
+    and returns the remaining jobs as dicts (title, company, url, description).
+    """
+    if all_jobs_df.empty:
+        return []
+
+    df = all_jobs_df.reindex(columns=["title", "company", "job_url", "description"])
+    titles = df["title"].fillna("").astype(str)
+    descriptions = df["description"].fillna("").astype(str)
+
+    keep = descriptions.str.len() > MIN_DESCRIPTION_CHARS
+    pattern = _blacklist_pattern(tuple(blacklist or ()))
+    if pattern is not None:
+        blacklisted = titles.str.contains(pattern, na=False)
+        for title in titles[blacklisted]:
+            print(f"   🗑️  Filtered Blacklisted Job: {title}")
+        keep &= ~blacklisted
+
+    valid = pd.DataFrame({
+        "title": titles[keep],
+        "company": df["company"][keep].fillna("").astype(str),
+        "url": df["job_url"][keep],
+        "description": descriptions[keep].str.slice(0, MAX_DESCRIPTION_CHARS),
+    })
+    return valid.to_dict("records")
+
+def search_jobs(role, location, num_results, offset=0, hours_old=72, sites=["linkedin"], failed_sites=None, **kwargs):
     """
     Enhanced search that handles multiple Job Types by running parallel scrapes.
+    failed_sites: optional set that receives every site whose scrape raised,
+                  so callers can tell partial results from complete ones.
     """
     print(f"🕵️  JobSpy Hunting (Offset {offset})...")
     
@@ -101,56 +439,165 @@ def search_jobs(role, location, num_results, offset=0, hours_old=72, sites=["lin
 
     print(f"    Params: Remote={is_remote} | Types={job_types_to_check} | Dist={distance}m")
 
-    all_jobs_df = pd.DataFrame()
+    # --- FAN OUT: one scrape per (site, job type) ---
+    tasks = [(site, j_type) for j_type in job_types_to_check for site in sites]
+    max_workers = max(1, min(kwargs.get('scrape_workers', SCRAPE_WORKERS), len(tasks) or 1))
 
-    # --- LOOP THROUGH EACH JOB TYPE ---
-    for j_type in job_types_to_check:
-        print(f"    🔎 Scanning for: {j_type}...")
-        try:
-            current_scrape: pd.DataFrame = scrape_jobs(
-                site_name=sites,
-                search_term=role,
-                location=location,
-                results_wanted=num_results, 
-                offset=offset,
-                hours_old=hours_old,
-                country_urlpatterns={"Global": "https://www.indeed.com"},
-                
-                is_remote=is_remote,
-                job_type=j_type, 
-                distance=distance,
-                linkedin_fetch_description=fetch_desc
-            )
+    def scrape_one(site, j_type):
+        site_rate_limiter.acquire(site)
+        print(f"    🔎 Scanning {site} for: {j_type}...")
+        started = time.monotonic()
+        result = scrape_jobs(
+            site_name=[site],
+            search_term=role,
+            location=location,
+            results_wanted=num_results, 
+            offset=offset,
+            hours_old=hours_old,
+            country_urlpatterns={"Global": "https://www.indeed.com"},
             
-            if not current_scrape.empty:
-                all_jobs_df = pd.concat([all_jobs_df, current_scrape], ignore_index=True)
-                
-        except Exception as e:
-            print(f"    ❌ Failed searching for {j_type}: {e}")
-            continue
+            is_remote=is_remote,
+            job_type=j_type, 
+            distance=distance,
+            linkedin_fetch_description=fetch_desc
+        )
+        return result, time.monotonic() - started
+
+    frames = []
+    site_timings = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(scrape_one, site, j_type): (site, j_type) for site, j_type in tasks}
+        for future in as_completed(futures):
+            site, j_type = futures[future]
+            try:
+                current_scrape, elapsed = future.result()
+            except Exception as e:
+                # One failing site / type must not cost the others their results
+                print(f"    ❌ Failed searching {site} for {j_type}: {e}")
+                if failed_sites is not None:
+                    failed_sites.add(site)
+                continue
+            site_timings[site] = site_timings.get(site, 0.0) + elapsed
+            if current_scrape is not None and not current_scrape.empty:
+                frames.append(current_scrape)
+
+    if site_timings:
+        timings = ", ".join(f"{site} {secs:.1f}s" for site, secs in sorted(site_timings.items()))
+        print(f"    ⏱️  Scrape time per site: {timings}")
+
+    # Concatenate once instead of growing the frame inside the loop
+    all_jobs_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
     if not all_jobs_df.empty:
         all_jobs_df = all_jobs_df.drop_duplicates(subset=['job_url'])
 
     print(f"   🔎 Found {len(all_jobs_df)} jobs total.")
 
-    valid_jobs = []
-    for index, row in all_jobs_df.iterrows():
-        title = str(row.get('title', ''))
-        company = str(row.get('company', ''))
-        desc = row.get('description', '')
-        url = row.get('job_url', '')
-        
-        if any(bad_word.lower() in title.lower() for bad_word in blacklist):
-            print(f"   🗑️  Filtered Blacklisted Job: {title}")
-            continue
-            
-        if desc and len(str(desc)) > 100:
-            valid_jobs.append({
-                "title": title,
-                "company": company,
-                "url": url,
-                "description": str(desc)[:5000]
-            })
-
-    return valid_jobs
\ No newline at end of file
+    return filter_scraped_jobs(all_jobs_df, blacklist)
+
+class ScrapeSession:
+    """
+    Serves search_jobs results in small batches from bulk fetches.
+
+    Instead of one scrape per 5-job batch (with overlapping pages), each fetch
+    pulls `window` results at once. Windows are cached on disk under a key of
+    (role, location, sites, filters, hours_old, date), so a re-run on the same
+    day replays them without touching the job sites. URLs already served in
+    this session are skipped.
+    """
+
+    def __init__(self, role, location, hours_old=72, sites=("linkedin",), window=SCRAPE_WINDOW,
+                 cache_dir=SCRAPE_CACHE_DIR, **search_kwargs):
+        self.role = role
+        self.location = location
+        self.hours_old = hours_old
+        self.sites = list(sites)
+        self.window = max(1, int(window))
+        self.search_kwargs = search_kwargs
+        self.fetches = 0
+        self.cache_hits = 0
+        self.exhausted = False
+        self.served = 0
+        self._buffer = []
+        self._seen = set()
+        self._next_offset = 0
+        self.cache_path = None
+        self._windows = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            _prune_scrape_cache(cache_dir)
+            self.cache_path = os.path.join(cache_dir, f"{self.key}.json")
+            self._windows = self._load()
+
+    @property
+    def key(self):
+        filters = {name: self.search_kwargs.get(name) for name in SCRAPE_FILTER_KEYS}
+        payload = json.dumps(
+            [self.role, self.location, sorted(self.sites), filters, self.hours_old,
+             self.window, datetime.now().strftime("%Y-%m-%d")],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._windows, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _fill(self):
+        offset = str(self._next_offset)
+        if offset in self._windows:
+            jobs = self._windows[offset]
+            self.cache_hits += 1
+            print(f"   🗃️  Scrape window {offset}-{self._next_offset + self.window} served from cache.")
+        else:
+            failed_sites = set()
+            jobs = search_jobs(
+                self.role,
+                self.location,
+                num_results=self.window,
+                offset=self._next_offset,
+                hours_old=self.hours_old,
+                sites=self.sites,
+                failed_sites=failed_sites,
+                **self.search_kwargs,
+            )
+            self.fetches += 1
+            # Only complete windows are replayable; a blocked site or an empty page
+            # must not be pinned for the rest of the day
+            if self.cache_path and jobs and not failed_sites:
+                self._windows[offset] = jobs
+                self._save()
+        self._next_offset += self.window
+        if not jobs:
+            self.exhausted = True
+        for job in jobs:
+            if job["url"] not in self._seen:
+                self._seen.add(job["url"])
+                self._buffer.append(dict(job))
+
+    def next_batch(self, size):
+        """Up to `size` unseen jobs; an empty list means the search is exhausted."""
+        while len(self._buffer) < size and not self.exhausted:
+            self._fill()
+        batch, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.served += len(batch)
+        return batch
+
+def _prune_scrape_cache(cache_dir):
+    cutoff = time.time() - SCRAPE_CACHE_MAX_AGE_DAYS * 86400
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            if name.endswith(".json") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
@@ -1,11 +1,14 @@
 import datetime
 import json
 import os
-from typing import List, Optional
+import re
+from typing import List, Optional, Union
 
 from pydantic import BaseModel
 
-from services.llm_client import chat_json
+from services.llm_client import achat_json, chat_json
+from services.master_resume import MasterResume, get_master_resume, tokenize
+from utils.relevance import BM25, estimate_tokens
 
 # --- 1. Define Schema ---
 class Education(BaseModel):
@@ -52,6 +55,14 @@ class Resume(BaseModel):
     experience: List[WorkExperience]
     projects: List[Project]
 
+class ResumePatch(BaseModel):
+    """Only the sections a retry changed; null/omitted sections stay as they were."""
+    basics: Optional[Basics] = None
+    education: Optional[List[Education]] = None
+    skills: Optional[Skills] = None
+    experience: Optional[List[WorkExperience]] = None
+    projects: Optional[List[Project]] = None
+
 # --- Helper: Format Date ---
 def format_date(date_str):
     """Converts YYYY-MM to Sep 2024 format"""
@@ -63,21 +74,20 @@ def format_date(date_str):
     except ValueError:
         return date_str # Return original if parse fails
 
-# --- 2. The Tailor Agent ---
-def tailor_resume(
-    master_json_path: str,
-    job_description: str,
-    feedback: str = "",
-    llm_settings: Optional[dict] = None,
-) -> dict:
-
-    with open(master_json_path, 'r') as f:
-        master_resume_data = json.load(f)
+# --- 2. Prompt Slimming ---
+# Master resume JSON allowed in the tailor prompt (estimated tokens); 0 sends it whole
+TAILOR_TOKEN_BUDGET = 2500
+TAILOR_JD_CHAR_LIMIT = 6000
+# The system prompt asks for at least 3 experiences / projects, so always offer that many
+MIN_ENTRIES_PER_SECTION = 3
+MIN_BULLETS_PER_ENTRY = 2
+_METRIC_RE = re.compile(r"\d")
 
-    print("🧵 Tailoring resume (Strict Bullet Count Enforcement)...")
+# Master resume entries the tailor prompt singles out; always sent, whatever the token budget
+PINNED_ENTRY_NAMES = ("Ekings Multimedia",)
+_PINNED_LABEL = " / ".join(f'"{name}"' for name in PINNED_ENTRY_NAMES)
 
-    # --- UPDATED SYSTEM PROMPT ---
-    system_prompt = """
+TAILOR_SYSTEM_PROMPT = f"""
     You are an expert Resume Editor.
     
     CRITICAL RULES:
@@ -93,8 +103,105 @@ def tailor_resume(
     5. PROJECTS: Select at least 3 most relevant projects.
     6. DATE FORMAT: Keep dates in YYYY-MM format in the JSON (we will format them later).
     
-    Check the Master Resume specifically for the "Ekings Multimedia" job. It contains metrics about "5,000+ visitors" and "30% engagement". You MUST include these in the output.
+    Check the Master Resume specifically for the {_PINNED_LABEL} job. It contains metrics about "5,000+ visitors" and "30% engagement". You MUST include these in the output.
+    """
+
+def _resume_subset(data, keep, dropped_bullets):
+    slim = dict(data)
+    for section in ("experience", "projects"):
+        entries = []
+        for index, entry in enumerate(data.get(section) or []):
+            if index not in keep[section]:
+                continue
+            if dropped_bullets:
+                entry = {**entry, "bullets": [
+                    bullet for i, bullet in enumerate(entry.get("bullets") or [])
+                    if (section, index, i) not in dropped_bullets
+                ]}
+            entries.append(entry)
+        slim[section] = entries
+    return slim
+
+def select_relevant_resume(master_resume, job_description, token_budget=TAILOR_TOKEN_BUDGET):
+    """
+    Master resume trimmed to what matters for this JD, within `token_budget`.
+    Experience entries and projects are ranked with BM25 against the JD; the top 3
+    of each (and any in PINNED_ENTRY_NAMES) are always kept, others are added by
+    rank while they fit. If it is still too large, the weakest bullets without
+    metrics are dropped, never below 2 per entry.
     """
+    data = master_resume.data
+    if not token_budget or estimate_tokens(master_resume.prompt_json) <= token_budget:
+        return data
+
+    jd_tokens = tokenize(job_description)
+    entry_scores = BM25([entry["tokens"] for entry in master_resume.entries]).scores(jd_tokens)
+    ranked = sorted(zip(entry_scores, range(len(entry_scores))), key=lambda pair: -pair[0])
+
+    keep = {"experience": set(), "projects": set()}
+    pinned = {name.lower() for name in PINNED_ENTRY_NAMES}
+    for section in keep:
+        entries = data.get(section) or []
+        for index, entry in enumerate(entries):
+            name = entry.get("company") or entry.get("name")
+            if name and name.strip().lower() in pinned:
+                keep[section].add(index)
+    taken = {section: 0 for section in keep}
+    optional = []
+    for score, position in ranked:
+        entry = master_resume.entries[position]
+        if entry["index"] in keep[entry["section"]]:
+            continue
+        if taken[entry["section"]] < MIN_ENTRIES_PER_SECTION:
+            keep[entry["section"]].add(entry["index"])
+            taken[entry["section"]] += 1
+        else:
+            optional.append(entry)
+
+    slim = _resume_subset(data, keep, None)
+    for entry in optional:
+        keep[entry["section"]].add(entry["index"])
+        candidate = _resume_subset(data, keep, None)
+        if estimate_tokens(json.dumps(candidate)) > token_budget:
+            keep[entry["section"]].discard(entry["index"])
+            continue
+        slim = candidate
+
+    if estimate_tokens(json.dumps(slim)) > token_budget:
+        bullet_scores = BM25([bullet["tokens"] for bullet in master_resume.bullets]).scores(jd_tokens)
+        remaining = {}
+        for bullet in master_resume.bullets:
+            key = (bullet["section"], bullet["index"])
+            remaining[key] = remaining.get(key, 0) + 1
+        dropped = set()
+        for score, bullet in sorted(zip(bullet_scores, master_resume.bullets), key=lambda pair: pair[0]):
+            key = (bullet["section"], bullet["index"])
+            if (
+                bullet["index"] not in keep[bullet["section"]]
+                or _METRIC_RE.search(bullet["text"])
+                or remaining[key] <= MIN_BULLETS_PER_ENTRY
+            ):
+                continue
+            dropped.add((bullet["section"], bullet["index"], bullet["bullet"]))
+            remaining[key] -= 1
+            slim = _resume_subset(data, keep, dropped)
+            if estimate_tokens(json.dumps(slim)) <= token_budget:
+                break
+    return slim
+
+# --- 3. The Tailor Agent ---
+def _user_prompt(job_description, resume_json, feedback_instruction):
+    return f"""
+    TARGET JOB: {job_description}
+    MASTER RESUME: {resume_json}
+    
+    {feedback_instruction}
+    """
+
+def _build_prompts(master_json_path, job_description, feedback="", token_budget=TAILOR_TOKEN_BUDGET):
+    """Returns (system_prompt, user_prompt, (full_prompt_tokens, sent_prompt_tokens))."""
+    master_resume = get_master_resume(master_json_path)
+    system_prompt = TAILOR_SYSTEM_PROMPT
     
     feedback_instruction = ""
     if feedback:
@@ -102,20 +209,68 @@ def tailor_resume(
 
     system_prompt += "\nReturn ONLY valid JSON with no extra commentary."
 
-    user_prompt = f"""
-    TARGET JOB: {job_description}
-    MASTER RESUME: {json.dumps(master_resume_data)}
+    relevant = select_relevant_resume(master_resume, job_description, token_budget)
+    resume_json = master_resume.prompt_json if relevant is master_resume.data else json.dumps(relevant)
+    sent_description = job_description[:TAILOR_JD_CHAR_LIMIT] if token_budget else job_description
+
+    user_prompt = _user_prompt(sent_description, resume_json, feedback_instruction)
+    full_tokens = estimate_tokens(system_prompt) + estimate_tokens(
+        _user_prompt(job_description, master_resume.prompt_json, feedback_instruction)
+    )
+    sent_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+    return system_prompt, user_prompt, (full_tokens, sent_tokens)
+
+def _log_prompt_size(prompt_tokens, status_callback=None):
+    full_tokens, sent_tokens = prompt_tokens
+    msg = f"   ✂️  Tailor prompt: ~{full_tokens} → ~{sent_tokens} tokens"
+    print(msg)
+    if status_callback:
+        status_callback(msg)
+
+PATCH_SYSTEM_PROMPT = """
+    You are an expert Resume Editor revising a tailored resume that a reviewer rejected.
     
-    {feedback_instruction}
+    You receive the PREVIOUS RESUME (JSON), the REVIEWER FEEDBACK, the TARGET JOB and the
+    relevant parts of the MASTER RESUME (the only source of facts).
+    
+    Return ONLY the top-level sections you change (any of: basics, education, skills,
+    experience, projects). Each returned section REPLACES the previous one entirely, so
+    return the full section, not a fragment. Leave unchanged sections out.
+    
+    All rules of the original task still apply: never remove metrics, never reduce the
+    number of bullet points of a job or project, keep dates as they are.
     """
 
-    tailored_dict = chat_json(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        llm_settings=llm_settings,
-        schema=Resume,
-    )
+def _build_patch_prompts(master_json_path, previous_resume, job_description, feedback, token_budget=TAILOR_TOKEN_BUDGET):
+    master_resume = get_master_resume(master_json_path)
+    system_prompt = PATCH_SYSTEM_PROMPT + "\nReturn ONLY valid JSON with no extra commentary."
+    relevant = select_relevant_resume(master_resume, job_description, token_budget)
+    resume_json = master_resume.prompt_json if relevant is master_resume.data else json.dumps(relevant)
+    sent_description = job_description[:TAILOR_JD_CHAR_LIMIT] if token_budget else job_description
 
+    user_prompt = f"""
+    REVIEWER FEEDBACK: {feedback}
+    PREVIOUS RESUME: {json.dumps(previous_resume)}
+    TARGET JOB: {sent_description}
+    MASTER RESUME: {resume_json}
+    """
+    return system_prompt, user_prompt
+
+def apply_resume_patch(previous_resume, patch):
+    """Merges changed sections over the previous resume and re-validates the whole resume."""
+    merged = dict(previous_resume)
+    changed = [section for section, value in patch.items() if value is not None and section in Resume.model_fields]
+    for section in changed:
+        merged[section] = patch[section]
+    return Resume.model_validate(merged).model_dump(), changed
+
+def _log_patch(changed, status_callback=None):
+    msg = f"   🩹 Patched sections: {', '.join(changed) if changed else 'none'}"
+    print(msg)
+    if status_callback:
+        status_callback(msg)
+
+def _format_dates(tailored_dict):
     # --- Post-Processing: Fix Dates ---
     print("📅 Formatting dates...")
     for job in tailored_dict['experience']:
@@ -128,6 +283,108 @@ def tailor_resume(
 
     return tailored_dict
 
+def tailor_resume(
+    master_json_path: Union[str, MasterResume],
+    job_description: str,
+    feedback: str = "",
+    llm_settings: Optional[dict] = None,
+    token_budget: int = TAILOR_TOKEN_BUDGET,
+    status_callback=None,
+    stream: bool = False,
+) -> dict:
+
+    system_prompt, user_prompt, prompt_tokens = _build_prompts(master_json_path, job_description, feedback, token_budget)
+    _log_prompt_size(prompt_tokens, status_callback)
+    print("🧵 Tailoring resume (Strict Bullet Count Enforcement)...")
+
+    tailored_dict = chat_json(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        llm_settings=llm_settings,
+        schema=Resume,
+        # Streams progress to the run log and aborts early on schema violations
+        stream_callback=status_callback if stream else None,
+    )
+    return _format_dates(tailored_dict)
+
+async def atailor_resume(
+    master_json_path: Union[str, MasterResume],
+    job_description: str,
+    feedback: str = "",
+    llm_settings: Optional[dict] = None,
+    token_budget: int = TAILOR_TOKEN_BUDGET,
+    status_callback=None,
+    stream: bool = False,
+) -> dict:
+    """Async version of tailor_resume for the workflow's event loop."""
+    system_prompt, user_prompt, prompt_tokens = _build_prompts(master_json_path, job_description, feedback, token_budget)
+    _log_prompt_size(prompt_tokens, status_callback)
+    print("🧵 Tailoring resume (Strict Bullet Count Enforcement)...")
+
+    tailored_dict = await achat_json(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        llm_settings=llm_settings,
+        schema=Resume,
+        # Streams progress to the run log and aborts early on schema violations
+        stream_callback=status_callback if stream else None,
+    )
+    return _format_dates(tailored_dict)
+
+def retailor_resume(
+    previous_resume: dict,
+    master_json_path: Union[str, MasterResume],
+    job_description: str,
+    feedback: str,
+    llm_settings: Optional[dict] = None,
+    token_budget: int = TAILOR_TOKEN_BUDGET,
+    status_callback=None,
+    stream: bool = False,
+) -> dict:
+    """
+    Patch-mode retry: the LLM sees the rejected resume plus the feedback and
+    returns only the sections it changes, which are merged and validated.
+    Raises pydantic's ValidationError / StreamSchemaError if the merge is invalid.
+    """
+    system_prompt, user_prompt = _build_patch_prompts(master_json_path, previous_resume, job_description, feedback, token_budget)
+    print("🩹 Revising resume (patch mode)...")
+
+    patch = chat_json(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        llm_settings=llm_settings,
+        schema=ResumePatch,
+        stream_callback=status_callback if stream else None,
+    )
+    merged, changed = apply_resume_patch(previous_resume, patch)
+    _log_patch(changed, status_callback)
+    return _format_dates(merged)
+
+async def aretailor_resume(
+    previous_resume: dict,
+    master_json_path: Union[str, MasterResume],
+    job_description: str,
+    feedback: str,
+    llm_settings: Optional[dict] = None,
+    token_budget: int = TAILOR_TOKEN_BUDGET,
+    status_callback=None,
+    stream: bool = False,
+) -> dict:
+    """Async version of retailor_resume for the workflow's event loop."""
+    system_prompt, user_prompt = _build_patch_prompts(master_json_path, previous_resume, job_description, feedback, token_budget)
+    print("🩹 Revising resume (patch mode)...")
+
+    patch = await achat_json(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        llm_settings=llm_settings,
+        schema=ResumePatch,
+        stream_callback=status_callback if stream else None,
+    )
+    merged, changed = apply_resume_patch(previous_resume, patch)
+    _log_patch(changed, status_callback)
+    return _format_dates(merged)
+
 if __name__ == "__main__":
     # --- TEST BLOCK (Updates to support Config Manager) ---
     import sys
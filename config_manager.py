@@ -37,7 +37,32 @@ DEFAULT_CONFIG = {
     "enable_google": False,
     "enable_drive": False,
     "use_email": False,
-    "email_max_results": 10
+    "email_max_results": 10,
+    # Browser Pool
+    "browser_pool_size": 1,
+    "browser_contexts_per_browser": 4,
+    "browser_recycle_after": 50,
+    # Job Pipeline (workers per stage)
+    "pipeline_concurrency": {"scrape": 2, "filter": 2, "tailor": 1, "render": 1},
+    "pipeline_queue_size": 2,
+    "filter_batch_size": 5,
+    "filter_batch_wait": 2.0,
+    "local_prefilter": True,
+    "tailor_token_budget": 2500,
+    "llm_streaming": True,
+    "tailor_patch_mode": True,
+    "scrape_workers": 4,
+    "scrape_window": 50,
+    "scrape_cache": True,
+    "email_enrich_concurrency": 3,
+    # Per-site [requests per second, burst] overrides, e.g. {"linkedin": [0.5, 2]}
+    "rate_limits": {},
+    # Extra resource types the scraping browser may load per site, e.g. {"linkedin": ["script", "xhr"]}
+    "resource_allowlist": {},
+    # LLM response cache (filter / tailor / proofread)
+    "llm_cache": {"enabled": True, "ttl_hours": 72, "max_entries": 2000},
+    # Enriched job page cache (negative = failed / incomplete pages)
+    "page_cache": {"enabled": True, "ttl_hours": 168, "negative_ttl_hours": 12}
 }
 
 def get_effective_config(profile_path):
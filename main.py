@@ -1,82 +1,72 @@
 import os
 import csv
 import json
-import time
 import asyncio
 import argparse
-import re
-from datetime import timedelta, datetime
-import fitz  # PyMuPDF
+from datetime import datetime
+
+from pydantic import ValidationError
 
 # Agents
-from agents.search_agent import search_jobs, fetch_job_page_data 
-from agents.tailor_agent import tailor_resume
-from agents.layout_agent import render_resume
-from agents.proofread_agent import proofread_resume
-from agents.filter_agent import assess_job_suitability
+from agents.search_agent import SCRAPE_CACHE_DIR, SCRAPE_WINDOW, SCRAPE_WORKERS, ScrapeSession, close_page_http_client, fetch_job_page_data, page_fetch_stats, scrape_resource_policy
+from agents.tailor_agent import TAILOR_TOKEN_BUDGET, aretailor_resume, atailor_resume, select_relevant_resume
+from agents.layout_agent import fit_resume
+from agents.proofread_agent import aproofread_resume
+from agents.filter_agent import FILTER_BATCH_SIZE, aassess_jobs_batch, prefilter_job
 from services.notification.notification_agent import send_start_notification, send_summary_notification
 from services.notion_sync import sync_history_to_notion
-from services.llm_client import is_model_available, resolve_llm_settings
+from services.llm_client import close_async_llm_client, is_model_available, resolve_llm_settings
+from services.llm_stream import StreamSchemaError
 from services.google.drive_agent import upload_resume_to_drive
-from services.google.gmail_job_agent import fetch_job_urls_from_gmail
+from services.google.gmail_job_agent import enrich_jobs_with_page_data, fetch_job_urls_from_gmail, needs_page_data
+from services.browser_pool import BrowserPool
+from services.history_store import HistoryStore, DedupIndex, normalize_text
+from services.llm_cache import configure_llm_cache
+from services.page_cache import configure_page_cache
+from services.master_resume import MASTER_RESUME_FILE, get_master_resume
+from utils.async_pipeline import StagedPipeline
+from utils.rate_limiter import site_rate_limiter
 
 # --- CONFIGURATION ---
 BASE_OUTPUT_DIR = "output"
 BASE_LOG_DIR = "scraped_jobs"
-HISTORY_FILE = "history.json"
+HISTORY_FILE = "history.json"  # Legacy store, migrated into HISTORY_DB on first open
+HISTORY_DB = "history.db"
+DEDUP_WINDOW_DAYS = 60
+
+# Workers per pipeline stage (record is always 1); override via scrape_config["pipeline_concurrency"]
+DEFAULT_STAGE_CONCURRENCY = {"scrape": 2, "filter": 2, "tailor": 1, "render": 1}
 
 # --- HISTORY MANAGER ---
+_history_store = None
+
+def get_history_store():
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(HISTORY_DB, legacy_json_path=HISTORY_FILE)
+    return _history_store
+
 def load_history():
-    if not os.path.exists(HISTORY_FILE): 
-        return []
-    try:
-        with open(HISTORY_FILE, "r") as f: 
-            return json.load(f)
-    except Exception as e: 
-        print(f"   ❌ Failed to load history: {e}")
-        return []
-
-def normalize_text(text):
-    if not text: 
-        return ""
-    text = str(text) 
-    return re.sub(r'[^a-zA-Z0-9]', '', text).lower()
-
-def is_duplicate(job_url, title, company):
-    history = load_history()
-    norm_title = normalize_text(title)
-    norm_company = normalize_text(company)
-    sixty_days_ago = datetime.now() - timedelta(days=60)
-    
-    for entry in history:
-        if entry["url"] == job_url: 
-            return True
-        entry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-        if entry_date > sixty_days_ago:
-            hist_company = normalize_text(entry.get("company", ""))
-            hist_title = normalize_text(entry.get("title", ""))
-            if hist_company == norm_company and hist_title == norm_title:
-                return True
-    return False
-
-def save_to_history(job_url, title, company, status, drive_link=None, source=None):
-    history = load_history()
-    entry = {
-        "url": job_url,
-        "title": str(title),
-        "company": str(company),
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "status": status,
-        "drive_link": drive_link,
-        "source": source
-    }
-    history.append(entry)
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=4)
+    return get_history_store().all()
+
+def is_duplicate(job_url, title, company, dedup_index=None):
+    if dedup_index is not None:
+        return dedup_index.is_duplicate(job_url, title, company)
+    return get_history_store().is_duplicate(job_url, title, company, window_days=DEDUP_WINDOW_DAYS)
+
+def save_to_history(job_url, title, company, status, drive_link=None, source=None, dedup_index=None):
+    entry = get_history_store().add(job_url, title, company, status, drive_link=drive_link, source=source)
+    if dedup_index is not None:
+        dedup_index.add(job_url, title, company, date=entry["date"])
 
 def clear_history():
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump([], f, indent=4)
+    get_history_store().clear()
+
+def _discard_job_files(job):
+    for key in ("output_path", "tailored_json"):
+        path = job.get(key)
+        if path and os.path.exists(path):
+            os.remove(path)
 
 # --- LOGGING HELPER ---
 def log(msg, callback=None):
@@ -93,7 +83,7 @@ def _resolve_agent_settings(agent_key, base_settings, agent_models, model_api_ke
     return {"provider": provider, "model": model, "api_key": api_key}
 
 # --- SINGLE RESUME GENERATOR ---
-async def generate_resume_for_job(
+async def draft_resume_content(
     jd_text,
     master_json_path,
     output_filename,
@@ -101,56 +91,102 @@ async def generate_resume_for_job(
     tailor_settings=None,
     proofread_settings=None,
     llm_settings=None,
+    tailor_token_budget=TAILOR_TOKEN_BUDGET,
+    stream_llm=False,
+    patch_mode=True,
 ):
+    """
+    Phase 1: tailor + proofread until the content passes.
+    Returns the path of the approved tailored JSON, or None if every attempt failed.
+    With stream_llm, LLM progress goes to status_callback and a draft that breaks
+    the schema mid-generation is abandoned early and retried. With patch_mode,
+    retries after a proofread rejection only regenerate the changed sections.
+    """
     max_retries = 3
     current_feedback = ""
     active_tailor_settings = tailor_settings or llm_settings
     active_proofread_settings = proofread_settings or llm_settings
-    
-    # PHASE 1: CONTENT
+    temp_json = os.path.splitext(output_filename)[0] + "_tailored.json"
+    tailored_data = None
+    # The master sections the tailor is shown; local proofread checks compare against these
+    master_resume = get_master_resume(master_json_path)
+    reference_resume = select_relevant_resume(master_resume, jd_text, tailor_token_budget)
+
     for attempt in range(max_retries):
         log(f"   Drafting Content (Attempt {attempt+1})...", status_callback)
-        tailored_data = tailor_resume(
-            master_json_path,
-            jd_text,
-            feedback=current_feedback,
-            llm_settings=active_tailor_settings,
-        )
-        
-        temp_json = "temp_tailored.json"
-        with open(temp_json, "w") as f: 
-            json.dump(tailored_data, f, indent=4)
-            
-        await render_resume(temp_json, output_filename, scale=1.0)
-        audit = proofread_resume(
-            output_filename,
+        revised = None
+        if patch_mode and tailored_data is not None and current_feedback:
+            # Retry: only regenerate the sections the feedback touches
+            try:
+                revised = await aretailor_resume(
+                    tailored_data,
+                    master_json_path,
+                    jd_text,
+                    current_feedback,
+                    llm_settings=active_tailor_settings,
+                    token_budget=tailor_token_budget,
+                    status_callback=status_callback,
+                    stream=stream_llm,
+                )
+            except (StreamSchemaError, ValidationError) as e:
+                log(f"   ⚠️ Patch rejected ({e}); regenerating the full draft.", status_callback)
+
+        if revised is not None:
+            tailored_data = revised
+        else:
+            try:
+                tailored_data = await atailor_resume(
+                    master_json_path,
+                    jd_text,
+                    feedback=current_feedback,
+                    llm_settings=active_tailor_settings,
+                    token_budget=tailor_token_budget,
+                    status_callback=status_callback,
+                    stream=stream_llm,
+                )
+            except StreamSchemaError as e:
+                log(f"   ❌ Draft aborted early: {e}", status_callback)
+                current_feedback = f"Your previous output was not valid for the required JSON schema ({e})."
+                continue
+
+        # Audit the structured draft directly; page count is settled by the layout phase
+        audit = await aproofread_resume(
+            tailored_data,
             jd_text,
             llm_settings=active_proofread_settings,
+            status_callback=status_callback,
+            stream=stream_llm,
+            master_resume=master_resume,
+            reference_resume=reference_resume,
         )
-        
+
         if audit['content_passed']:
             log("   ✅ Content Approved.", status_callback)
-            break 
-        
+            with open(temp_json, "w") as f:
+                json.dump(tailored_data, f, indent=4)
+            return temp_json
+
         log(f"   ❌ Content Feedback: {audit['feedback']}", status_callback)
         current_feedback = audit['feedback']
-    else:
-        log("   ⛔ SKIPPING JOB: Content generation failed.", status_callback)
-        return False
 
-    # PHASE 2: LAYOUT
+    log("   ⛔ SKIPPING JOB: Content generation failed.", status_callback)
+    if os.path.exists(temp_json):
+        os.remove(temp_json)
+    return None
+
+async def layout_resume(tailored_json_path, output_filename, status_callback=None, browser_pool=None):
+    """
+    Phase 2: prints the approved content at the largest scale that fits one page.
+    Returns fit_resume's layout info; its page_count is the authoritative length check.
+    """
     log("   📏 Optimizing Layout...", status_callback)
-    for scale in [1.0, 0.95, 0.9, 0.85, 0.8]:
-        await render_resume(temp_json, output_filename, scale=scale)
-        doc = fitz.open(output_filename)
-        if len(doc) == 1:
-            log(f"   🎉 SUCCESS! Fits on 1 page (Scale {scale}).", status_callback)
-            doc.close()
-            return True
-        doc.close()
-            
-    log("   ⚠️ WARNING: Saved best effort (>1 page).", status_callback)
-    return True
+    layout = await fit_resume(tailored_json_path, output_filename, browser_pool=browser_pool)
+    if layout["page_count"] == 1:
+        log(f"   🎉 SUCCESS! Fits on 1 page (Scale {layout['scale']}, {layout['measurements']} layout checks).", status_callback)
+        return layout
+
+    log(f"   ⚠️ WARNING: Saved best effort ({layout['page_count']} pages).", status_callback)
+    return layout
 
 # --- THE WORKFLOW ---
 async def run_daily_workflow(
@@ -173,9 +209,11 @@ async def run_daily_workflow(
     
     success_count = 0
     total_checked = 0
-    current_offset = 0
     batch_size = 5
     processed_urls_session = set()
+    # (company, title) of jobs past the scrape stage but not yet in history; the pipeline
+    # runs several jobs at once, so the same posting from two sources could otherwise both pass
+    in_flight_postings = set()
     # Successful Jobs Data To Send in Notification
     successful_jobs_data = []
 
@@ -206,111 +244,185 @@ async def run_daily_workflow(
             )
             return
 
-    # --- MAIN LOOP ---
-    while success_count < target_successes:
-        if total_checked >= safety_limit:
-            log(f"\n🛑 SAFETY LIMIT REACHED ({total_checked} jobs). Stopping.", status_callback)
-            break
-
-        log(f"\n📡 Fetching batch (Offset {current_offset})...", status_callback)
-        
-        # ==========================================================
-        # 🚀 PARALLEL EXECUTION LOGIC
-        # ==========================================================
-        
-        # 1. Define the WEB Task (Runs every loop)
-        #    The Web Agent IS affected by the loop/target (it runs until we stop).
-        web_task = asyncio.to_thread(
-            search_jobs,
-            role, 
-            location, 
-            num_results=batch_size, 
-            offset=current_offset,
-            hours_old=scrape_config['hours_old'],
-            sites=scrape_config['sites'],
-            is_remote=scrape_config.get('is_remote'),
-            job_type=scrape_config.get('job_type'),
-            distance=scrape_config.get('distance'),
-            fetch_full_desc=scrape_config.get('fetch_full_desc')
-        )
+    # Per-site politeness budgets (replaces fixed sleeps between jobs/batches)
+    site_rate_limiter.configure(scrape_config.get('rate_limits'))
+    site_rate_limiter.reset_stats()
+    page_fetch_stats.reset()
+    scrape_resource_policy.configure(scrape_config.get('resource_allowlist'))
+
+    # Reuse identical LLM answers across runs (filter / tailor / proofread)
+    llm_cache_config = scrape_config.get('llm_cache') or {}
+    llm_cache = configure_llm_cache(
+        enabled=llm_cache_config.get('enabled', True),
+        ttl_hours=llm_cache_config.get('ttl_hours', 72),
+        max_entries=llm_cache_config.get('max_entries', 2000),
+    )
+    if llm_cache is not None:
+        llm_cache.reset_stats()
+
+    # Enriched job pages survive across runs (email alerts and scrapes resurface the same postings)
+    page_cache_config = scrape_config.get('page_cache') or {}
+    page_cache = configure_page_cache(
+        enabled=page_cache_config.get('enabled', True),
+        ttl_hours=page_cache_config.get('ttl_hours', 168),
+        negative_ttl_hours=page_cache_config.get('negative_ttl_hours', 12),
+    )
+    if page_cache is not None:
+        page_cache.reset_stats()
+
+    # Build the dedup index once; history writes below keep it current
+    dedup_index = DedupIndex.from_store(get_history_store(), window_days=DEDUP_WINDOW_DAYS)
+    log(f"   🗂️  Dedup index ready ({len(dedup_index)} known job URLs).", status_callback)
+
+    # Parse and pre-digest the master resume once; agents share this copy
+    try:
+        master_resume = get_master_resume(MASTER_RESUME_FILE)
+    except (OSError, json.JSONDecodeError) as e:
+        log(f"❌ Could not load {MASTER_RESUME_FILE}: {e}", status_callback)
+        return
+
+    filter_settings = _resolve_agent_settings("filter", base_settings, agent_models, model_api_keys)
+    tailor_settings = _resolve_agent_settings("tailor", base_settings, agent_models, model_api_keys)
+    proofread_settings = _resolve_agent_settings("proofread", base_settings, agent_models, model_api_keys)
+
+    # One browser pool for the whole run (rendering + deep scraping)
+    browser_pool = BrowserPool(
+        size=scrape_config.get('browser_pool_size', 1),
+        contexts_per_browser=scrape_config.get('browser_contexts_per_browser', 4),
+        recycle_after=scrape_config.get('browser_recycle_after', 50),
+    )
+    await browser_pool.start()
+
+    # One bulk scrape window serves many small batches (cached on disk for today)
+    scrape_session = ScrapeSession(
+        role,
+        location,
+        hours_old=scrape_config['hours_old'],
+        sites=scrape_config['sites'],
+        window=scrape_config.get('scrape_window', SCRAPE_WINDOW),
+        cache_dir=SCRAPE_CACHE_DIR if scrape_config.get('scrape_cache', True) else None,
+        is_remote=scrape_config.get('is_remote'),
+        job_type=scrape_config.get('job_type'),
+        distance=scrape_config.get('distance'),
+        fetch_full_desc=scrape_config.get('fetch_full_desc'),
+        blacklist=scrape_config.get('blacklist', []),
+        scrape_workers=scrape_config.get('scrape_workers', SCRAPE_WORKERS),
+    )
+
+    def job_log(job, msg):
+        # Stages run concurrently, so tag every line with the job number
+        log(f"[#{job['_n']}]{msg}", status_callback)
+
+    # ==========================================================
+    # 🚀 STAGE 0: JOB SOURCE (Email + Web batches)
+    # ==========================================================
+    async def job_source():
+        nonlocal total_checked
+        first_batch = True
+        while success_count < target_successes:
+            log(f"\n📡 Fetching batch (Offset {scrape_session.served})...", status_callback)
+
+            # 1. Define the WEB Task (Runs every loop)
+            #    Batches come out of the session's bulk-fetched (and disk-cached) window.
+            web_task = asyncio.to_thread(scrape_session.next_batch, batch_size)
+
+            # 2. Define the EMAIL Task (Runs ONLY on first loop)
+            use_email = scrape_config.get('use_email', False)
+            email_limit = scrape_config.get('email_max_results', 10)
+            if first_batch and use_email:
+                log(f"   📧 Email Scraper Active (Limit: {email_limit})", status_callback)
+                email_task = asyncio.to_thread(fetch_job_urls_from_gmail, max_results=email_limit)
+            else:
+                # On subsequent loops, return empty list instantly (don't check email again)
+                email_task = asyncio.create_task(asyncio.sleep(0, result=[]))
+
+            # 3. Execute Both Simultaneously
+            log("   ⏳ Waiting for Gmail and JobSpy...", status_callback)
+            web_results, email_results = await asyncio.gather(web_task, email_task)
+
+            # 4. Tag the Sources
+            # We manually add the 'Source' key here since the agents might not return it
+            for j in email_results: 
+                j['Source'] = 'Email'
+            for j in web_results:   
+                j['Source'] = 'Web'
+
+            # 5. Deep-scrape the email jobs together (bounded) on the shared browser pool,
+            #    so they reach the filter stage complete instead of one fetch at a time.
+            to_enrich = [
+                j for j in email_results
+                if needs_page_data(j)
+                and j['url'] not in processed_urls_session
+                and not is_duplicate(j['url'], j.get('title', ''), j.get('company', ''), dedup_index)
+            ]
+            if to_enrich:
+                enrich_concurrency = scrape_config.get('email_enrich_concurrency', 3)
+                log(f"   🔍 Enriching {len(to_enrich)} email job(s) (concurrency {enrich_concurrency})...", status_callback)
+                await enrich_jobs_with_page_data(
+                    to_enrich, concurrency=enrich_concurrency, browser_pool=browser_pool, status_callback=status_callback
+                )
 
-        # 2. Define the EMAIL Task (Runs ONLY on first loop)
-        use_email = scrape_config.get('use_email', False)
-        email_limit = scrape_config.get('email_max_results', 10)
-        if current_offset == 0 and use_email:
-            log(f"   📧 Email Scraper Active (Limit: {email_limit})", status_callback)
-            email_task = asyncio.to_thread(fetch_job_urls_from_gmail, max_results=email_limit)
-        else:
-            # On subsequent loops, return empty list instantly (don't check email again)
-            email_task = asyncio.create_task(asyncio.sleep(0, result=[]))
-
-        # 3. Execute Both Simultaneously
-        log("   ⏳ Waiting for Gmail and JobSpy...", status_callback)
-        web_results, email_results = await asyncio.gather(web_task, email_task)
-
-        # 4. Tag the Sources
-        # We manually add the 'Source' key here since the agents might not return it
-        for j in email_results: 
-            j['Source'] = 'Email'
-        for j in web_results:   
-            j['Source'] = 'Web'
-
-        # 5. Combine (Email first, usually higher quality/relevance)
-        job_batch = email_results + web_results
+            # 6. Combine (Email first, usually higher quality/relevance)
+            job_batch = email_results + web_results
         
-        log(f"   ✅ Batch received: {len(email_results)} from Email, {len(web_results)} from Web.", status_callback)
-        # ==========================================================
-
-        if not job_batch:
-            log("⚠️ No more jobs found from any source.", status_callback)
-            break
-
-        # Log Batch to CSV (We log EVERYTHING found, even if we don't process it yet)
-        file_exists = os.path.isfile(csv_log_path)
-        fieldnames = ["Company", "Title", "URL", "Scraped_Date", "Source"]
-        with open(csv_log_path, mode='a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists: 
-                writer.writeheader()
-            for j in job_batch:
-                writer.writerow({
-                    "Company": str(j.get('company', 'Unknown')), 
-                    "Title": str(j.get('title', 'Unknown')), 
-                    "URL": j['url'], 
-                    "Scraped_Date": today_str,
-                    "Source": j.get('Source', 'Unknown')
-                })
-
-        # Process Batch
-        for job in job_batch:
-            # --- CRITICAL: STOP CONDITION ---
-            # If we hit the target mid-batch, STOP EVERYTHING.
-            # This prevents "recording further jobs to history" or doing extra AI work.
-            if success_count >= target_successes: 
-                log(f"   🎉 Target met ({success_count}/{target_successes}). Stopping early.", status_callback)
-                break
-
-            total_checked += 1
-            log(f"\n💼 Checking Job {total_checked} (Target: {success_count}/{target_successes})", status_callback)
-            log(f"   {job.get('title', 'Job')} @ {job.get('company', 'Company')} [{job['Source']}]", status_callback)
-
-            if job['url'] in processed_urls_session: 
-                continue
-            processed_urls_session.add(job['url'])
-
-            if is_duplicate(job['url'], job.get('title', ''), job.get('company', '')):
-                log("   ⏭️  Duplicate. Skipping.", status_callback)
-                continue
+            log(f"   ✅ Batch received: {len(email_results)} from Email, {len(web_results)} from Web.", status_callback)
+
+            if not job_batch:
+                log("⚠️ No more jobs found from any source.", status_callback)
+                return
+
+            # Log Batch to CSV (We log EVERYTHING found, even if we don't process it yet)
+            file_exists = os.path.isfile(csv_log_path)
+            fieldnames = ["Company", "Title", "URL", "Scraped_Date", "Source"]
+            with open(csv_log_path, mode='a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                if not file_exists: 
+                    writer.writeheader()
+                for j in job_batch:
+                    writer.writerow({
+                        "Company": str(j.get('company', 'Unknown')), 
+                        "Title": str(j.get('title', 'Unknown')), 
+                        "URL": j['url'], 
+                        "Scraped_Date": today_str,
+                        "Source": j.get('Source', 'Unknown')
+                    })
+
+            # Hand the batch to the pipeline (blocks while the first queue is full)
+            for job in job_batch:
+                if total_checked >= safety_limit:
+                    log(f"\n🛑 SAFETY LIMIT REACHED ({total_checked} jobs). Stopping.", status_callback)
+                    return
+
+                total_checked += 1
+                job['_n'] = total_checked
+                log(f"\n💼 Checking Job {total_checked} (Target: {success_count}/{target_successes})", status_callback)
+                job_log(job, f"   {job.get('title', 'Job')} @ {job.get('company', 'Company')} [{job['Source']}]")
+
+                if job['url'] in processed_urls_session: 
+                    continue
+                processed_urls_session.add(job['url'])
+                yield job
+
+            first_batch = False
+            log("   ---> Fetching next batch...", status_callback)
+
+    # ==========================================================
+    # 🔍 STAGE 1: DEDUP + DEEP SCRAPE
+    # ==========================================================
+    async def scrape_stage(job):
+        if is_duplicate(job['url'], job.get('title', ''), job.get('company', ''), dedup_index):
+            job_log(job, "   ⏭️  Duplicate. Skipping.")
+            return None
+
+        # --- DEEP SCRAPE IF NEEDED ---
+        # Email jobs were already enriched in bulk by the job source
+        if job.get('_enriched') or needs_page_data(job):
+            if not job.get('_enriched'):
+                job_log(job, "   🔍 Fetching full job details...")
 
-            # --- DEEP SCRAPE IF NEEDED ---
-            is_generic_title = "Detected via Email" in job.get('title', '')
-            
-            if not job.get('description') or len(job.get('description', '')) < 50 or is_generic_title:
-                log("   🔍 Fetching full job details...", status_callback)
-                
                 # Fetch Data
-                scraped_data = await fetch_job_page_data(job['url'])
-                
+                scraped_data = await fetch_job_page_data(job['url'], browser_pool=browser_pool)
+
                 # Update Description
                 job['description'] = scraped_data.get('description', '')
 
@@ -319,111 +431,226 @@ async def run_daily_workflow(
                     job['title'] = scraped_data['title']
                 if scraped_data.get('company'):
                     job['company'] = scraped_data['company']
-                
-                # --- NEW STRICT VALIDATION ---
-                has_desc = job.get('description') and len(job['description']) > 50
-                has_title = job.get('title') and "Detected via Email" not in job['title']
-                has_company = job.get('company') and "LinkedIn Import" not in job['company']
-
-                if not (has_desc and has_title and has_company):
-                    log("      ⚠️ Scrape Incomplete. Missing Metadata. Skipping.", status_callback)
-                    log(f"         (Desc: {has_desc}, Title: {has_title}, Company: {has_company})", status_callback)
-                    
-                    # Save as failed so we don't try again
-                    save_to_history(
-                        job['url'], 
-                        job.get('title', 'Unknown'), 
-                        job.get('company', 'Unknown'), 
-                        "FAILED_SCRAPE", 
-                        source=job.get('Source')
-                    )
-                    continue
-                
-                log(f"      ✨ Updated Info: {job['title']} @ {job['company']}", status_callback)
-
-            # Now that we have the REAL title, check history one last time to be safe
-            if is_duplicate(job['url'], job['title'], job['company']):
-                 log("   ⏭️  Duplicate Content (Found after scrape). Skipping.", status_callback)
-                 save_to_history(job['url'], job['title'], job['company'], "Duplicate", source=job.get('Source'))
-                 continue
-
-            # Assessment
-            filter_settings = _resolve_agent_settings(
-                "filter",
-                base_settings,
-                agent_models,
-                model_api_keys,
-            )
-            assessment = assess_job_suitability(
-                job["description"], "master_resume.json", llm_settings=filter_settings
+
+            # --- NEW STRICT VALIDATION ---
+            has_desc = job.get('description') and len(job['description']) > 50
+            has_title = job.get('title') and "Detected via Email" not in job['title']
+            has_company = job.get('company') and "LinkedIn Import" not in job['company']
+
+            if not (has_desc and has_title and has_company):
+                job_log(job, "      ⚠️ Scrape Incomplete. Missing Metadata. Skipping.")
+                job_log(job, f"         (Desc: {has_desc}, Title: {has_title}, Company: {has_company})")
+
+                # Save as failed so we don't try again
+                save_to_history(
+                    job['url'], 
+                    job.get('title', 'Unknown'), 
+                    job.get('company', 'Unknown'), 
+                    "FAILED_SCRAPE", 
+                    source=job.get('Source'),
+                    dedup_index=dedup_index,
+                )
+                return None
+
+            job_log(job, f"      ✨ Updated Info: {job['title']} @ {job['company']}")
+
+        # Now that we have the REAL title, check history one last time to be safe
+        posting = (normalize_text(job['company']), normalize_text(job['title']))
+        if posting in in_flight_postings or is_duplicate(job['url'], job['title'], job['company'], dedup_index):
+            job_log(job, "   ⏭️  Duplicate Content (Found after scrape). Skipping.")
+            save_to_history(job['url'], job['title'], job['company'], "Duplicate", source=job.get('Source'), dedup_index=dedup_index)
+            return None
+        in_flight_postings.add(posting)
+        job['_posting'] = posting
+        return job
+
+    # ==========================================================
+    # ⚖️ STAGE 2: SUITABILITY FILTER
+    # ==========================================================
+    # Jobs are scored in micro-batches: one LLM call (and one copy of the
+    # candidate profile) covers every job that cleared scraping together.
+    # Obvious rejects / accepts are decided locally and never reach the LLM.
+    async def filter_stage(jobs):
+        assessments = [None] * len(jobs)
+        if candidate_skills is not None:
+            for i, job in enumerate(jobs):
+                assessments[i] = prefilter_job(job["description"], candidate_skills, job.get('title', ''))
+                if assessments[i] is not None:
+                    prefilter_stats["accepted" if assessments[i].is_suitable else "rejected"] += 1
+                    job_log(job, f"   ⚡ {assessments[i].reasoning}")
+
+        pending = [i for i, assessment in enumerate(assessments) if assessment is None]
+        if pending:
+            llm_assessments = await aassess_jobs_batch(
+                [jobs[i]["description"] for i in pending], master_resume,
+                llm_settings=filter_settings, batch_size=filter_batch_size,
             )
+            for i, assessment in zip(pending, llm_assessments):
+                assessments[i] = assessment
+
+        passed = []
+        for job, assessment in zip(jobs, assessments):
             if not assessment.is_suitable:
-                log(f"   🛑 SKIPPING: Match Score {assessment.match_score}/100", status_callback)
-                save_to_history(job['url'], job.get('title', ''), job.get('company', ''), "FILTERED_OUT", source=job['Source'])
-                continue 
-
-            log(f"   ✅ MATCH! Score {assessment.match_score}/100. Generating...", status_callback)
-
-            # Generate Filenames & Paths
-            company_clean = "".join(c for c in str(job.get('company', 'Job')) if c.isalnum())
-            role_clean = "".join(c for c in str(job.get('title', 'Role')) if c.isalnum())[:15]
-            filename = f"Resume_{company_clean}_{role_clean}.pdf"
-            output_path = os.path.join(daily_output_dir, filename)
-            
-            # Tailor & Render
-            success = await generate_resume_for_job(
+                job_log(job, f"   🛑 SKIPPING: Match Score {assessment.match_score}/100")
+                save_to_history(job['url'], job.get('title', ''), job.get('company', ''), "FILTERED_OUT", source=job['Source'], dedup_index=dedup_index)
+                passed.append(None)
+                continue
+            job_log(job, f"   ✅ MATCH! Score {assessment.match_score}/100. Generating...")
+            passed.append(job)
+        return passed
+
+    # ==========================================================
+    # 🧵 STAGE 3: TAILOR + PROOFREAD
+    # ==========================================================
+    async def tailor_stage(job):
+        # Generate Filenames & Paths
+        company_clean = "".join(c for c in str(job.get('company', 'Job')) if c.isalnum())
+        role_clean = "".join(c for c in str(job.get('title', 'Role')) if c.isalnum())[:15]
+        filename = f"Resume_{company_clean}_{role_clean}.pdf"
+        job['output_path'] = os.path.join(daily_output_dir, filename)
+
+        try:
+            job['tailored_json'] = await draft_resume_content(
                 job["description"],
-                "master_resume.json",
-                output_path,
+                master_resume,
+                job['output_path'],
+                lambda msg: job_log(job, msg),
+                tailor_settings=tailor_settings,
+                proofread_settings=proofread_settings,
+                tailor_token_budget=scrape_config.get('tailor_token_budget', TAILOR_TOKEN_BUDGET),
+                stream_llm=scrape_config.get('llm_streaming', True),
+                patch_mode=scrape_config.get('tailor_patch_mode', True),
+            )
+        except BaseException:
+            _discard_job_files(job)
+            raise
+
+        if not job['tailored_json']:
+            _discard_job_files(job)
+            save_to_history(job['url'], job.get('title', ''), job.get('company', ''), "FAILED_CONTENT", source=job['Source'], dedup_index=dedup_index)
+            return None
+        return job
+
+    # ==========================================================
+    # 📏 STAGE 4: LAYOUT + RENDER
+    # ==========================================================
+    async def render_stage(job):
+        try:
+            layout = await layout_resume(
+                job['tailored_json'],
+                job['output_path'],
+                lambda msg: job_log(job, msg),
+                browser_pool=browser_pool,
+            )
+        except BaseException:
+            # Cancelled (target met) or failed: don't leave a half-written PDF behind
+            _discard_job_files(job)
+            raise
+        job['page_count'] = layout['page_count']
+        if os.path.exists(job['tailored_json']):
+            os.remove(job['tailored_json'])
+        return job
+
+    # ==========================================================
+    # ☁️ STAGE 5: UPLOAD + RECORD
+    # ==========================================================
+    async def record_stage(job):
+        nonlocal success_count
+        if success_count >= target_successes:
+            # Another job met the target while this one was rendering
+            _discard_job_files(job)
+            return None
+
+        output_path = job['output_path']
+        job_log(job, f"   📁 SAVED: {output_path}")
+        drive_link = None
+
+        # Upload to Drive if enabled
+        enable_drive = scrape_config.get('enable_drive', False)
+        if enable_drive:
+            job_log(job, "   ☁️ Uploading to Google Drive...")
+            drive_link = await asyncio.to_thread(upload_resume_to_drive, output_path)
+
+        # Save to History (Only successful ones)
+        save_to_history(job['url'], job.get('title', ''), job.get('company', ''), "GENERATED", drive_link=drive_link, source=job['Source'], dedup_index=dedup_index)
+        success_count += 1
+        successful_jobs_data.append({
+            "company": job.get('company', 'Unknown'),
+            "role": job.get('title', 'Unknown'),
+            "url": job['url'],
+            "pdf_path": output_path,
+            "source": job['Source']
+        })
+
+        # --- CRITICAL: STOP CONDITION ---
+        # Once the target is met, cancel everything still in flight.
+        # This prevents "recording further jobs to history" or doing extra AI work.
+        if success_count >= target_successes:
+            log(f"   🎉 Target met ({success_count}/{target_successes}). Stopping early.", status_callback)
+            pipeline.stop()
+        return None
+
+    def on_stage_error(stage_name, job, error):
+        job_log(job, f"   ⚠️ {stage_name} stage failed: {error}")
+        # Nothing was recorded for this posting, so another copy of it may still be tried
+        in_flight_postings.discard(job.get('_posting'))
+
+    stage_concurrency = {**DEFAULT_STAGE_CONCURRENCY, **(scrape_config.get('pipeline_concurrency') or {})}
+    pipeline = StagedPipeline(queue_size=scrape_config.get('pipeline_queue_size', 2), on_error=on_stage_error)
+    pipeline.add_stage("scrape", scrape_stage, stage_concurrency["scrape"])
+    filter_batch_size = scrape_config.get('filter_batch_size', FILTER_BATCH_SIZE)
+    prefilter_stats = {"accepted": 0, "rejected": 0}
+    candidate_skills = None
+    if scrape_config.get('local_prefilter', True):
+        candidate_skills = master_resume.skills
+    pipeline.add_stage(
+        "filter", filter_stage, stage_concurrency["filter"],
+        batch_size=filter_batch_size, batch_wait=scrape_config.get('filter_batch_wait', 2.0),
+    )
+    pipeline.add_stage("tailor", tailor_stage, stage_concurrency["tailor"])
+    pipeline.add_stage("render", render_stage, stage_concurrency["render"])
+    pipeline.add_stage("record", record_stage, 1)
+
+    try:
+        await pipeline.run(job_source())
+    finally:
+        await close_async_llm_client()
+        await close_page_http_client()
+        if llm_cache is not None:
+            cache_stats = llm_cache.stats()
+            log(
+                f"   🗃️  LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate).",
                 status_callback,
-                tailor_settings=_resolve_agent_settings(
-                    "tailor",
-                    base_settings,
-                    agent_models,
-                    model_api_keys,
-                ),
-                proofread_settings=_resolve_agent_settings(
-                    "proofread",
-                    base_settings,
-                    agent_models,
-                    model_api_keys,
-                ),
             )
-            
-            if success:
-                log(f"   📁 SAVED: {output_path}", status_callback)
-                drive_link = None
-
-                # Upload to Drive if enabled
-                enable_drive = scrape_config.get('enable_drive', False)
-                if enable_drive:
-                    log("   ☁️ Uploading to Google Drive...", status_callback)
-                    drive_link = upload_resume_to_drive(output_path)
-                
-                # Save to History (Only successful ones)
-                save_to_history(job['url'], job.get('title', ''), job.get('company', ''), "GENERATED", drive_link=drive_link, source=job['Source'])
-                success_count += 1
-                successful_jobs_data.append({
-                    "company": job.get('company', 'Unknown'),
-                    "role": job.get('title', 'Unknown'),
-                    "url": job['url'],
-                    "pdf_path": output_path,
-                    "source": job['Source']
-                })
-            else:
-                if os.path.exists(output_path): 
-                    os.remove(output_path)
-                save_to_history(job['url'], job.get('title', ''), job.get('company', ''), "FAILED_CONTENT", source=job['Source'])
-            
-            time.sleep(2)
-
-        # Break the OUTER loop if target is met
-        if success_count >= target_successes: 
-            break
-        
-        current_offset += batch_size
-        log("   ---> Fetching next batch...", status_callback)
-        time.sleep(5)
+        if page_cache is not None:
+            page_stats = page_cache.stats()
+            log(
+                f"   🗃️  Page cache: {page_stats['hits']} hits, {page_stats['negative_hits']} negative hits, "
+                f"{page_stats['misses']} misses ({page_stats['hit_rate']:.0%} hit rate).",
+                status_callback,
+            )
+        log(
+            f"   🕸️  Scrape session: {scrape_session.fetches} bulk fetch(es), "
+            f"{scrape_session.cache_hits} cached window(s), {scrape_session.served} jobs served.",
+            status_callback,
+        )
+        saved_calls = prefilter_stats["accepted"] + prefilter_stats["rejected"]
+        if saved_calls:
+            log(
+                f"   ⚡ Pre-filter saved {saved_calls} LLM assessment(s) "
+                f"({prefilter_stats['rejected']} rejected, {prefilter_stats['accepted']} accepted locally).",
+                status_callback,
+            )
+        if site_rate_limiter.waited:
+            waits = ", ".join(f"{site} {secs:.1f}s" for site, secs in site_rate_limiter.waited.items())
+            log(f"   ⏱️  Rate limiter waits: {waits}", status_callback)
+        if page_fetch_stats.total:
+            log(f"   📊 Job page tiers: {page_fetch_stats.summary()}", status_callback)
+        if page_fetch_stats.loads:
+            log(f"   📶 Job page cost: {page_fetch_stats.load_summary()}", status_callback)
+        await browser_pool.close()
+        log(f"   🧭 Browser pool closed ({browser_pool.launches} browser launch(es) this run).", status_callback)
 
     # 2. NOTIFY END
     log(f"🎉 Workflow Complete! {success_count} Resumes Generated.", status_callback)
@@ -434,10 +661,11 @@ async def run_daily_workflow(
     if notion_config and notion_config.get("enable"):
         notion_api_key = notion_config.get("api_key")
         notion_database_id = notion_config.get("database_id")
-        if notion_api_key and notion_database_id and os.path.exists(HISTORY_FILE):
+        history = load_history()
+        if notion_api_key and notion_database_id and history:
             try:
                 result = sync_history_to_notion(
-                    HISTORY_FILE,
+                    history,
                     notion_database_id,
                     notion_api_key,
                 )
@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+
+class _BrowserSlot:
+    def __init__(self):
+        self.browser = None
+        self.in_use = 0
+        self.pages_served = 0
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Run-scoped pool of headless Chromium browsers shared by the layout and search agents.
+
+    size            : number of browser processes (N)
+    contexts_per_browser : concurrent contexts leased from each browser (M)
+    recycle_after   : relaunch a browser once it has served this many pages (K)
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        contexts_per_browser: int = 4,
+        recycle_after: int = 50,
+        launch_args: Optional[list] = None,
+    ):
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self.launch_args = launch_args if launch_args is not None else LAUNCH_ARGS
+        self.launches = 0
+
+        self._playwright_cm = None
+        self._playwright = None
+        self._slots = [_BrowserSlot() for _ in range(self.size)]
+        self._capacity = asyncio.Semaphore(self.size * self.contexts_per_browser)
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if self._playwright is None:
+            self._playwright_cm = async_playwright()
+            self._playwright = await self._playwright_cm.start()
+
+    async def close(self):
+        for slot in self._slots:
+            await self._close_browser(slot)
+        if self._playwright_cm is not None:
+            await self._playwright_cm.__aexit__(None, None, None)
+        self._playwright_cm = None
+        self._playwright = None
+
+    async def _close_browser(self, slot: _BrowserSlot):
+        browser, slot.browser = slot.browser, None
+        slot.pages_served = 0
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                # Already crashed / disconnected
+                pass
+
+    def _load(self, slot: _BrowserSlot) -> int:
+        # Browsers due for recycling count as full so they can drain and restart
+        draining = slot.in_use > 0 and slot.pages_served >= self.recycle_after
+        return slot.in_use + (self.contexts_per_browser if draining else 0)
+
+    async def _acquire_slot(self) -> _BrowserSlot:
+        async with self._lock:
+            await self.start()
+            slot = min(self._slots, key=self._load)
+            if not slot.is_healthy():
+                await self._close_browser(slot)
+                slot.browser = await self._playwright.chromium.launch(
+                    headless=True, args=self.launch_args
+                )
+                self.launches += 1
+            slot.in_use += 1
+            return slot
+
+    async def _release_slot(self, slot: _BrowserSlot):
+        async with self._lock:
+            slot.in_use -= 1
+            # Only recycle an idle browser, never one with open contexts
+            if slot.in_use == 0 and slot.pages_served >= self.recycle_after:
+                await self._close_browser(slot)
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Leases a fresh browser context; it is closed again on exit."""
+        async with self._capacity:
+            slot = await self._acquire_slot()
+            context = None
+            try:
+                context = await slot.browser.new_context(**context_options)
+
+                def _count_page(_page):
+                    slot.pages_served += 1
+
+                context.on("page", _count_page)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                await self._release_slot(slot)
+
+    @asynccontextmanager
+    async def page(self, **context_options):
+        """Leases a context and opens a single page in it."""
+        async with self.context(**context_options) as context:
+            yield await context.new_page()
+
+
+@asynccontextmanager
+async def open_page(browser_pool: Optional[BrowserPool] = None, **context_options):
+    """
+    Yields a page from `browser_pool`, or from a throwaway single-browser pool
+    when none is given (standalone scripts and tests).
+    """
+    if browser_pool is not None:
+        async with browser_pool.page(**context_options) as page:
+            yield page
+        return
+
+    async with BrowserPool(size=1, contexts_per_browser=1) as pool, pool.page(**context_options) as page:
+        yield page
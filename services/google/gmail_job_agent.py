@@ -1,9 +1,14 @@
 import base64
+import json
+import os
+from datetime import datetime
 from bs4 import BeautifulSoup
-from urllib.parse import unquote, urlparse, parse_qs
-from agents.search_agent import fetch_job_page_data
+from googleapiclient.errors import HttpError
+from agents.search_agent import PageFetchStats, fetch_job_page_data
+from services.browser_pool import BrowserPool
 from utils.google_utils import get_google_service
 from utils.console_logger import safe_print
+from utils.url_utils import clean_url
 import asyncio
 
 
@@ -11,31 +16,205 @@ ADDRESSES = [
     "jobalerts-noreply@linkedin.com"
 ]
 
-def clean_url(url):
+# Gmail allows 100 calls per batch request but throttles large batches; 50 is the documented sweet spot
+GMAIL_BATCH_SIZE = 50
+GMAIL_LIST_PAGE_SIZE = 500
+# batchModify accepts up to 1000 ids per call
+GMAIL_MODIFY_BATCH_SIZE = 1000
+# Partial response: only the MIME tree's types and inline body data (enough to find the HTML part)
+MESSAGE_FIELDS = "id,payload(mimeType,body/data,parts(mimeType,body/data,parts(mimeType,body/data)))"
+
+# Incremental sync: last processed historyId + recently handled message ids
+GMAIL_SYNC_STATE = ".gmail_sync.json"
+GMAIL_PROCESSED_IDS_MAX = 1000
+# Bounded query used on first run or when the stored historyId has expired
+GMAIL_FALLBACK_DAYS = 3
+
+
+def _list_message_ids(service, query, max_results):
+    """
+    Follows nextPageToken until `max_results` message ids are collected.
+    Returns (ids, has_more); has_more is True while matches remain beyond them.
+    """
+    ids = []
+    page_token = None
+    while len(ids) < max_results:
+        request = service.users().messages().list(
+            userId='me', q=query, maxResults=min(GMAIL_LIST_PAGE_SIZE, max_results - len(ids)),
+            pageToken=page_token,
+        )
+        results = request.execute()
+        ids.extend(msg['id'] for msg in results.get('messages', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+    return ids[:max_results], bool(page_token) or len(ids) > max_results
+
+
+def _get_messages(service, ids, **get_kwargs):
     """
-    Unwraps security redirects AND fixes LinkedIn specific paths.
+    Fetches messages with one batched HTTP request per GMAIL_BATCH_SIZE ids.
+    get_kwargs override the default full-body request (format / fields / metadataHeaders).
     """
-    # 1. Handle Proofpoint (urldefense)
-    if "urldefense.proofpoint.com" in url:
-        parsed = urlparse(url)
-        query_params = parse_qs(parsed.query)
-        if 'u' in query_params:
-            encoded_url = query_params['u'][0]
-            decoded = encoded_url.replace('-', '%').replace('_', '/')
-            url = unquote(decoded)
+    get_kwargs = {"format": 'full', "fields": MESSAGE_FIELDS, **get_kwargs}
+    messages = {}
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            safe_print(f"   ⚠️ Could not fetch email {request_id}: {exception}")
+            return
+        response.setdefault('id', request_id)
+        messages[request_id] = response
+
+    for start in range(0, len(ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_collect)
+        for msg_id in ids[start:start + GMAIL_BATCH_SIZE]:
+            batch.add(
+                service.users().messages().get(userId='me', id=msg_id, **get_kwargs),
+                request_id=msg_id,
+            )
+        batch.execute()
+    # Keep the list order (newest first)
+    return [messages[msg_id] for msg_id in ids if msg_id in messages]
+
+
+def _load_sync_state(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_sync_state(path, state):
+    if not path:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _history_message_ids(service, start_history_id):
+    """
+    Ids of messages added since `start_history_id` (oldest first) and the
+    mailbox's current historyId. Returns None when the id has expired.
+    """
+    ids = []
+    page_token = None
+    latest_history_id = start_history_id
+    try:
+        while True:
+            results = service.users().history().list(
+                userId='me', startHistoryId=start_history_id, historyTypes=['messageAdded'],
+                pageToken=page_token,
+            ).execute()
+            for record in results.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    msg_id = added['message']['id']
+                    if msg_id not in ids:
+                        ids.append(msg_id)
+            latest_history_id = results.get('historyId', latest_history_id)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return ids, latest_history_id
+    except HttpError as e:
+        # Gmail keeps roughly a week of history; older ids answer 404
+        if getattr(e, 'resp', None) is not None and e.resp.status == 404:
+            return None
+        raise
+
+
+def _alert_ids(service, ids):
+    """Keeps the ids whose From header is one of ADDRESSES (metadata-only fetch)."""
+    if not ids:
+        return []
+    messages = _get_messages(
+        service, ids, format='metadata', metadataHeaders=['From'], fields="id,payload/headers"
+    )
+    senders = [address.lower() for address in ADDRESSES]
+    alert_ids = set()
+    for msg in messages:
+        for header in msg.get('payload', {}).get('headers', []):
+            if header.get('name', '').lower() == 'from' and any(a in header.get('value', '').lower() for a in senders):
+                alert_ids.add(msg['id'])
+    return [msg_id for msg_id in ids if msg_id in alert_ids]
+
+
+def _mark_read(service, ids):
+    for start in range(0, len(ids), GMAIL_MODIFY_BATCH_SIZE):
+        service.users().messages().batchModify(
+            userId='me', body={'ids': ids[start:start + GMAIL_MODIFY_BATCH_SIZE], 'removeLabelIds': ['UNREAD']}
+        ).execute()
+
 
-    # 2. Fix LinkedIn "/comm/" links to allow Guest Access
-    # Transforms: linkedin.com/comm/jobs/view/123 -> linkedin.com/jobs/view/123
-    if "/comm/jobs/view/" in url:
-        url = url.replace("/comm/jobs/view/", "/jobs/view/")
+def _html_part(payload):
+    if payload.get('mimeType') == 'text/html' and payload.get('body', {}).get('data'):
+        return payload['body']['data']
+    for part in payload.get('parts', []):
+        data = _html_part(part)
+        if data:
+            return data
+    return ""
 
-    return url
 
+def _html_body(payload):
+    """base64url data of the first text/html part (multipart emails can nest parts)."""
+    if 'parts' not in payload:
+        # Single-part email; parse whatever it carries
+        return payload.get('body', {}).get('data', "")
+    return _html_part(payload)
 
-def fetch_job_urls_from_gmail(max_results=10):
+
+def _extract_jobs(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Find job links
+    links = soup.find_all('a', href=True)
+    safe_print(f"   🔍 Scanning {len(links)} links in email...")
+
+    jobs = []
+    seen_in_this_email = set() # Track duplicates locally
+
+    for link in links:
+        raw_url = link['href']
+        clean_link = clean_url(raw_url)
+
+        # Filter for valid Job Links
+        if "/jobs/view/" in clean_link:
+            # Remove the long tracking ID (?trackingId=...) to find true duplicates
+            # This splits the URL at '?' and keeps only the first part
+            base_url = clean_link.split('?')[0]
+            
+            if base_url in seen_in_this_email:
+                continue # Skip duplicate
+            
+            seen_in_this_email.add(base_url)
+
+            safe_print(f"      ✅ Found Job: {base_url[:60]}...")
+            jobs.append({
+                "url": base_url, # Save the clean URL without tracking junk
+                "title": "Detected via Email", 
+                "company": "LinkedIn Import",   
+                "description": ""               
+            })
+    return jobs
+
+
+def fetch_job_urls_from_gmail(max_results=10, state_path=GMAIL_SYNC_STATE):
     """
-    Scans unread emails for 'LinkedIn Job Alert' and extracts URLs.
+    Scans new 'LinkedIn Job Alert' emails and extracts URLs.
     max_results: Maximum number of emails to scan
+    state_path: where the last processed historyId and message ids are kept
+
+    New emails are found with users.history.list from the stored historyId, so
+    the read flag is not used as state (an alert opened by hand still counts).
+    Without a usable historyId (first run, or history expired) a query bounded
+    to the last GMAIL_FALLBACK_DAYS days is used, skipping already-processed ids.
+    Bodies are fetched in batched requests and all scanned emails are marked
+    read with a single batchModify call.
     """
     # 1. Get Service via Shared Auth
     service = get_google_service('gmail', 'v1')
@@ -43,110 +222,136 @@ def fetch_job_urls_from_gmail(max_results=10):
         return []
 
     job_list = []
-    
-    # 2. Query for unread emails
-    query = "is:unread (" + " OR ".join(f"from:{a}" for a in ADDRESSES) + ")"
+    state = _load_sync_state(state_path)
+    processed_ids = list(state.get('processed_ids', []))
+    processed = set(processed_ids)
     
     try:
-        results = service.users().messages().list(userId='me', q=query, maxResults=max_results).execute()
-        messages = results.get('messages', [])
+        # 2. Find new emails: incremental history, else a bounded date query
+        history = None
+        if state.get('history_id'):
+            history = _history_message_ids(service, state['history_id'])
+            if history is None:
+                safe_print("   ⏳ Gmail history expired; falling back to a date-bounded scan.")
+
+        if history is not None:
+            new_ids, latest_history_id = history
+            candidate_ids = _alert_ids(service, [i for i in new_ids if i not in processed])
+            backlog = len(candidate_ids) > max_results
+        else:
+            # Snapshot the mailbox position first so nothing arriving mid-scan is lost
+            latest_history_id = service.users().getProfile(userId='me').execute().get('historyId')
+            query = f"({' OR '.join(f'from:{a}' for a in ADDRESSES)}) newer_than:{GMAIL_FALLBACK_DAYS}d"
+            listed_ids, list_has_more = _list_message_ids(service, query, max_results + len(processed))
+            candidate_ids = [i for i in listed_ids if i not in processed]
+            backlog = list_has_more or len(candidate_ids) > max_results
 
-        if not messages:
+        message_ids = candidate_ids[:max_results]
+        # Never move the historyId past alerts that didn't fit: the history path keeps the
+        # old id, the list path stores none so the next run lists again (handled ids are skipped)
+        if backlog:
+            latest_history_id = state.get('history_id') if history is not None else None
+
+        if not message_ids:
             safe_print("   📭 No new LinkedIn job emails found.")
+            _save_sync_state(state_path, {**state, 'history_id': latest_history_id,
+                                          'synced_at': datetime.now().isoformat(timespec='seconds')})
             return []
 
-        safe_print(f"   📧 Found {len(messages)} new job alert emails...")
+        safe_print(f"   📧 Found {len(message_ids)} new job alert emails...")
+
+        # 3. Get full email data (batched)
+        messages = _get_messages(service, message_ids)
 
         for msg in messages:
-            # Get full email data
-            txt = service.users().messages().get(userId='me', id=msg['id']).execute()
-            payload = txt['payload']
-            
-            # Decode body (Handle multipart)
-            body_data = ""
-            if 'parts' in payload:
-                for part in payload['parts']:
-                    if part['mimeType'] == 'text/html':
-                        body_data = part['body']['data']
-                        break
-            else:
-                body_data = payload.get('body', {}).get('data', "")
-                
+            body_data = _html_body(msg.get('payload', {}))
             if not body_data: 
                 continue
             
             html_content = base64.urlsafe_b64decode(body_data).decode('utf-8')
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            # Find job links
-            links = soup.find_all('a', href=True)
-            safe_print(f"   🔍 Scanning {len(links)} links in email...")
-
-            seen_in_this_email = set() # Track duplicates locally
-
-            for link in links:
-                raw_url = link['href']
-                clean_link = clean_url(raw_url)
-
-                # Filter for valid Job Links
-                if "/jobs/view/" in clean_link:
-                    # Remove the long tracking ID (?trackingId=...) to find true duplicates
-                    # This splits the URL at '?' and keeps only the first part
-                    base_url = clean_link.split('?')[0]
-                    
-                    if base_url in seen_in_this_email:
-                        continue # Skip duplicate
-                    
-                    seen_in_this_email.add(base_url)
-
-                    safe_print(f"      ✅ Found Job: {base_url[:60]}...")
-                    job_list.append({
-                        "url": base_url, # Save the clean URL without tracking junk
-                        "title": "Detected via Email", 
-                        "company": "LinkedIn Import",   
-                        "description": ""               
-                    })
+            job_list.extend(_extract_jobs(html_content))
             
-            # Mark email as read
-            service.users().messages().modify(userId='me', id=msg['id'], body={'removeLabelIds': ['UNREAD']}).execute()
+        # 4. Mark every fetched email as read in one call
+        fetched_ids = [msg['id'] for msg in messages]
+        _mark_read(service, fetched_ids)
+
+        # 5. Remember where we got to
+        processed_ids.extend(fetched_ids)
+        _save_sync_state(state_path, {
+            'history_id': latest_history_id,
+            'processed_ids': processed_ids[-GMAIL_PROCESSED_IDS_MAX:],
+            'synced_at': datetime.now().isoformat(timespec='seconds'),
+        })
 
         return job_list
         
     except Exception as e:
         safe_print(f"   ❌ Gmail Scan Failed: {e}")
         return []
-    
-# For testing purposes
-async def enrich_jobs_with_page_data(jobs, limit=None, concurrency=3):
+
+
+def needs_page_data(job):
+    """Email jobs arrive as bare URLs with placeholder title/company."""
+    description = job.get("description") or ""
+    return len(description) < 50 or "Detected via Email" in (job.get("title") or "")
+
+
+async def enrich_jobs_with_page_data(jobs, limit=None, concurrency=3, browser_pool=None, status_callback=None):
     """
     For each job in jobs, fetch page data and merge it into the job dict.
     limit: only enrich first N jobs (None = all)
     concurrency: how many pages to scrape in parallel
+    browser_pool: shared BrowserPool; without one a single browser is
+                  launched for the whole batch instead of one per page
+    status_callback: also receives the per-tier hit rate report
+    Enriched jobs are flagged with '_enriched' so later stages don't refetch them.
     """
     jobs_to_process = jobs[:limit] if limit else jobs
-    sem = asyncio.Semaphore(concurrency)
+    if not jobs_to_process:
+        return []
+    sem = asyncio.Semaphore(max(1, concurrency))
+    stats = PageFetchStats()
 
-    async def _one(job):
+    async def _one(job, pool):
         async with sem:
-            page_data = await fetch_job_page_data(job["url"])
+            try:
+                page_data = await fetch_job_page_data(job["url"], browser_pool=pool)
+            except Exception as e:
+                safe_print(f"   ⚠️ Enrichment failed for {job['url']}: {e}")
+                page_data = {}
+            stats.record(page_data, url=job["url"])
             # Merge scraped fields into the job
             job.update({
                 "title": page_data.get("title") or job.get("title"),
                 "company": page_data.get("company") or job.get("company"),
                 "description": page_data.get("description") or job.get("description", ""),
+                "_enriched": True,
             })
             return job
 
-    return await asyncio.gather(*[_one(j) for j in jobs_to_process])
-    
+    if browser_pool is not None:
+        enriched = await asyncio.gather(*[_one(j, browser_pool) for j in jobs_to_process])
+    else:
+        # Playwright only launches a browser once a page actually escalates to it
+        async with BrowserPool(size=1, contexts_per_browser=max(1, concurrency)) as pool:
+            enriched = await asyncio.gather(*[_one(j, pool) for j in jobs_to_process])
+
+    report = f"   📊 Enrichment tiers: {stats.summary()}"
+    if stats.loads:
+        report += f"\n   📶 Enrichment cost: {stats.load_summary()}"
+    safe_print(report)
+    if status_callback:
+        status_callback(report)
+    return enriched
+
 def main():
     import argparse
     import json
 
     parser = argparse.ArgumentParser(
-        description="Scan Gmail unread job alert emails and extract LinkedIn job URLs."
+        description="Scan new Gmail job alert emails and extract LinkedIn job URLs."
     )
-    parser.add_argument("--max-results", type=int, default=10, help="Max number of unread emails to scan.")
+    parser.add_argument("--max-results", type=int, default=10, help="Max number of new emails to scan.")
     parser.add_argument(
         "--address",
         action="append",
@@ -0,0 +1,195 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+HISTORY_DB = "history.db"
+LEGACY_HISTORY_FILE = "history.json"
+
+HISTORY_FIELDS = ["url", "title", "company", "date", "status", "drive_link", "source"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT,
+    title TEXT,
+    company TEXT,
+    norm_company TEXT,
+    norm_title TEXT,
+    date TEXT,
+    status TEXT,
+    drive_link TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_url ON history (url);
+CREATE INDEX IF NOT EXISTS idx_history_company_title_date ON history (norm_company, norm_title, date);
+"""
+
+INSERT_SQL = (
+    "INSERT INTO history (url, title, company, norm_company, norm_title, date, status, drive_link, source) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def normalize_text(text):
+    if not text:
+        return ""
+    text = str(text)
+    return re.sub(r'[^a-zA-Z0-9]', '', text).lower()
+
+
+class HistoryStore:
+    """
+    Append-only job history backed by SQLite.
+
+    Lookups by URL and by normalized (company, title) are index seeks, and each
+    write is a single INSERT. An existing history.json is imported once on first
+    open and renamed to history.json.migrated.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB, legacy_json_path: Optional[str] = LEGACY_HISTORY_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        if legacy_json_path:
+            self._migrate_legacy_json(legacy_json_path)
+
+    def _migrate_legacy_json(self, legacy_json_path):
+        if not os.path.exists(legacy_json_path):
+            return
+        try:
+            with open(legacy_json_path, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            entries = json.loads(content) if content else []
+        except Exception as e:
+            print(f"   ❌ Failed to migrate {legacy_json_path}: {e}")
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(INSERT_SQL, [self._row_values(entry) for entry in entries])
+        os.replace(legacy_json_path, f"{legacy_json_path}.migrated")
+        print(f"   📦 Migrated {len(entries)} history entries from {legacy_json_path} to {self.db_path}.")
+
+    @staticmethod
+    def _row_values(entry):
+        return (
+            entry.get("url"),
+            str(entry.get("title", "")),
+            str(entry.get("company", "")),
+            normalize_text(entry.get("company", "")),
+            normalize_text(entry.get("title", "")),
+            entry.get("date"),
+            entry.get("status"),
+            entry.get("drive_link"),
+            entry.get("source"),
+        )
+
+    def add(self, url, title, company, status, drive_link=None, source=None, date=None) -> dict:
+        entry = {
+            "url": url,
+            "title": str(title),
+            "company": str(company),
+            "date": date or datetime.now().strftime("%Y-%m-%d"),
+            "status": status,
+            "drive_link": drive_link,
+            "source": source,
+        }
+        with self._lock, self._conn:
+            self._conn.execute(INSERT_SQL, self._row_values(entry))
+        return entry
+
+    def has_url(self, url) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM history WHERE url = ? LIMIT 1", (url,)).fetchone()
+        return row is not None
+
+    def has_recent_match(self, title, company, since: str) -> bool:
+        """True if the same normalized (company, title) was recorded after `since` (YYYY-MM-DD)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM history WHERE norm_company = ? AND norm_title = ? AND date > ? LIMIT 1",
+                (normalize_text(company), normalize_text(title), since),
+            ).fetchone()
+        return row is not None
+
+    def is_duplicate(self, url, title, company, window_days: int = 60) -> bool:
+        if self.has_url(url):
+            return True
+        since = (datetime.now() - timedelta(days=window_days)).strftime("%Y-%m-%d")
+        return self.has_recent_match(title, company, since)
+
+    def dedup_snapshot(self, since: str):
+        """Returns (all urls, {(norm_company, norm_title): latest date} for entries after `since`)."""
+        with self._lock:
+            urls = {row[0] for row in self._conn.execute("SELECT DISTINCT url FROM history")}
+            latest = {
+                (row[0], row[1]): row[2]
+                for row in self._conn.execute(
+                    "SELECT norm_company, norm_title, MAX(date) FROM history WHERE date > ? "
+                    "GROUP BY norm_company, norm_title",
+                    (since,),
+                )
+            }
+        return urls, latest
+
+    def all(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(HISTORY_FIELDS)} FROM history ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DedupIndex:
+    """
+    In-memory duplicate index built once per run: a URL set plus
+    normalized (company, title) -> latest date inside a rolling window.
+    Every check is a hash lookup; call add() after each history write.
+    """
+
+    def __init__(self, window_days: int = 60):
+        self.window_days = window_days
+        self.cutoff = (datetime.now() - timedelta(days=window_days)).strftime("%Y-%m-%d")
+        self.urls = set()
+        self.latest = {}
+
+    @classmethod
+    def from_store(cls, store: HistoryStore, window_days: int = 60):
+        index = cls(window_days)
+        index.urls, index.latest = store.dedup_snapshot(index.cutoff)
+        return index
+
+    def add(self, url, title, company, date=None):
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        self.urls.add(url)
+        key = (normalize_text(company), normalize_text(title))
+        if date > self.latest.get(key, ""):
+            self.latest[key] = date
+
+    def is_duplicate(self, url, title, company) -> bool:
+        if url in self.urls:
+            return True
+        latest = self.latest.get((normalize_text(company), normalize_text(title)))
+        return latest is not None and latest > self.cutoff
+
+    def __len__(self):
+        return len(self.urls)
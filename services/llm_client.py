@@ -1,11 +1,17 @@
+import asyncio
 import json
 import os
-from typing import Optional, Type
+import threading
+import weakref
+from typing import Callable, Optional, Type
 
+import httpx
 import requests
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel
 
+from services.llm_cache import get_llm_cache, make_cache_key
+from services.llm_stream import StreamingJSONValidator
 from services.model_registry import get_provider_config
 
 
@@ -97,28 +103,114 @@ def is_model_available(
     return False
 
 
+def _build_messages(system_prompt: str, user_prompt: str) -> list:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _ollama_payload(model: str, messages: list, temperature: float, stream: bool = False) -> dict:
+    return {
+        "model": model,
+        "messages": messages,
+        "format": "json",
+        "stream": stream,
+        "options": {"temperature": temperature},
+    }
+
+
+def _parse_ollama_response(data: dict, schema: Optional[Type[BaseModel]]) -> dict:
+    content = data.get("message", {}).get("content", "")
+    parsed = json.loads(content)
+    if schema is not None:
+        return schema.model_validate(parsed).model_dump()
+    return parsed
+
+
+def _require_openai_key(api_key: Optional[str]):
+    if not (api_key or os.environ.get("OPENAI_API_KEY")):
+        raise ValueError("OpenAI API Key is missing.")
+
+
+def _ollama_stream_content(line) -> tuple:
+    """(content delta, done) from one line of Ollama's streaming NDJSON."""
+    data = json.loads(line)
+    return data.get("message", {}).get("content", ""), data.get("done", False)
+
+
+# --- Pooled sync clients (reused across calls instead of one per request) ---
+_openai_clients = {}
+_http_session = requests.Session()
+_sync_lock = threading.Lock()
+
+
+def _get_openai_client(api_key: Optional[str]) -> OpenAI:
+    with _sync_lock:
+        if api_key not in _openai_clients:
+            _openai_clients[api_key] = OpenAI(api_key=api_key) if api_key else OpenAI()
+        return _openai_clients[api_key]
+
+
+def _cache_key(settings: dict, system_prompt, user_prompt, schema, temperature) -> str:
+    return make_cache_key(
+        settings["provider"],
+        settings["model"],
+        temperature,
+        system_prompt,
+        user_prompt,
+        schema.__name__ if schema is not None else None,
+    )
+
+
 def chat_json(
     system_prompt: str,
     user_prompt: str,
     llm_settings: Optional[dict],
     schema: Optional[Type[BaseModel]] = None,
     temperature: float = 0.2,
+    stream_callback: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """
+    One JSON completion, validated against `schema` when given.
+    With `stream_callback` the response is streamed: progress is pushed to the
+    callback and the call aborts with StreamSchemaError as soon as the partial
+    output breaks the schema.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return _chat_json(system_prompt, user_prompt, llm_settings, schema, temperature, stream_callback)
+
+    key = _cache_key(resolve_llm_settings(llm_settings), system_prompt, user_prompt, schema, temperature)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = _chat_json(system_prompt, user_prompt, llm_settings, schema, temperature, stream_callback)
+    cache.set(key, result)
+    return result
+
+
+def _chat_json(
+    system_prompt: str,
+    user_prompt: str,
+    llm_settings: Optional[dict],
+    schema: Optional[Type[BaseModel]] = None,
+    temperature: float = 0.2,
+    stream_callback: Optional[Callable[[str], None]] = None,
 ) -> dict:
     settings = resolve_llm_settings(llm_settings)
     provider = settings["provider"]
     model = settings["model"]
     api_key = settings.get("api_key")
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt},
-    ]
+    messages = _build_messages(system_prompt, user_prompt)
+    if stream_callback is not None:
+        return _stream_chat_json(settings, messages, schema, temperature, stream_callback)
 
     if provider == "openai":
-        if not (api_key or os.environ.get("OPENAI_API_KEY")):
-            raise ValueError("OpenAI API Key is missing.")
+        _require_openai_key(api_key)
 
-        client = OpenAI(api_key=api_key) if api_key else OpenAI()
+        client = _get_openai_client(api_key)
         if schema is not None:
             completion = client.beta.chat.completions.parse(
                 model=model,
@@ -137,20 +229,207 @@ def chat_json(
         return json.loads(completion.choices[0].message.content)
 
     if provider == "ollama":
-        payload = {
-            "model": model,
-            "messages": messages,
-            "format": "json",
-            "stream": False,
-            "options": {"temperature": temperature},
-        }
+        payload = _ollama_payload(model, messages, temperature)
         base_url = get_provider_config(provider).get("base_url", "http://localhost:11434")
-        response = requests.post(f"{base_url}/api/chat", json=payload, timeout=120)
+        response = _http_session.post(f"{base_url}/api/chat", json=payload, timeout=120)
         response.raise_for_status()
-        content = response.json().get("message", {}).get("content", "")
-        parsed = json.loads(content)
-        if schema is not None:
-            return schema.model_validate(parsed).model_dump()
-        return parsed
+        return _parse_ollama_response(response.json(), schema)
+
+    raise ValueError(f"Unsupported model provider: {provider}")
+
+
+def _stream_chat_json(settings, messages, schema, temperature, stream_callback) -> dict:
+    provider = settings["provider"]
+    validator = StreamingJSONValidator(schema, stream_callback)
+
+    if provider == "openai":
+        _require_openai_key(settings.get("api_key"))
+        client = _get_openai_client(settings.get("api_key"))
+        # Leaving the block early (schema violation) closes the stream
+        with client.beta.chat.completions.stream(
+            model=settings["model"],
+            messages=messages,
+            response_format=schema if schema is not None else {"type": "json_object"},
+            temperature=temperature,
+        ) as stream:
+            for event in stream:
+                if event.type == "content.delta":
+                    validator.feed(event.delta)
+        return validator.result()
+
+    if provider == "ollama":
+        payload = _ollama_payload(settings["model"], messages, temperature, stream=True)
+        base_url = get_provider_config(provider).get("base_url", "http://localhost:11434")
+        with _http_session.post(f"{base_url}/api/chat", json=payload, timeout=120, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                content, done = _ollama_stream_content(line)
+                validator.feed(content)
+                if done:
+                    break
+        return validator.result()
 
     raise ValueError(f"Unsupported model provider: {provider}")
+
+
+class AsyncLLMClient:
+    """
+    Async counterpart of chat_json with pooled connections.
+    Keeps one AsyncOpenAI client per API key and one httpx.AsyncClient per
+    provider base URL, so repeated calls reuse TCP/TLS connections.
+    """
+
+    def __init__(self, timeout: float = 120.0, max_connections: int = 10):
+        self.timeout = timeout
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._openai_clients = {}
+        self._http_clients = {}
+
+    def _openai(self, api_key: Optional[str]) -> AsyncOpenAI:
+        if api_key not in self._openai_clients:
+            kwargs = {"api_key": api_key} if api_key else {}
+            self._openai_clients[api_key] = AsyncOpenAI(
+                http_client=httpx.AsyncClient(limits=self.limits, timeout=self.timeout),
+                **kwargs,
+            )
+        return self._openai_clients[api_key]
+
+    def _http(self, base_url: str) -> httpx.AsyncClient:
+        if base_url not in self._http_clients:
+            self._http_clients[base_url] = httpx.AsyncClient(
+                base_url=base_url, limits=self.limits, timeout=self.timeout
+            )
+        return self._http_clients[base_url]
+
+    async def achat_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        llm_settings: Optional[dict],
+        schema: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+        stream_callback: Optional[Callable[[str], None]] = None,
+    ) -> dict:
+        settings = resolve_llm_settings(llm_settings)
+        provider = settings["provider"]
+        model = settings["model"]
+        api_key = settings.get("api_key")
+
+        messages = _build_messages(system_prompt, user_prompt)
+        if stream_callback is not None:
+            return await self._astream_chat_json(settings, messages, schema, temperature, stream_callback)
+
+        if provider == "openai":
+            _require_openai_key(api_key)
+
+            client = self._openai(api_key)
+            if schema is not None:
+                completion = await client.beta.chat.completions.parse(
+                    model=model,
+                    messages=messages,
+                    response_format=schema,
+                    temperature=temperature,
+                )
+                return completion.choices[0].message.parsed.model_dump()
+
+            completion = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=temperature,
+            )
+            return json.loads(completion.choices[0].message.content)
+
+        if provider == "ollama":
+            payload = _ollama_payload(model, messages, temperature)
+            base_url = get_provider_config(provider).get("base_url", "http://localhost:11434")
+            response = await self._http(base_url).post("/api/chat", json=payload)
+            response.raise_for_status()
+            return _parse_ollama_response(response.json(), schema)
+
+        raise ValueError(f"Unsupported model provider: {provider}")
+
+    async def _astream_chat_json(self, settings, messages, schema, temperature, stream_callback) -> dict:
+        provider = settings["provider"]
+        validator = StreamingJSONValidator(schema, stream_callback)
+
+        if provider == "openai":
+            _require_openai_key(settings.get("api_key"))
+            client = self._openai(settings.get("api_key"))
+            async with client.beta.chat.completions.stream(
+                model=settings["model"],
+                messages=messages,
+                response_format=schema if schema is not None else {"type": "json_object"},
+                temperature=temperature,
+            ) as stream:
+                async for event in stream:
+                    if event.type == "content.delta":
+                        validator.feed(event.delta)
+            return validator.result()
+
+        if provider == "ollama":
+            payload = _ollama_payload(settings["model"], messages, temperature, stream=True)
+            base_url = get_provider_config(provider).get("base_url", "http://localhost:11434")
+            async with self._http(base_url).stream("POST", "/api/chat", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    content, done = _ollama_stream_content(line)
+                    validator.feed(content)
+                    if done:
+                        break
+            return validator.result()
+
+        raise ValueError(f"Unsupported model provider: {provider}")
+
+    async def aclose(self):
+        for client in self._openai_clients.values():
+            await client.close()
+        for client in self._http_clients.values():
+            await client.aclose()
+        self._openai_clients = {}
+        self._http_clients = {}
+
+
+# httpx/OpenAI async clients are bound to the loop they were created on,
+# and Streamlit starts a fresh loop per run, so keep one client per loop.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_llm_client() -> AsyncLLMClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = AsyncLLMClient()
+    return _async_clients[loop]
+
+
+async def achat_json(
+    system_prompt: str,
+    user_prompt: str,
+    llm_settings: Optional[dict],
+    schema: Optional[Type[BaseModel]] = None,
+    temperature: float = 0.2,
+    stream_callback: Optional[Callable[[str], None]] = None,
+) -> dict:
+    client = get_async_llm_client()
+    cache = get_llm_cache()
+    if cache is None:
+        return await client.achat_json(system_prompt, user_prompt, llm_settings, schema, temperature, stream_callback)
+
+    key = _cache_key(resolve_llm_settings(llm_settings), system_prompt, user_prompt, schema, temperature)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = await client.achat_json(system_prompt, user_prompt, llm_settings, schema, temperature, stream_callback)
+    cache.set(key, result)
+    return result
+
+
+async def close_async_llm_client():
+    """Closes the pooled clients of the running loop (call at the end of a run)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
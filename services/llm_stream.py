@@ -0,0 +1,159 @@
+import json
+import typing
+from typing import Callable, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Report streaming progress every N characters (in addition to per-field updates)
+STREAM_PROGRESS_CHARS = 1000
+
+
+class StreamSchemaError(ValueError):
+    """The partial LLM output already violates the requested schema."""
+
+
+def _list_item_type(annotation):
+    if typing.get_origin(annotation) is typing.Union:
+        # Optional[List[X]] (patch schemas)
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else annotation
+    if typing.get_origin(annotation) in (list, typing.List):
+        args = typing.get_args(annotation)
+        return args[0] if args else None
+    return None
+
+
+class StreamingJSONValidator:
+    """
+    Consumes a JSON object as it is generated and validates it piecewise.
+
+    Each top-level field is checked against the schema as soon as its value is
+    complete, and items of list fields (experience, projects, ...) as soon as
+    each item closes, so a bad generation fails long before the model finishes.
+    `progress` receives short human-readable updates.
+    """
+
+    def __init__(self, schema: Optional[Type[BaseModel]] = None, progress: Optional[Callable[[str], None]] = None):
+        self.schema = schema
+        self.progress = progress
+        self.fields = schema.model_fields if schema is not None else {}
+        self.text = ""
+        self.completed_fields = []
+        self._adapters = {}
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self._list_value = False
+        self._done = False
+        self._reported = 0
+
+    def feed(self, chunk: str):
+        start = len(self.text)
+        self.text += chunk
+        for i in range(start, len(self.text)):
+            self._step(i, self.text[i])
+        if self.progress and len(self.text) - self._reported >= STREAM_PROGRESS_CHARS:
+            self._reported = len(self.text)
+            self.progress(f"   … streaming: {len(self.text)} chars received")
+
+    def result(self) -> dict:
+        """Full validation of the finished output."""
+        try:
+            parsed = json.loads(self.text)
+        except json.JSONDecodeError as e:
+            raise StreamSchemaError(f"Incomplete JSON from model: {e}") from e
+        if self.schema is not None:
+            try:
+                return self.schema.model_validate(parsed).model_dump()
+            except ValidationError as e:
+                raise StreamSchemaError(f"Output does not match the schema: {e.errors()[0]['msg']}") from e
+        return parsed
+
+    def _step(self, i, char):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            return
+        if self._done:
+            if not char.isspace():
+                raise StreamSchemaError("Unexpected output after the JSON object")
+            return
+        if self._depth == 0 and char not in "{" and not char.isspace():
+            raise StreamSchemaError(f"Expected a JSON object, got {char!r}")
+
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+            if self._depth == 1:
+                self._member_start = i + 1
+            elif self._depth == 2 and char == "[" and self._key is not None:
+                self._list_value = True
+                self._item_start = i + 1
+        elif char in "}]":
+            if self._depth == 2 and self._list_value and char == "]":
+                self._finish_item(i)
+                self._item_start = None
+            self._depth -= 1
+            if self._depth == 0:
+                self._finish_member(i)
+                self._done = True
+        elif char == ",":
+            if self._depth == 1:
+                self._finish_member(i)
+                self._member_start = i + 1
+            elif self._depth == 2 and self._list_value:
+                self._finish_item(i)
+                self._item_start = i + 1
+        elif char == ":" and self._depth == 1 and self._key is None:
+            try:
+                self._key = json.loads(self.text[self._member_start:i])
+            except json.JSONDecodeError as e:
+                raise StreamSchemaError(f"Malformed key in model output: {e}") from e
+            self._value_start = i + 1
+            self._list_value = False
+
+    def _adapter(self, annotation):
+        key = repr(annotation)
+        if key not in self._adapters:
+            self._adapters[key] = TypeAdapter(annotation)
+        return self._adapters[key]
+
+    def _validate(self, annotation, raw, label):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise StreamSchemaError(f"Malformed JSON in '{label}': {e}") from e
+        try:
+            self._adapter(annotation).validate_python(value)
+        except ValidationError as e:
+            raise StreamSchemaError(f"'{label}' does not match the schema: {e.errors()[0]['msg']}") from e
+
+    def _finish_item(self, i):
+        field = self.fields.get(self._key)
+        raw = self.text[self._item_start:i].strip()
+        if field is None or not raw:
+            return
+        item_type = _list_item_type(field.annotation)
+        if item_type is not None:
+            self._validate(item_type, raw, f"{self._key} item")
+
+    def _finish_member(self, i):
+        if self._key is None:
+            return
+        field = self.fields.get(self._key)
+        if field is not None:
+            self._validate(field.annotation, self.text[self._value_start:i], self._key)
+        self.completed_fields.append(self._key)
+        if self.progress:
+            self.progress(f"   … received '{self._key}' ({len(self.text)} chars)")
+        self._key = None
+        self._list_value = False
@@ -0,0 +1,107 @@
+import json
+import os
+import re
+import threading
+from typing import Union
+
+MASTER_RESUME_FILE = "master_resume.json"
+
+# Ideally, calculate this dynamically, but hardcoded is fine for now
+DEFAULT_YEARS_EXPERIENCE = "Entry Level / Junior (approx 1-2 years including internships)"
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text) -> list:
+    """Lower-cased word tokens; keeps tech names like c++, c#, node.js intact."""
+    return [token.rstrip(".") for token in _TOKEN_RE.findall(str(text or "").lower())]
+
+
+class MasterResume:
+    """
+    master_resume.json parsed once and pre-digested for the agents.
+    refresh() reloads only when the file's mtime changes, so a run keeps
+    one copy in memory while edits made in the UI are still picked up.
+    """
+
+    def __init__(self, path: str = MASTER_RESUME_FILE):
+        self.path = path
+        self._version = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        stat = os.stat(self.path)
+        # Size guards against two writes landing in the same mtime tick
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if version != self._version:
+                with open(self.path, "r") as f:
+                    self._digest(json.load(f))
+                self._version = version
+        return self
+
+    def _digest(self, data: dict):
+        self.data = data
+        # Serialized once instead of per prompt
+        self.prompt_json = json.dumps(data)
+
+        self.skills = set()
+        for values in (data.get("skills") or {}).values():
+            self.skills.update(str(v).strip().lower() for v in values or [] if str(v).strip())
+        for project in data.get("projects") or []:
+            self.skills.update(str(t).strip().lower() for t in project.get("technologies") or [] if str(t).strip())
+
+        self.experience_summary = [
+            f"{job.get('position', '')} at {job.get('company', '')}" for job in data.get("experience") or []
+        ]
+        # Just the skills and roles for a cheaper token count (used by the filter)
+        self.candidate_profile = {
+            "skills": data.get("skills", {}),
+            "experience_summary": self.experience_summary,
+            "years_experience": DEFAULT_YEARS_EXPERIENCE,
+        }
+        self.profile_json = json.dumps(self.candidate_profile)
+
+        # One entry per role / project and per bullet, with tokens for relevance scoring
+        self.entries = []
+        self.bullets = []
+        for section in ("experience", "projects"):
+            for index, entry in enumerate(data.get(section) or []):
+                header = " ".join(
+                    str(entry.get(key, "")) for key in ("position", "company", "name", "description")
+                )
+                technologies = " ".join(entry.get("technologies") or [])
+                self.entries.append({
+                    "section": section,
+                    "index": index,
+                    "tokens": tokenize(f"{header} {technologies} {' '.join(entry.get('bullets') or [])}"),
+                })
+                for bullet_index, bullet in enumerate(entry.get("bullets") or []):
+                    self.bullets.append({
+                        "section": section,
+                        "index": index,
+                        "bullet": bullet_index,
+                        "text": bullet,
+                        "tokens": tokenize(bullet),
+                    })
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_master_resume(source: Union[str, MasterResume, None] = None) -> MasterResume:
+    """
+    Returns the shared MasterResume for a path (or passes an instance through),
+    reloading it if the file changed since it was last read.
+    """
+    if isinstance(source, MasterResume):
+        return source.refresh()
+    path = os.path.abspath(source or MASTER_RESUME_FILE)
+    with _instances_lock:
+        resume = _instances.get(path)
+        if resume is None:
+            resume = _instances[path] = MasterResume(path)
+            return resume
+    return resume.refresh()
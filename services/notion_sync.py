@@ -1,4 +1,3 @@
-import json
 from typing import Optional
 
 import requests
@@ -95,13 +94,10 @@ def _update_page(page_id: str, api_key: str, entry: dict) -> None:
 
 
 def sync_history_to_notion(
-    history_path: str,
+    history: list,
     database_id: str,
     api_key: str,
 ) -> dict:
-    with open(history_path, "r", encoding="utf-8") as f:
-        history = json.load(f)
-
     synced = 0
     skipped = 0
     for entry in history:
@@ -0,0 +1,137 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+PAGE_CACHE_DB = ".page_cache.db"
+DEFAULT_TTL_HOURS = 168
+# Failed / incomplete fetches (login walls, 429s) are retried sooner
+DEFAULT_NEGATIVE_TTL_HOURS = 12
+# Postings that are gone for good are kept as long as successful ones
+GONE_STATUSES = (404, 410)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_cache (
+    url TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    status INTEGER,
+    ok INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_page_cache_fetched_at ON page_cache (fetched_at);
+"""
+
+PAGE_FIELDS = ("title", "company", "description")
+
+
+class PageCache:
+    """
+    Disk-backed cache of enriched job pages keyed by canonical job URL.
+    Page data is stored zlib-compressed with its HTTP status and fetch time.
+    Complete pages live for `ttl_hours`, incomplete ones (negative entries)
+    for `negative_ttl_hours`. hits / negative_hits / misses are counted per process.
+    """
+
+    def __init__(
+        self,
+        db_path: str = PAGE_CACHE_DB,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        negative_ttl_hours: float = DEFAULT_NEGATIVE_TTL_HOURS,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+        self.negative_ttl_seconds = negative_ttl_hours * 3600
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def _ttl(self, ok, status) -> float:
+        if ok or status in GONE_STATUSES:
+            return self.ttl_seconds
+        return self.negative_ttl_seconds
+
+    def get(self, url: str) -> Optional[dict]:
+        """Cached page data (plus status / fetched_at), or None when missing or stale."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, status, ok, fetched_at FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None or now - row[3] > self._ttl(row[2], row[1]):
+                self.misses += 1
+                return None
+            if row[2]:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        data = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+        data.update({"status": row[1], "fetched_at": row[3]})
+        return data
+
+    def set(self, url: str, data: dict, ok: bool):
+        now = time.time()
+        payload = zlib.compress(
+            json.dumps({field: data.get(field) for field in PAGE_FIELDS}).encode("utf-8")
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_cache (url, data, status, ok, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, payload, data.get("status"), int(bool(ok)), now),
+            )
+            self._conn.execute(
+                "DELETE FROM page_cache WHERE fetched_at < ?",
+                (now - max(self.ttl_seconds, self.negative_ttl_seconds),),
+            )
+
+    def reset_stats(self):
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": ((self.hits + self.negative_hits) / total) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_page_cache: Optional[PageCache] = None
+_cache_enabled = True
+
+
+def configure_page_cache(
+    enabled: bool = True,
+    ttl_hours: float = DEFAULT_TTL_HOURS,
+    negative_ttl_hours: float = DEFAULT_NEGATIVE_TTL_HOURS,
+):
+    """Applies profile settings to the shared cache (creating it on first use)."""
+    global _cache_enabled
+    _cache_enabled = enabled
+    cache = get_page_cache()
+    if cache is not None:
+        cache.ttl_seconds = ttl_hours * 3600
+        cache.negative_ttl_seconds = negative_ttl_hours * 3600
+    return cache
+
+
+def get_page_cache() -> Optional[PageCache]:
+    global _page_cache
+    if not _cache_enabled:
+        return None
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
@@ -0,0 +1,63 @@
+import random
+import time
+
+import pandas as pd
+import pytest
+
+from agents.search_agent import filter_scraped_jobs
+
+ROWS = 10_000
+BLACKLIST = ["Manager", "Senior", "Director", "Principal", "Staff"]
+
+
+def _synthetic_frame(rows=ROWS, seed=7):
+    rng = random.Random(seed)
+    levels = ["", "Senior ", "Junior ", "Staff ", "Lead ", "Associate "]
+    roles = ["Software Engineer", "Data Analyst", "Engineering Manager", "Developer", "SRE"]
+    return pd.DataFrame({
+        "title": [rng.choice(levels) + rng.choice(roles) for _ in range(rows)],
+        "company": [f"Company {i % 500}" if i % 37 else None for i in range(rows)],
+        "job_url": [f"https://example.com/job/{i}" for i in range(rows)],
+        "description": [
+            None if i % 53 == 0 else "Python services and APIs. " * rng.randint(1, 300)
+            for i in range(rows)
+        ],
+    })
+
+
+def _iterrows_reference(df, blacklist):
+    """The pre-vectorization loop, kept here as the benchmark baseline."""
+    valid_jobs = []
+    for _, row in df.iterrows():
+        title = str(row.get('title', ''))
+        desc = row.get('description', '')
+        if any(bad_word.lower() in title.lower() for bad_word in blacklist):
+            continue
+        if desc and len(str(desc)) > 100:
+            valid_jobs.append({"url": row.get('job_url', ''), "description": str(desc)[:5000]})
+    return valid_jobs
+
+
+@pytest.mark.benchmark
+def test_vectorized_postprocess_matches_and_beats_iterrows(capsys):
+    """
+    Scenario: 10k synthetic scraped rows with blacklisted titles, short and missing descriptions.
+    Expected: Same jobs kept as the old row loop, in a fraction of the time.
+    """
+    df = _synthetic_frame()
+
+    started = time.perf_counter()
+    reference = _iterrows_reference(df, BLACKLIST)
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = filter_scraped_jobs(df, BLACKLIST)
+    vector_seconds = time.perf_counter() - started
+    capsys.readouterr()  # drop the per-title "Filtered Blacklisted Job" lines
+
+    assert [job["url"] for job in vectorized] == [job["url"] for job in reference]
+    assert [job["description"] for job in vectorized] == [job["description"] for job in reference]
+    with capsys.disabled():
+        print(f"\n   iterrows: {loop_seconds * 1000:.0f} ms | vectorized: {vector_seconds * 1000:.0f} ms "
+              f"({ROWS} rows, {len(vectorized)} kept)")
+    assert vector_seconds < loop_seconds
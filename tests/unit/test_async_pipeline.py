@@ -0,0 +1,83 @@
+import asyncio
+
+from utils.async_pipeline import StagedPipeline
+
+
+async def _source(items):
+    for item in items:
+        yield item
+
+
+def test_items_flow_through_stages_and_drops_are_respected():
+    """
+    Scenario: Odd numbers are dropped by stage 1, stage 2 records the rest.
+    Expected: Only even items reach the last stage.
+    """
+    seen = []
+
+    async def only_even(n):
+        await asyncio.sleep(0)
+        return n if n % 2 == 0 else None
+
+    async def record(n):
+        seen.append(n)
+
+    pipeline = StagedPipeline(queue_size=2)
+    pipeline.add_stage("filter", only_even, concurrency=3)
+    pipeline.add_stage("record", record)
+    asyncio.run(pipeline.run(_source(range(10))))
+
+    assert sorted(seen) == [0, 2, 4, 6, 8]
+
+
+def test_stop_cancels_in_flight_work():
+    """
+    Scenario: The last stage calls stop() after the first result.
+    Expected: run() returns promptly and slow in-flight items never finish.
+    """
+    finished = []
+
+    async def slow(n):
+        await asyncio.sleep(0 if n == 0 else 5)
+        return n
+
+    async def record(n):
+        finished.append(n)
+        pipeline.stop()
+
+    pipeline = StagedPipeline(queue_size=2)
+    pipeline.add_stage("slow", slow, concurrency=4)
+    pipeline.add_stage("record", record)
+
+    async def run():
+        await asyncio.wait_for(pipeline.run(_source(range(8))), timeout=2)
+
+    asyncio.run(run())
+    assert finished == [0]
+    assert pipeline.stopped
+
+
+def test_batch_stage_receives_lists_and_keeps_order_of_results():
+    """
+    Scenario: A batch stage with batch_size=3 sits between two per-item stages.
+    Expected: The handler gets lists of at most 3 items and its None entries are dropped.
+    """
+    batches = []
+    seen = []
+
+    async def batch_filter(items):
+        batches.append(list(items))
+        return [n if n % 2 == 0 else None for n in items]
+
+    async def record(n):
+        seen.append(n)
+
+    pipeline = StagedPipeline(queue_size=1)
+    pipeline.add_stage("filter", batch_filter, batch_size=3, batch_wait=0.05)
+    pipeline.add_stage("record", record)
+    asyncio.run(pipeline.run(_source(range(7))))
+
+    assert sorted(seen) == [0, 2, 4, 6]
+    assert all(1 <= len(batch) <= 3 for batch in batches)
+    assert sorted(n for batch in batches for n in batch) == list(range(7))
+    assert len(batches) < 7
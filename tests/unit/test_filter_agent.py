@@ -0,0 +1,108 @@
+import json
+import re
+from unittest.mock import patch
+
+from agents.filter_agent import JobAssessment, assess_jobs_batch, load_candidate_skills, prefilter_job, required_years
+
+
+def _master(tmp_path):
+    path = tmp_path / "master_resume.json"
+    path.write_text(json.dumps({
+        "skills": {"languages": ["Python"]},
+        "experience": [{"position": "Developer", "company": "Acme"}],
+    }))
+    return str(path)
+
+
+def test_batch_scores_jobs_with_one_call_per_chunk(tmp_path):
+    """
+    Scenario: Five JDs with batch_size=3; the model answers out of order.
+    Expected: Two LLM calls, the profile is sent once per call, results come back in input order.
+    """
+    calls = []
+
+    def fake_chat_json(system_prompt, user_prompt, llm_settings, schema, **kwargs):
+        calls.append(user_prompt)
+        count = len(re.findall(r"JOB \d+:", user_prompt))
+        return {"assessments": [
+            {"job_id": i, "match_score": 70 + i, "is_suitable": True, "reasoning": "ok"}
+            for i in reversed(range(count))
+        ]}
+
+    with patch("agents.filter_agent.chat_json", side_effect=fake_chat_json), \
+         patch("agents.filter_agent._missing_openai_key", return_value=False):
+        results = assess_jobs_batch([f"jd {i}" for i in range(5)], _master(tmp_path), batch_size=3)
+
+    assert len(calls) == 2
+    assert all(call.count("CANDIDATE PROFILE") == 1 for call in calls)
+    assert [r.match_score for r in results] == [70, 71, 72, 70, 71]
+
+
+def test_jobs_missing_from_batch_answer_fall_back_to_single_calls(tmp_path):
+    """
+    Scenario: The model only answers for job 0 of a batch of two.
+    Expected: Job 1 is re-assessed on its own.
+    """
+    def fake_chat_json(system_prompt, user_prompt, llm_settings, schema, **kwargs):
+        return {"assessments": [{"job_id": 0, "match_score": 80, "is_suitable": True, "reasoning": "ok"}]}
+
+    single = JobAssessment(match_score=10, is_suitable=False, reasoning="single")
+    with patch("agents.filter_agent.chat_json", side_effect=fake_chat_json), \
+         patch("agents.filter_agent._missing_openai_key", return_value=False), \
+         patch("agents.filter_agent.assess_job_suitability", return_value=single) as fallback:
+        results = assess_jobs_batch(["jd a", "jd b"], _master(tmp_path))
+
+    assert [r.match_score for r in results] == [80, 10]
+    fallback.assert_called_once()
+
+
+def test_prefilter_decides_only_obvious_cases(tmp_path):
+    """
+    Scenario: Senior title, 5+ years, foreign stack, a strong junior match and an ambiguous JD.
+    Expected: The first four are decided locally; the ambiguous one is left to the LLM.
+    """
+    skills = load_candidate_skills(_master(tmp_path)) | {"react", "docker", "aws"}
+
+    assert not prefilter_job("Python and React.", skills, "Senior Software Engineer").is_suitable
+    assert not prefilter_job("Requires 5+ years of professional experience.", skills, "Software Engineer").is_suitable
+    assert not prefilter_job("Low-level work in Rust and Go.", skills, "Software Engineer").is_suitable
+
+    accepted = prefilter_job("Python, React and Docker on AWS. 0-2 years of experience.", skills, "Junior Developer")
+    assert accepted.is_suitable and accepted.match_score >= 60
+
+    assert prefilter_job("Backend services in Python.", skills, "Software Engineer") is None
+
+
+def test_prefilter_leaves_weak_signals_to_the_llm(tmp_path):
+    """
+    Scenario: Company-age years text, manager/lead titles, junior titles next to any 3+ years
+              figure (however it is phrased), and a strong junior match in a specialised domain.
+    Expected: None of them is decided locally.
+    """
+    skills = load_candidate_skills(_master(tmp_path))
+
+    company_age = "We bring 20 years of experience serving clients. Python and React."
+    assert required_years(company_age) is None
+    assert required_years("Our firm has 15+ years of experience in fintech.") is None
+    assert prefilter_job(company_age, skills, "Software Engineer") is None
+    assert prefilter_job("Python services.", skills, "Engineering Manager Trainee") is None
+    assert prefilter_job("Python services.", skills, "Team Lead, Support Tools") is None
+    assert prefilter_job("Minimum of 5 years of experience. Python.", skills, "Junior Developer") is None
+    assert prefilter_job(
+        "Python, React and Docker for quantitative trading research.", skills, "Junior Developer"
+    ) is None
+
+    assert required_years("At least 3-5 years of experience with Python.") == 3
+    assert required_years("Requires 4 years of professional experience.") == 4
+    assert required_years("We require 5+ years of professional experience.") == 5
+    assert required_years("Looking for 7+ years of experience with Python.") == 7
+    assert required_years("5 years of experience required.") == 5
+    assert required_years("Our company has over 10 years of experience in retail.") is None
+    assert required_years("Trusted by clients for over 12 years of experience in design.") is None
+    for requirement in (
+        "We require 5+ years of professional experience.",
+        "Looking for 7+ years of experience.",
+        "5 years of experience required.",
+        "3 years in a similar role.",
+    ):
+        assert prefilter_job(f"{requirement} Python, React and Docker.", skills, "Junior Developer") is None
@@ -1,16 +1,48 @@
+import asyncio
 import base64
+import json
 from unittest.mock import patch, MagicMock
-from services.google.gmail_job_agent import fetch_job_urls_from_gmail
+
+from googleapiclient.errors import HttpError
+
+from services.google.gmail_job_agent import enrich_jobs_with_page_data, fetch_job_urls_from_gmail
+
+
+class FakeBatch:
+    """Stands in for BatchHttpRequest: runs the queued requests on execute()."""
+
+    def __init__(self, callback, log):
+        self.callback = callback
+        self.requests = []
+        log.append(self)
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+def _encoded(html):
+    return base64.urlsafe_b64encode(html.encode("utf-8")).decode("utf-8")
+
 
 @patch("services.google.gmail_job_agent.get_google_service")
-def test_gmail_parsing_logic(mock_get_service):
+def test_gmail_parsing_logic(mock_get_service, tmp_path):
     # Setup Mock
     mock_service = MagicMock()
     mock_get_service.return_value = mock_service
+    mock_service.users().getProfile.return_value.execute.return_value = {"historyId": "500"}
+    batches = []
+    mock_service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback, batches)
 
     # Fake HTML and Gmail-style base64url encoding
     html = "<html><body><a href='https://www.linkedin.com/jobs/view/999999'>Apply Now</a></body></html>"
-    fake_encoded_html = base64.urlsafe_b64encode(html.encode("utf-8")).decode("utf-8")
+    fake_encoded_html = _encoded(html)
 
     # Mock list/get responses
     mock_service.users().messages().list.return_value.execute.return_value = {
@@ -24,8 +56,225 @@ def test_gmail_parsing_logic(mock_get_service):
     }
 
     # Run
-    jobs = fetch_job_urls_from_gmail(max_results=1)
+    jobs = fetch_job_urls_from_gmail(max_results=1, state_path=str(tmp_path / "sync.json"))
 
     # Assert
     assert len(jobs) == 1
     assert jobs[0]["company"] == "LinkedIn Import"
+    assert len(batches) == 1
+    mock_service.users().messages().batchModify.assert_called_once_with(
+        userId="me", body={"ids": ["1"], "removeLabelIds": ["UNREAD"]}
+    )
+
+
+@patch("services.google.gmail_job_agent.get_google_service")
+def test_gmail_pages_batches_and_marks_read_in_bulk(mock_get_service, tmp_path):
+    """
+    Scenario: 120 unread alerts over two list pages; email '7' fails to download and
+              every email is multipart with the HTML nested under multipart/alternative.
+    Expected: 3 batched fetches (50/50/20), one batchModify for the 119 fetched emails,
+              one job per fetched email.
+    """
+    mock_service = MagicMock()
+    mock_get_service.return_value = mock_service
+    batches = []
+    mock_service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback, batches)
+    messages = mock_service.users().messages()
+    mock_service.users().getProfile.return_value.execute.return_value = {"historyId": "500"}
+
+    pages = {
+        None: {"messages": [{"id": str(i)} for i in range(100)], "nextPageToken": "p2"},
+        "p2": {"messages": [{"id": str(i)} for i in range(100, 130)]},
+    }
+    messages.list.side_effect = lambda **kwargs: MagicMock(
+        execute=MagicMock(return_value=pages[kwargs.get("pageToken")])
+    )
+
+    def fake_get(userId, id, format, fields):
+        request = MagicMock()
+        if id == "7":
+            request.execute.side_effect = RuntimeError("backend error")
+        else:
+            html = f"<a href='https://www.linkedin.com/comm/jobs/view/{id}?trackingId=x'>Job</a>"
+            request.execute.return_value = {"id": id, "payload": {
+                "mimeType": "multipart/mixed",
+                "parts": [{"mimeType": "multipart/alternative", "parts": [
+                    {"mimeType": "text/plain", "body": {"data": _encoded("plain")}},
+                    {"mimeType": "text/html", "body": {"data": _encoded(html)}},
+                ]}],
+            }}
+        return request
+
+    messages.get.side_effect = fake_get
+
+    jobs = fetch_job_urls_from_gmail(max_results=120, state_path=str(tmp_path / "sync.json"))
+
+    assert [len(batch.requests) for batch in batches] == [50, 50, 20]
+    assert len(jobs) == 119
+    assert jobs[0]["url"] == "https://www.linkedin.com/jobs/view/0"
+    modify_ids = messages.batchModify.call_args.kwargs["body"]["ids"]
+    assert messages.batchModify.call_count == 1
+    assert len(modify_ids) == 119 and "7" not in modify_ids
+    assert messages.list.call_args_list[1].kwargs["maxResults"] == 20
+
+
+def _alert_service(senders, batches):
+    """Mock Gmail service whose message `id` was sent by `senders[id]` and links to job `id`."""
+    service = MagicMock()
+    service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback, batches)
+    messages = service.users().messages()
+
+    def fake_get(userId, id, format, fields, **kwargs):
+        request = MagicMock()
+        if format == "metadata":
+            request.execute.return_value = {
+                "id": id, "payload": {"headers": [{"name": "From", "value": senders[id]}]},
+            }
+        else:
+            html = f"<a href='https://www.linkedin.com/jobs/view/{id}'>Job</a>"
+            request.execute.return_value = {"id": id, "payload": {"mimeType": "text/html", "body": {"data": _encoded(html)}}}
+        return request
+
+    messages.get.side_effect = fake_get
+    return service
+
+
+@patch("services.google.gmail_job_agent.get_google_service")
+def test_gmail_syncs_incrementally_from_the_stored_history_id(mock_get_service, tmp_path):
+    """
+    Scenario: The stored historyId is 100; history reports (over two pages) a newsletter,
+              an already-processed alert and two new alerts, one of which the user already opened.
+    Expected: Only the two new alerts are downloaded in full; no unread query is run;
+              the state moves to the latest historyId and remembers the new ids.
+    """
+    state_path = tmp_path / "sync.json"
+    state_path.write_text(json.dumps({"history_id": "100", "processed_ids": ["11"]}))
+    senders = {
+        "10": "News <news@example.com>",
+        "11": "LinkedIn Job Alerts <jobalerts-noreply@linkedin.com>",
+        "12": "LinkedIn Job Alerts <jobalerts-noreply@linkedin.com>",
+        "13": "jobalerts-noreply@linkedin.com",
+    }
+    batches = []
+    service = _alert_service(senders, batches)
+    mock_get_service.return_value = service
+    history_pages = {
+        None: {"history": [{"messagesAdded": [{"message": {"id": "10"}}, {"message": {"id": "11"}}]}],
+               "nextPageToken": "h2", "historyId": "140"},
+        "h2": {"history": [{"messagesAdded": [{"message": {"id": "12"}}]},
+                           {"messagesAdded": [{"message": {"id": "13"}}]}], "historyId": "150"},
+    }
+    service.users().history().list.side_effect = lambda **kwargs: MagicMock(
+        execute=MagicMock(return_value=history_pages[kwargs.get("pageToken")])
+    )
+
+    jobs = fetch_job_urls_from_gmail(max_results=10, state_path=str(state_path))
+
+    assert [job["url"] for job in jobs] == [
+        "https://www.linkedin.com/jobs/view/12", "https://www.linkedin.com/jobs/view/13",
+    ]
+    assert service.users().history().list.call_args_list[0].kwargs["startHistoryId"] == "100"
+    service.users().messages().list.assert_not_called()
+    assert [len(batch.requests) for batch in batches] == [3, 2]  # metadata for 10/12/13, then bodies
+    state = json.loads(state_path.read_text())
+    assert state["history_id"] == "150"
+    assert state["processed_ids"] == ["11", "12", "13"]
+
+
+@patch("services.google.gmail_job_agent.get_google_service")
+def test_gmail_falls_back_to_a_bounded_query_when_history_expired(mock_get_service, tmp_path):
+    """
+    Scenario: history.list answers 404 for the stored historyId.
+    Expected: A date-bounded sender query (no is:unread) is used, processed ids are skipped,
+              and the profile's current historyId is stored for next time.
+    """
+    state_path = tmp_path / "sync.json"
+    state_path.write_text(json.dumps({"history_id": "1", "processed_ids": ["21"]}))
+    senders = {"20": "jobalerts-noreply@linkedin.com", "21": "jobalerts-noreply@linkedin.com"}
+    batches = []
+    service = _alert_service(senders, batches)
+    mock_get_service.return_value = service
+    service.users().history().list.return_value.execute.side_effect = HttpError(
+        MagicMock(status=404), b"Requested entity was not found."
+    )
+    service.users().getProfile.return_value.execute.return_value = {"historyId": "900"}
+    service.users().messages().list.return_value.execute.return_value = {"messages": [{"id": "20"}, {"id": "21"}]}
+
+    jobs = fetch_job_urls_from_gmail(max_results=5, state_path=str(state_path))
+
+    query = service.users().messages().list.call_args.kwargs["q"]
+    assert "newer_than:3d" in query and "is:unread" not in query
+    assert [job["url"] for job in jobs] == ["https://www.linkedin.com/jobs/view/20"]
+    state = json.loads(state_path.read_text())
+    assert state["history_id"] == "900"
+    assert state["processed_ids"] == ["21", "20"]
+
+
+@patch("services.google.gmail_job_agent.get_google_service")
+def test_gmail_list_backlog_does_not_advance_the_history_id(mock_get_service, tmp_path):
+    """
+    Scenario: First run with max_results=2 while three alerts are waiting.
+    Expected: No historyId is stored until a list pass drains the backlog, so the
+              third alert is fetched by the next run instead of being skipped.
+    """
+    state_path = str(tmp_path / "sync.json")
+    senders = {i: "jobalerts-noreply@linkedin.com" for i in ("30", "31", "32")}
+    batches = []
+    service = _alert_service(senders, batches)
+    mock_get_service.return_value = service
+    service.users().getProfile.return_value.execute.return_value = {"historyId": "700"}
+
+    def fake_list(**kwargs):
+        ids = ["30", "31", "32"][:kwargs["maxResults"]]
+        page = {"messages": [{"id": i} for i in ids]}
+        if len(ids) < 3:
+            page["nextPageToken"] = "more"
+        return MagicMock(execute=MagicMock(return_value=page))
+
+    service.users().messages().list.side_effect = fake_list
+
+    first = fetch_job_urls_from_gmail(max_results=2, state_path=state_path)
+    assert len(first) == 2
+    assert json.loads(open(state_path).read())["history_id"] is None
+
+    second = fetch_job_urls_from_gmail(max_results=2, state_path=state_path)
+    assert [job["url"] for job in second] == ["https://www.linkedin.com/jobs/view/32"]
+    state = json.loads(open(state_path).read())
+    assert state["history_id"] == "700"
+    assert state["processed_ids"] == ["30", "31", "32"]
+    service.users().history().list.assert_not_called()
+
+
+def test_enrichment_is_bounded_and_shares_the_browser_pool():
+    """
+    Scenario: 6 email jobs enriched with concurrency 2 on a given pool; one page fetch fails.
+    Expected: At most 2 fetches in flight, every fetch uses that pool, placeholders survive the failure.
+    """
+    pool = object()
+    active = []
+    peak = []
+    pools = set()
+
+    async def fake_fetch(url, browser_pool=None):
+        pools.add(browser_pool)
+        active.append(url)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(url)
+        if url.endswith("/3"):
+            raise RuntimeError("timeout")
+        return {"title": f"Engineer {url[-1]}", "company": "Acme", "description": "Real description"}
+
+    jobs = [
+        {"url": f"https://www.linkedin.com/jobs/view/{i}", "title": "Detected via Email",
+         "company": "LinkedIn Import", "description": ""}
+        for i in range(6)
+    ]
+    with patch("services.google.gmail_job_agent.fetch_job_page_data", side_effect=fake_fetch):
+        enriched = asyncio.run(enrich_jobs_with_page_data(jobs, concurrency=2, browser_pool=pool))
+
+    assert max(peak) == 2
+    assert pools == {pool}
+    assert all(job["_enriched"] for job in enriched)
+    assert jobs[0]["title"] == "Engineer 0" and jobs[0]["company"] == "Acme"
+    assert jobs[3]["title"] == "Detected via Email" and jobs[3]["description"] == ""
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime, timedelta
+
+from services.history_store import DedupIndex, HistoryStore
+
+
+def test_migrates_legacy_json_once(tmp_path):
+    """
+    Scenario: A history.json from an older version exists.
+    Expected: Entries are imported into SQLite and the JSON file is renamed.
+    """
+    legacy = tmp_path / "history.json"
+    legacy.write_text(json.dumps([
+        {"url": "https://a.com/1", "title": "SWE", "company": "Acme", "date": "2024-01-01", "status": "GENERATED"},
+        {"url": "https://a.com/2", "title": "SRE", "company": "Acme", "date": "2024-01-02", "status": "FILTERED_OUT"},
+    ]))
+
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_json_path=str(legacy))
+
+    assert store.count() == 2
+    assert not legacy.exists()
+    assert (tmp_path / "history.json.migrated").exists()
+
+    # Re-opening must not import twice
+    store.close()
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_json_path=str(legacy))
+    assert store.count() == 2
+
+
+def test_duplicate_by_url_and_recent_company_title(tmp_path):
+    """
+    Scenario: One job recorded today, another 90 days ago.
+    Expected: URL always matches; (company, title) only matches inside the 60-day window.
+    """
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_json_path=None)
+    old_date = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
+
+    store.add("https://a.com/1", "Software Engineer", "Acme Inc.", "GENERATED")
+    store.add("https://a.com/old", "Data Engineer", "Globex", "GENERATED", date=old_date)
+
+    assert store.is_duplicate("https://a.com/1", "", "")
+    assert store.is_duplicate("https://other.com/9", "software engineer", "ACME inc")
+    assert store.is_duplicate("https://a.com/old", "x", "y")
+    assert not store.is_duplicate("https://other.com/10", "Data Engineer", "Globex")
+
+
+def test_dedup_index_snapshot_and_incremental_add(tmp_path):
+    """
+    Scenario: Index is built from the store, then a new job is recorded mid-run.
+    Expected: Both pre-existing and newly added jobs are detected without touching the DB.
+    """
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_json_path=None)
+    old_date = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
+    store.add("https://a.com/1", "Software Engineer", "Acme", "GENERATED")
+    store.add("https://a.com/old", "Data Engineer", "Globex", "GENERATED", date=old_date)
+
+    index = DedupIndex.from_store(store, window_days=60)
+    store.close()
+
+    assert index.is_duplicate("https://a.com/1", "", "")
+    assert index.is_duplicate("https://b.com/2", "Software-Engineer", "acme")
+    assert not index.is_duplicate("https://b.com/3", "Data Engineer", "Globex")
+
+    index.add("https://b.com/4", "ML Engineer", "Initech")
+    assert index.is_duplicate("https://b.com/5", "ml engineer", "INITECH")
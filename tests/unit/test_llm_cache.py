@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+from services.llm_cache import LLMCache, make_cache_key
+from services import llm_client
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    """
+    Scenario: Cache holds 2 entries; 'a' is read before 'c' is inserted.
+    Expected: 'b' (least recently used) is evicted, 'a' and 'c' survive.
+    """
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl_hours=1, max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl_hours=0)
+    cache.set("a", {"v": 1})
+    assert cache.get("a") is None
+
+
+def test_cache_key_depends_on_every_request_field():
+    base = ("ollama", "llama3.1:8b", 0.2, "sys", "user", "Resume")
+    assert make_cache_key(*base) == make_cache_key(*base)
+    for i, changed in enumerate(["openai", "gpt-4o", 0.3, "sys2", "user2", "Critique"]):
+        variant = list(base)
+        variant[i] = changed
+        assert make_cache_key(*variant) != make_cache_key(*base)
+
+
+def test_chat_json_serves_repeat_prompts_from_cache(tmp_path):
+    """
+    Scenario: The same prompt is sent twice.
+    Expected: The provider is only called once.
+    """
+    cache = LLMCache(str(tmp_path / "cache.db"))
+    with patch("services.llm_client.get_llm_cache", return_value=cache), \
+         patch("services.llm_client._chat_json", return_value={"ok": True}) as mock_call:
+        first = llm_client.chat_json("sys", "user", None)
+        second = llm_client.chat_json("sys", "user", None)
+
+    assert first == second == {"ok": True}
+    assert mock_call.call_count == 1
@@ -0,0 +1,74 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agents.proofread_agent import Critique
+from agents.tailor_agent import Resume
+from services import llm_client
+from services.llm_stream import StreamingJSONValidator, StreamSchemaError
+
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_streamed_object_is_validated_field_by_field():
+    """
+    Scenario: A valid Critique arrives in small chunks.
+    Expected: Each field is reported as it completes and the final result validates.
+    """
+    messages = []
+    validator = StreamingJSONValidator(Critique, messages.append)
+    payload = {"content_passed": True, "missing_keywords": ["Go", "K8s"], "feedback": "Fine, \"ok\"."}
+    for chunk in _chunks(json.dumps(payload)):
+        validator.feed(chunk)
+
+    assert validator.result() == payload
+    assert validator.completed_fields == ["content_passed", "missing_keywords", "feedback"]
+    assert any("missing_keywords" in m for m in messages)
+
+
+def test_bad_list_item_aborts_before_generation_finishes():
+    """
+    Scenario: The first experience entry is missing required fields.
+    Expected: StreamSchemaError is raised as soon as that item closes.
+    """
+    validator = StreamingJSONValidator(Resume)
+    partial = '{"experience": [{"company": "Acme", "bullets": "not a list"}, {"company": '
+    with pytest.raises(StreamSchemaError, match="experience item"):
+        for chunk in _chunks(partial):
+            validator.feed(chunk)
+
+
+def test_non_json_preamble_is_rejected():
+    with pytest.raises(StreamSchemaError):
+        StreamingJSONValidator(Critique).feed("Sure! Here is the JSON: {")
+
+
+def test_ollama_stream_stops_reading_after_schema_violation():
+    """
+    Scenario: Ollama streams a Critique whose first field has the wrong type.
+    Expected: The call fails early and the rest of the stream is never read.
+    """
+    body = '{"content_passed": "maybe", "missing_keywords": [], "feedback": "x"}'
+    lines = [json.dumps({"message": {"content": c}, "done": False}).encode() for c in _chunks(body, 5)]
+    consumed = []
+
+    def iter_lines():
+        for line in lines:
+            consumed.append(line)
+            yield line
+
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_lines.side_effect = iter_lines
+
+    with patch.object(llm_client._http_session, "post", return_value=response):
+        with pytest.raises(StreamSchemaError):
+            llm_client._chat_json(
+                "sys", "user", {"provider": "ollama", "model": "m"}, Critique,
+                stream_callback=lambda msg: None,
+            )
+
+    assert len(consumed) < len(lines)
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import main
+from services.history_store import HistoryStore
+
+
+class _FakeSession:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.served = 0
+        self.fetches = 1
+        self.cache_hits = 0
+
+    def next_batch(self, size):
+        batch = self.batches.pop(0) if self.batches else []
+        self.served += len(batch)
+        return batch
+
+
+def _job(url):
+    return {
+        "url": url,
+        "title": "Backend Engineer",
+        "company": "Acme Corp",
+        "description": "Build Python services and REST APIs for our platform team. " * 3,
+    }
+
+
+def test_same_posting_from_two_sources_gets_exactly_one_resume(tmp_path, monkeypatch):
+    """
+    Scenario: The same posting arrives twice (LinkedIn and Indeed URLs) in one batch.
+    Expected: One copy is tailored and recorded GENERATED, the other is recorded Duplicate.
+    """
+    monkeypatch.chdir(tmp_path)
+    store = HistoryStore(str(tmp_path / "history.db"))
+    session = _FakeSession([[_job("https://www.linkedin.com/jobs/view/1"), _job("https://www.indeed.com/viewjob?jk=1")]])
+    browser_pool = MagicMock(start=AsyncMock(), close=AsyncMock(), launches=0)
+    draft = AsyncMock(return_value=str(tmp_path / "tailored.json"))
+
+    async def assess(descriptions, *args, **kwargs):
+        return [SimpleNamespace(is_suitable=True, match_score=90) for _ in descriptions]
+
+    with patch("main._history_store", store), \
+         patch("main.resolve_llm_settings", return_value={"provider": "openai", "model": "m"}), \
+         patch("main.is_model_available", return_value=True), \
+         patch("main.send_start_notification"), \
+         patch("main.configure_llm_cache", return_value=None), \
+         patch("main.configure_page_cache", return_value=None), \
+         patch("main.get_master_resume", return_value=MagicMock(skills=[])), \
+         patch("main.BrowserPool", return_value=browser_pool), \
+         patch("main.ScrapeSession", return_value=session), \
+         patch("main.aassess_jobs_batch", side_effect=assess), \
+         patch("main.draft_resume_content", draft), \
+         patch("main.layout_resume", new=AsyncMock(return_value={"page_count": 1})), \
+         patch("main.close_async_llm_client", new=AsyncMock()), \
+         patch("main.close_page_http_client", new=AsyncMock()):
+        asyncio.run(main.run_daily_workflow(
+            "Engineer", "NY", target_successes=2, safety_limit=10, enable_discord=False,
+            scrape_config={"hours_old": 24, "sites": ["linkedin", "indeed"], "local_prefilter": False,
+                           "filter_batch_wait": 0.05},
+        ))
+
+    statuses = sorted(entry["status"] for entry in store.all())
+    assert draft.await_count == 1
+    assert statuses == ["Duplicate", "GENERATED"]
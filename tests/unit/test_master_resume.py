@@ -0,0 +1,39 @@
+import json
+import os
+
+from services.master_resume import get_master_resume, tokenize
+
+
+def _write(path, data, mtime=None):
+    path.write_text(json.dumps(data))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_master_resume_is_digested_once_and_reloaded_on_change(tmp_path):
+    """
+    Scenario: The master resume is requested twice, then edited on disk.
+    Expected: The same digested instance is reused until the file changes.
+    """
+    path = tmp_path / "master_resume.json"
+    _write(path, {
+        "skills": {"languages": ["Python", "C++"]},
+        "experience": [{"position": "Intern", "company": "Acme", "bullets": ["Built APIs in Node.js."]}],
+        "projects": [{"name": "Bot", "technologies": ["Streamlit"], "bullets": []}],
+    }, mtime=1_000_000)
+
+    first = get_master_resume(str(path))
+    assert get_master_resume(str(path)) is first
+    assert first.skills == {"python", "c++", "streamlit"}
+    assert first.experience_summary == ["Intern at Acme"]
+    assert json.loads(first.profile_json)["experience_summary"] == ["Intern at Acme"]
+    assert first.bullets[0]["tokens"] == ["built", "apis", "in", "node.js"]
+
+    _write(path, {"skills": {"languages": ["Go"]}}, mtime=2_000_000)
+    second = get_master_resume(first)
+    assert second is first
+    assert first.skills == {"go"}
+
+
+def test_tokenize_keeps_tech_names():
+    assert tokenize("C#, C++ and Next.js.") == ["c#", "c++", "and", "next.js"]
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from agents.search_agent import PageFetchStats, fetch_job_page_data
+from services.page_cache import PageCache
+from utils.url_utils import canonical_job_url
+
+DESC = "Build and maintain Python services. " * 5
+
+
+def test_canonical_job_url_collapses_linkedin_variants():
+    """
+    Scenario: The same LinkedIn posting arrives via an email /comm/ link with tracking,
+              a slugged web URL and the bare /jobs/view/<id> form.
+    Expected: All three map to one key; other sites only lose tracking params and fragment.
+    """
+    variants = [
+        "https://www.linkedin.com/comm/jobs/view/4012345678/?trackingId=abc%3D&refId=x",
+        "https://LinkedIn.com/jobs/view/backend-engineer-at-acme-4012345678?position=3",
+        "https://www.linkedin.com/jobs/view/4012345678",
+    ]
+    assert {canonical_job_url(url) for url in variants} == {"https://www.linkedin.com/jobs/view/4012345678"}
+    assert canonical_job_url("https://www.Indeed.com/viewjob/?utm_source=x&jk=abc#top") == (
+        "https://www.indeed.com/viewjob?jk=abc"
+    )
+
+
+def test_canonical_job_url_keeps_query_ids_of_other_boards():
+    """
+    Scenario: Two Indeed postings differ only in ?jk=, two Glassdoor ones in ?jl=.
+    Expected: Each posting keeps its own key; tracking params and param order don't matter.
+    """
+    assert canonical_job_url("https://www.indeed.com/viewjob?jk=abc") != canonical_job_url(
+        "https://www.indeed.com/viewjob?jk=def"
+    )
+    assert canonical_job_url("https://www.glassdoor.com/job-listing/x.htm?jl=1&refId=9") != canonical_job_url(
+        "https://www.glassdoor.com/job-listing/x.htm?jl=2"
+    )
+    assert canonical_job_url("https://boards.greenhouse.io/acme?gh_jid=7&utm_medium=email&b=1") == (
+        canonical_job_url("https://boards.greenhouse.io/acme?b=1&gh_jid=7&trackingId=z")
+    )
+
+
+def test_negative_entries_expire_before_positive_ones(tmp_path):
+    """
+    Scenario: One complete page, one login wall (429) and one removed posting (404) are cached;
+              the negative TTL is 0 hours.
+    Expected: The login wall is a miss again, the complete and removed pages are still served.
+    """
+    cache = PageCache(str(tmp_path / "pages.db"), ttl_hours=1, negative_ttl_hours=0)
+    cache.set("ok", {"title": "Engineer", "company": "Acme", "description": DESC, "status": 200}, ok=True)
+    cache.set("wall", {"title": None, "company": None, "description": "", "status": 429}, ok=False)
+    cache.set("gone", {"title": None, "company": None, "description": "", "status": 404}, ok=False)
+
+    hit = cache.get("ok")
+    assert (hit["title"], hit["description"], hit["status"]) == ("Engineer", DESC, 200)
+    assert hit["fetched_at"] > 0
+    assert cache.get("wall") is None
+    assert cache.get("gone")["status"] == 404
+    assert cache.stats() == {"hits": 1, "negative_hits": 1, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_fetch_job_page_data_consults_the_cache_before_the_network(tmp_path):
+    """
+    Scenario: A posting is fetched via its email link, then again via a slugged web URL;
+              a login-walled posting is fetched twice.
+    Expected: Only the first fetch of each posting touches the network; repeats come from cache.
+    """
+    cache = PageCache(str(tmp_path / "pages.db"))
+    stats = PageFetchStats()
+
+    async def live(url, browser_pool=None, static_first=True):
+        if "4012345678" in url:
+            return {"title": "Engineer", "company": "Acme", "description": DESC, "status": 200, "tier": "http"}
+        return {"title": None, "company": None, "description": "", "status": 999, "tier": "browser"}
+
+    urls = [
+        "https://www.linkedin.com/comm/jobs/view/4012345678?trackingId=1",
+        "https://www.linkedin.com/jobs/view/engineer-at-acme-4012345678",
+        "https://www.linkedin.com/jobs/view/555",
+        "https://www.linkedin.com/jobs/view/555",
+    ]
+
+    async def run():
+        with patch("agents.search_agent.get_page_cache", return_value=cache), \
+             patch("agents.search_agent._fetch_live_page", new=AsyncMock(side_effect=live)) as network, \
+             patch("agents.search_agent.page_fetch_stats", stats):
+            results = [await fetch_job_page_data(url) for url in urls]
+        return results, network
+
+    results, network = asyncio.run(run())
+
+    assert network.await_count == 2
+    assert [r["tier"] for r in results] == ["http", "cache", "browser", "cache"]
+    assert results[1]["company"] == "Acme" and results[3]["status"] == 999
+    assert stats.counts == {"cache": 1, "http": 1, "browser": 0, "incomplete": 2}
@@ -0,0 +1,122 @@
+import json
+from unittest.mock import patch
+
+from agents.proofread_agent import proofread_resume, resume_to_text
+
+RESUME = {
+    "basics": {"name": "Ada Lovelace", "email": "ada@x.com", "phone": "1", "location": "London",
+               "website": "", "linkedin": "", "github": ""},
+    "education": [{"institution": "UCL", "area": "Mathematics", "studyType": "BSc",
+                   "startDate": "Sep 2020", "endDate": "May 2024", "courses": ["Algorithms"]}],
+    "skills": {"languages": ["Python"], "frameworks": ["Django"], "tools": ["Docker"]},
+    "experience": [{"company": "Acme", "position": "Intern", "startDate": "Jun 2023",
+                    "endDate": "Aug 2023", "location": "Remote", "bullets": ["Cut costs by 30%."]}],
+    "projects": [{"name": "Engine", "technologies": ["Python"], "description": "", "bullets": ["Built it."]}],
+}
+
+
+def _master_file(tmp_path, data):
+    path = tmp_path / "master_resume.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def test_proofread_audits_the_tailored_dict_without_a_pdf():
+    """
+    Scenario: The tailored dict is proofread before any PDF exists.
+    Expected: The LLM sees the resume text; page count comes from the caller.
+    """
+    llm_answer = {"content_passed": True, "missing_keywords": [], "feedback": "Good."}
+    with patch("agents.proofread_agent.chat_json", return_value=llm_answer) as chat, \
+         patch("agents.proofread_agent._missing_openai_key", return_value=False), \
+         patch("agents.proofread_agent.fitz.open") as pdf_open:
+        audit = proofread_resume(RESUME, "Python developer", page_count=1)
+
+    pdf_open.assert_not_called()
+    assert "Cut costs by 30%." in chat.call_args.kwargs["user_prompt"]
+    assert audit == {"length_passed": True, "content_passed": True, "feedback": "Good.", "page_count": 1}
+
+
+def test_resume_text_follows_template_order():
+    text = resume_to_text(RESUME)
+    assert text.index("EXPERIENCE") < text.index("PROJECTS") < text.index("EDUCATION") < text.index("SKILLS")
+    assert "Web Dev: Django" in text
+
+
+def test_mechanical_violations_fail_without_llm(tmp_path):
+    """
+    Scenario: The draft drops a bullet and its metric, and uses an ISO date.
+    Expected: Feedback comes back from the local checks and chat_json is never called.
+    """
+    master = {**RESUME, "experience": [{**RESUME["experience"][0],
+                                        "bullets": ["Cut costs by 30%.", "Served 5,000+ users."]}]}
+    draft = {**RESUME, "experience": [{**RESUME["experience"][0], "startDate": "2023-06-01"}]}
+
+    with patch("agents.proofread_agent.chat_json") as chat:
+        audit = proofread_resume(draft, "Python developer", master_resume=_master_file(tmp_path, master))
+
+    chat.assert_not_called()
+    assert not audit["content_passed"]
+    assert "at least 2 bullet points" in audit["feedback"]
+    assert "5000" in audit["feedback"]
+    assert "2023-06-01" in audit["feedback"]
+
+
+def test_clean_draft_with_full_keyword_coverage_still_gets_llm_audit(tmp_path):
+    """
+    Scenario: A draft with no mechanical issues covers every JD skill the candidate has.
+    Expected: Keyword coverage alone doesn't approve it; the LLM's verdict is used.
+    """
+    llm_answer = {"content_passed": False, "missing_keywords": [], "feedback": "Bullet 1 is ungrammatical."}
+    with patch("agents.proofread_agent.chat_json", return_value=llm_answer) as chat, \
+         patch("agents.proofread_agent._missing_openai_key", return_value=False):
+        audit = proofread_resume(RESUME, "Python and Django role", master_resume=_master_file(tmp_path, RESUME))
+
+    chat.assert_called_once()
+    assert not audit["content_passed"]
+    assert audit["feedback"] == "Bullet 1 is ungrammatical."
+
+
+def test_partial_keyword_coverage_escalates_to_llm(tmp_path):
+    master = {**RESUME, "skills": {**RESUME["skills"], "tools": ["Docker", "Kubernetes"]}}
+    llm_answer = {"content_passed": True, "missing_keywords": [], "feedback": "ok"}
+    with patch("agents.proofread_agent.chat_json", return_value=llm_answer) as chat, \
+         patch("agents.proofread_agent._missing_openai_key", return_value=False):
+        proofread_resume(RESUME, "Python, Django, Docker, Kubernetes", master_resume=_master_file(tmp_path, master))
+
+    chat.assert_called_once()
+
+
+def test_two_roles_at_one_company_are_separate_entries(tmp_path):
+    """
+    Scenario: The master has two Acme roles and one Globex role; the draft is identical,
+              except the later Acme role drops a bullet.
+    Expected: Three entries are counted; only the later Acme role is flagged for bullets.
+    """
+    def role(company, position, start, bullets):
+        return {"company": company, "position": position, "startDate": start, "endDate": "Present",
+                "location": "Remote", "bullets": bullets}
+
+    master = {**RESUME, "experience": [
+        role("Acme", "Engineer", "Jan 2024", ["Shipped 3 services.", "Cut latency 40%."]),
+        role("Acme", "Intern", "Jun 2023", ["Wrote tests."]),
+        role("Globex", "Intern", "Jun 2022", ["Built dashboards."]),
+    ]}
+    llm_answer = {"content_passed": True, "missing_keywords": [], "feedback": "Good."}
+    with patch("agents.proofread_agent.chat_json", return_value=llm_answer), \
+         patch("agents.proofread_agent._missing_openai_key", return_value=False):
+        identical = proofread_resume(master, "Python and Django role", master_resume=_master_file(tmp_path, master))
+    assert identical["feedback"] == "Good."
+
+    draft = {**master, "experience": [
+        role("Acme", "Engineer", "Jan 2024", ["Shipped 3 services."]),
+        *master["experience"][1:],
+    ]}
+    with patch("agents.proofread_agent.chat_json") as chat:
+        audit = proofread_resume(draft, "Python and Django role", master_resume=_master_file(tmp_path, master))
+
+    chat.assert_not_called()
+    assert "experience entries" not in audit["feedback"]
+    assert "'Acme - Engineer' needs at least 2 bullet points (has 1)." in audit["feedback"]
+    assert "'Acme - Intern'" not in audit["feedback"]
+    assert "40" in audit["feedback"]
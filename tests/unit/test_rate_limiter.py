@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from utils.rate_limiter import DEFAULT_SITE_LIMITS, SiteRateLimiter, site_for_url
+
+
+def test_site_for_url_maps_known_hosts():
+    assert site_for_url("https://www.linkedin.com/jobs/view/123") == "linkedin"
+    assert site_for_url("https://www.indeed.com/viewjob?jk=1") == "indeed"
+    assert site_for_url("https://careers.example.com/job/1") == "default"
+
+
+def test_exhausted_site_waits_without_blocking_other_sites():
+    """
+    Scenario: LinkedIn's burst is used up while Indeed still has budget.
+    Expected: The LinkedIn call sleeps; the Indeed call goes through immediately.
+    """
+    limiter = SiteRateLimiter({"linkedin": [10, 1], "indeed": [10, 1]})
+
+    async def run():
+        await limiter.wait("linkedin")  # Uses the only token
+        start = time.monotonic()
+        slow = asyncio.create_task(limiter.wait("linkedin"))
+        await limiter.wait("indeed")
+        indeed_elapsed = time.monotonic() - start
+        await slow
+        return indeed_elapsed, time.monotonic() - start
+
+    indeed_elapsed, linkedin_elapsed = asyncio.run(run())
+    assert indeed_elapsed < 0.05
+    assert linkedin_elapsed >= 0.08
+    assert limiter.waited["linkedin"] > 0
+
+
+def test_configure_drops_overrides_from_a_previous_profile():
+    """
+    Scenario: One profile throttles LinkedIn, the next run in the same process sets no limits.
+    Expected: The second run is back on the defaults, with no bucket left over from the first.
+    """
+    limiter = SiteRateLimiter({"linkedin": [0.01, 1], "custom": [1, 1]})
+    limiter.acquire("linkedin")
+
+    limiter.configure({"indeed": [5, 5]})
+    assert limiter.limits["linkedin"] == DEFAULT_SITE_LIMITS["linkedin"]
+    assert "custom" not in limiter.limits
+    assert limiter.limits["indeed"] == (5.0, 5)
+
+    limiter.configure(None)
+    assert limiter.limits == DEFAULT_SITE_LIMITS
+    limiter.acquire("linkedin")
+    assert "linkedin" not in limiter.waited
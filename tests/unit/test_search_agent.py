@@ -0,0 +1,324 @@
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pandas as pd
+
+from agents.search_agent import PageFetchStats, ResourcePolicy, ScrapeSession, fetch_job_page_data, search_jobs
+
+DESC = "Build and maintain Python services. " * 5
+
+
+def test_scrapes_fan_out_per_site_and_job_type_with_isolated_failures():
+    """
+    Scenario: 2 job types x 3 sites; glassdoor always fails and each scrape takes 0.2s.
+    Expected: Scrapes overlap in time, the other sites' results survive, duplicates collapse.
+    """
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_scrape_jobs(site_name, job_type, **kwargs):
+        site = site_name[0]
+        with lock:
+            active.append(site)
+            peak.append(len(active))
+        time.sleep(0.2)
+        with lock:
+            active.remove(site)
+        if site == "glassdoor":
+            raise RuntimeError("blocked")
+        return pd.DataFrame([{
+            "title": f"Engineer {site}", "company": "Acme",
+            "job_url": f"https://{site}.com/job/1", "description": DESC,
+        }])
+
+    with patch("agents.search_agent.scrape_jobs", side_effect=fake_scrape_jobs), \
+         patch("agents.search_agent.site_rate_limiter.acquire"):
+        started = time.monotonic()
+        failed_sites = set()
+        jobs = search_jobs("Engineer", "NY", 5, sites=["linkedin", "indeed", "glassdoor"],
+                           job_type=["fulltime", "internship"], scrape_workers=6, failed_sites=failed_sites)
+        elapsed = time.monotonic() - started
+
+    assert sorted(job["url"] for job in jobs) == ["https://indeed.com/job/1", "https://linkedin.com/job/1"]
+    assert max(peak) > 1
+    assert elapsed < 6 * 0.2
+    assert failed_sites == {"glassdoor"}
+
+
+def test_scrape_session_serves_batches_from_one_cached_window(tmp_path):
+    """
+    Scenario: Three 5-job batches are requested with a 12-result window; then a new session starts.
+    Expected: Two bulk scrapes in total, no repeated URLs, and the second session replays the disk cache.
+    """
+    windows = {
+        0: [{"title": "T", "company": "C", "url": f"https://x.com/{i}", "description": DESC} for i in range(12)],
+        # Overlapping page: the first two URLs were already served
+        12: [{"title": "T", "company": "C", "url": f"https://x.com/{i}", "description": DESC} for i in range(10, 20)],
+    }
+
+    def fake_search_jobs(role, location, num_results, offset=0, **kwargs):
+        return windows.get(offset, [])
+
+    with patch("agents.search_agent.search_jobs", side_effect=fake_search_jobs) as search:
+        session = ScrapeSession("Engineer", "NY", sites=["linkedin"], window=12, cache_dir=str(tmp_path), job_type=["fulltime"])
+        batches = [session.next_batch(5) for _ in range(3)]
+        assert search.call_count == 2
+
+        urls = [job["url"] for batch in batches for job in batch]
+        assert len(urls) == len(set(urls)) == 15
+
+        replay = ScrapeSession("Engineer", "NY", sites=["linkedin"], window=12, cache_dir=str(tmp_path), job_type=["fulltime"])
+        assert [job["url"] for job in replay.next_batch(5)] == urls[:5]
+        assert search.call_count == 2
+        assert replay.cache_hits == 1
+
+
+def test_scrape_session_does_not_cache_partial_or_empty_windows(tmp_path):
+    """
+    Scenario: The first scrape of the day has indeed blocked, the second comes back empty
+              (e.g. a timeout); a rerun later that day succeeds.
+    Expected: Neither bad window is cached, so the rerun scrapes again and caches the good one.
+    """
+    job = {"title": "T", "company": "C", "url": "https://x.com/1", "description": DESC}
+    outcomes = [([job], {"indeed"}), ([], set()), ([job], set())]
+
+    def fake_search_jobs(role, location, num_results, offset=0, failed_sites=None, **kwargs):
+        jobs, failed = outcomes.pop(0)
+        failed_sites.update(failed)
+        return jobs
+
+    def session():
+        return ScrapeSession("Engineer", "NY", sites=["linkedin", "indeed"], window=12, cache_dir=str(tmp_path))
+
+    with patch("agents.search_agent.search_jobs", side_effect=fake_search_jobs) as search:
+        assert len(session().next_batch(1)) == 1
+        assert session().next_batch(1) == []
+        assert len(session().next_batch(1)) == 1
+        assert search.call_count == 3
+
+        replay = session()
+        assert len(replay.next_batch(1)) == 1
+        assert search.call_count == 3
+        assert replay.cache_hits == 1
+
+
+def _job_page(posting=None, title="", description=""):
+    ld = f'<script type="application/ld+json">{json.dumps(posting)}</script>' if posting else ""
+    desc = f'<div class="description__text">{description}</div>' if description else ""
+    return f"<html><head><title>{title}</title>{ld}</head><body>{desc}</body></html>"
+
+
+def _fetch_with_pages(pages, rendered, page_cache=None):
+    """Runs fetch_job_page_data for every URL in `pages` against a mocked HTTP transport."""
+    def handler(request):
+        status, html = pages[str(request.url)]
+        return httpx.Response(status, text=html)
+
+    stats = PageFetchStats()
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("agents.search_agent._page_http_client", return_value=client), \
+             patch("agents.search_agent._fetch_rendered_page", new=AsyncMock(side_effect=rendered)) as browser, \
+             patch("agents.search_agent.site_rate_limiter.wait", new=AsyncMock()), \
+             patch("agents.search_agent.page_fetch_stats", stats), \
+             patch("agents.search_agent.get_page_cache", return_value=page_cache):
+            results = [await fetch_job_page_data(url) for url in pages]
+        await client.aclose()
+        return results, browser
+
+    results, browser = asyncio.run(run())
+    return results, browser, stats
+
+
+def test_static_html_is_used_before_the_browser():
+    """
+    Scenario: One page has JSON-LD + description in its HTML, one has only a title regex
+              match and a description, one is a login wall that needs the browser.
+    Expected: Only the login wall escalates to Chromium; tiers are counted per page.
+    """
+    pages = {
+        "https://www.linkedin.com/jobs/view/1": (200, _job_page(
+            posting={"title": "Backend Engineer", "hiringOrganization": {"name": "Acme"}},
+            description=DESC,
+        )),
+        "https://www.linkedin.com/jobs/view/2": (200, _job_page(
+            title="Globex hiring Data Engineer in Austin, TX | LinkedIn", description=DESC,
+        )),
+        "https://www.linkedin.com/jobs/view/3": (200, _job_page(title="Sign Up | LinkedIn")),
+    }
+
+    async def rendered(url, browser_pool=None):
+        return {"title": "Platform Engineer", "company": "Initech", "description": DESC}
+
+    results, browser, stats = _fetch_with_pages(pages, rendered)
+
+    assert [r["tier"] for r in results] == ["http", "http", "browser"]
+    assert (results[0]["title"], results[0]["company"]) == ("Backend Engineer", "Acme")
+    assert (results[1]["title"], results[1]["company"]) == ("Data Engineer", "Globex")
+    assert results[0]["description"].startswith("Build and maintain")
+    browser.assert_awaited_once()
+    assert stats.counts == {"cache": 0, "http": 2, "browser": 1, "incomplete": 0}
+
+
+def test_browser_result_keeps_partial_static_data():
+    """
+    Scenario: The static page has JSON-LD but no description (and one URL returns 429);
+              the browser finds a description but no metadata.
+    Expected: Static title/company are merged into the browser result; the 429 page ends incomplete.
+    """
+    pages = {
+        "https://www.linkedin.com/jobs/view/1": (200, _job_page(
+            posting={"title": "Backend Engineer", "hiringOrganization": "Acme"},
+        )),
+        "https://www.linkedin.com/jobs/view/2": (429, ""),
+    }
+
+    async def rendered(url, browser_pool=None):
+        return {"title": None, "company": None, "status": None,
+                "description": DESC if url.endswith("/1") else ""}
+
+    results, browser, stats = _fetch_with_pages(pages, rendered)
+
+    assert {key: results[0][key] for key in ("title", "company", "description", "status", "tier")} == {
+        "title": "Backend Engineer", "company": "Acme", "description": DESC, "status": 200, "tier": "browser",
+    }
+    assert results[0]["bytes"] > 0
+    assert results[1]["status"] == 429
+    assert browser.await_count == 2
+    assert stats.counts == {"cache": 0, "http": 0, "browser": 1, "incomplete": 1}
+    assert stats.hit_rates()["browser"] == 0.5
+
+
+class _FakeRequest:
+    def __init__(self, url, resource_type, body_size):
+        self.url = url
+        self.resource_type = resource_type
+        self.body_size = body_size
+
+    async def sizes(self):
+        return {"requestHeadersSize": 100, "requestBodySize": 0,
+                "responseHeadersSize": 200, "responseBodySize": self.body_size}
+
+
+class _FakeRoute:
+    def __init__(self, request, outcomes):
+        self.request = request
+        self.outcomes = outcomes
+
+    async def continue_(self):
+        self.outcomes[self.request.url] = "loaded"
+
+    async def abort(self):
+        self.outcomes[self.request.url] = "aborted"
+
+
+class _FakePage:
+    """Replays a fixed set of sub-requests through the context's route handler on goto."""
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.outcomes = {}
+        self.context = self
+        self._route = None
+        self._finished = []
+
+    async def route(self, pattern, handler):
+        self._route = handler
+
+    def on(self, event, handler):
+        self._finished.append(handler)
+
+    async def goto(self, url, **kwargs):
+        for request in self.requests:
+            await self._route(_FakeRoute(request, self.outcomes))
+            if self.outcomes[request.url] == "loaded":
+                for handler in self._finished:
+                    handler(request)
+        return type("Response", (), {"status": 200})()
+
+    async def query_selector(self, selector):
+        return None
+
+    async def title(self):
+        return "Backend Engineer at Acme | LinkedIn"
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return None
+
+    async def inner_text(self, selector):
+        return DESC
+
+
+def test_browser_tier_blocks_heavy_and_tracking_requests():
+    """
+    Scenario: A LinkedIn page pulls an image, a font, a script, an analytics beacon and a CSS file
+              under the default policy.
+    Expected: Only the document and first-party script load; bytes count just what loaded.
+    """
+    requests = [
+        _FakeRequest("https://www.linkedin.com/jobs/view/1", "document", 50_000),
+        _FakeRequest("https://static.licdn.com/logo.png", "image", 80_000),
+        _FakeRequest("https://static.licdn.com/font.woff2", "font", 40_000),
+        _FakeRequest("https://static.licdn.com/app.js", "script", 30_000),
+        _FakeRequest("https://www.google-analytics.com/collect.js", "script", 20_000),
+        _FakeRequest("https://static.licdn.com/site.css", "stylesheet", 10_000),
+    ]
+    page = _FakePage(requests)
+
+    @asynccontextmanager
+    async def fake_open_page(browser_pool=None, **kwargs):
+        yield page
+
+    stats = PageFetchStats()
+    with patch("agents.search_agent.open_page", fake_open_page), \
+         patch("agents.search_agent.scrape_resource_policy", ResourcePolicy()), \
+         patch("agents.search_agent.site_rate_limiter.wait", new=AsyncMock()), \
+         patch("agents.search_agent.get_page_cache", return_value=None), \
+         patch("agents.search_agent.page_fetch_stats", stats):
+        data = asyncio.run(fetch_job_page_data("https://www.linkedin.com/jobs/view/1", static_first=False))
+
+    loaded = [url for url, outcome in page.outcomes.items() if outcome == "loaded"]
+    assert loaded == ["https://www.linkedin.com/jobs/view/1", "https://static.licdn.com/app.js"]
+    assert data["blocked_requests"] == 4
+    assert data["bytes"] == 50_000 + 30_000 + 2 * 300
+    assert (data["title"], data["company"], data["tier"]) == ("Backend Engineer", "Acme", "browser")
+    assert data["description"] == DESC
+    assert stats.loads[0][:3] == ("https://www.linkedin.com/jobs/view/1", "browser", data["bytes"])
+    assert "browser avg 79 KB" in stats.load_summary()
+
+
+def test_browser_fallback_spends_one_rate_limit_token_per_url():
+    """
+    Scenario: The static fetch of a LinkedIn page comes back as a login wall and Chromium takes over.
+    Expected: The site's rate limiter is waited on once for the URL, not once per tier.
+    """
+    page = _FakePage([_FakeRequest("https://www.linkedin.com/jobs/view/1", "document", 50_000)])
+
+    @asynccontextmanager
+    async def fake_open_page(browser_pool=None, **kwargs):
+        yield page
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text=_job_page(title="Sign Up | LinkedIn"))
+        ))
+        with patch("agents.search_agent.open_page", fake_open_page), \
+             patch("agents.search_agent._page_http_client", return_value=client), \
+             patch("agents.search_agent.site_rate_limiter.wait", new=AsyncMock()) as limiter_wait, \
+             patch("agents.search_agent.get_page_cache", return_value=None), \
+             patch("agents.search_agent.page_fetch_stats", PageFetchStats()):
+            data = await fetch_job_page_data("https://www.linkedin.com/jobs/view/1")
+        await client.aclose()
+        return data, limiter_wait
+
+    data, limiter_wait = asyncio.run(run())
+
+    assert data["tier"] == "browser"
+    limiter_wait.assert_awaited_once_with("linkedin")
@@ -0,0 +1,105 @@
+import json
+from unittest.mock import patch
+
+from agents.tailor_agent import ResumePatch, _build_prompts, retailor_resume, select_relevant_resume
+from services.master_resume import get_master_resume
+from utils.relevance import BM25, estimate_tokens
+
+
+def _master(tmp_path):
+    filler = "Collaborated with stakeholders across several teams on planning and delivery " * 3
+    projects = [
+        {"name": f"Project {i}", "technologies": [tech], "description": "", "bullets": [
+            f"Built the {tech} service end to end.", filler, filler, f"Cut latency by {10 + i}%.",
+        ]}
+        for i, tech in enumerate(["Unity", "Kubernetes", "React", "Django", "Rust", "Flutter"])
+    ]
+    path = tmp_path / "master_resume.json"
+    path.write_text(json.dumps({
+        "basics": {"name": "A"},
+        "skills": {"languages": ["Python"]},
+        "experience": [{"company": "Acme", "position": "Intern", "bullets": ["Wrote Python tools."]}],
+        "projects": projects,
+    }))
+    return get_master_resume(str(path))
+
+
+def test_bm25_prefers_documents_with_query_terms():
+    scores = BM25([["python", "django"], ["unity", "c#"], ["python"]]).scores(["django", "python"])
+    assert scores[0] > scores[2] > scores[1] == 0
+
+
+def test_relevant_sections_fit_budget_and_keep_metrics(tmp_path):
+    """
+    Scenario: Six long projects, a Django/React JD and a tight token budget.
+    Expected: The matching projects are kept, the prompt shrinks under budget, metric bullets survive.
+    """
+    master = _master(tmp_path)
+    jd = "Junior web developer: Django REST APIs and React front-end."
+    budget = estimate_tokens(master.prompt_json) // 2
+
+    slim = select_relevant_resume(master, jd, token_budget=budget)
+    names = [p["name"] for p in slim["projects"]]
+
+    assert "Project 2" in names and "Project 3" in names
+    assert len(names) >= 3
+    assert estimate_tokens(json.dumps(slim)) <= budget
+    for project in slim["projects"]:
+        assert any("%" in bullet for bullet in project["bullets"])
+        assert len(project["bullets"]) >= 2
+
+    _, _, (full_tokens, sent_tokens) = _build_prompts(master, jd, token_budget=budget)
+    assert sent_tokens < full_tokens
+    assert select_relevant_resume(master, jd, token_budget=0) is master.data
+
+
+def test_only_pinned_entry_names_are_always_kept(tmp_path):
+    """
+    Scenario: Off-topic projects renamed to a pinned entry name and to a word the prompt happens to use.
+    Expected: The pinned one survives the budget; the other is kept or dropped exactly as under its own name.
+    """
+    jd = "Junior web developer: Django REST APIs and React front-end."
+
+    def kept(renames):
+        data = _master(tmp_path).data
+        for index, name in renames.items():
+            data["projects"][index]["name"] = name
+        path = tmp_path / f"resume_{len(list(tmp_path.iterdir()))}.json"
+        path.write_text(json.dumps(data))
+        master = get_master_resume(str(path))
+        slim = select_relevant_resume(master, jd, token_budget=estimate_tokens(master.prompt_json) // 2)
+        return [p["name"] for p in slim["projects"]]
+
+    assert "Project 1" not in kept({})
+    baseline = kept({1: "Ekings Multimedia"})
+    assert "Ekings Multimedia" in baseline
+    assert kept({1: "Ekings Multimedia", 0: "Resume", 4: "Check", 5: "Master"}) == [
+        {"Project 0": "Resume", "Project 4": "Check", "Project 5": "Master"}.get(name, name) for name in baseline
+    ]
+
+
+def test_patch_retry_merges_only_changed_sections(tmp_path):
+    """
+    Scenario: A retry returns a new skills section and nulls for everything else.
+    Expected: Only skills change; the merged resume still validates.
+    """
+    master = _master(tmp_path)
+    previous = {
+        "basics": {"name": "A", "email": "a@x.com", "phone": "1", "location": "NY",
+                   "website": "", "linkedin": "", "github": ""},
+        "education": [],
+        "skills": {"languages": ["Python"], "frameworks": [], "tools": []},
+        "experience": [{"company": "Acme", "position": "Intern", "startDate": "Jun 2024",
+                        "endDate": "Aug 2024", "location": "Remote", "bullets": ["Wrote Python tools."]}],
+        "projects": [],
+    }
+    patch_response = {"skills": {"languages": ["Python"], "frameworks": ["Django"], "tools": []},
+                      "basics": None, "education": None, "experience": None, "projects": None}
+
+    with patch("agents.tailor_agent.chat_json", return_value=patch_response) as chat:
+        revised = retailor_resume(previous, master, "Django role", "Mention Django.")
+
+    assert chat.call_args.kwargs["schema"] is ResumePatch
+    assert "Mention Django." in chat.call_args.kwargs["user_prompt"]
+    assert revised["skills"]["frameworks"] == ["Django"]
+    assert revised["experience"] == previous["experience"]
@@ -1,10 +1,10 @@
-import json
 import os
 import time
 
 import pandas as pd
 import streamlit as st
 
+from main import get_history_store
 from ui.utils import get_clean_filename
 
 
@@ -16,15 +16,12 @@ def render_history_tab():
     output_dir = os.path.join("output", today_str)
 
     drive_map = {}
-    if os.path.exists("history.json"):
-        try:
-            with open("history.json", "r") as f:
-                hist_data = json.load(f)
-                for h in hist_data:
-                    if h.get("drive_link"):
-                        drive_map[h["url"]] = h["drive_link"]
-        except Exception:
-            pass
+    try:
+        for h in get_history_store().all():
+            if h.get("drive_link"):
+                drive_map[h["url"]] = h["drive_link"]
+    except Exception:
+        pass
 
     if os.path.exists(csv_path) and os.path.exists(output_dir):
         df = pd.read_csv(csv_path)
@@ -95,6 +95,25 @@ def render_runner_tab(resume_exists, config, inputs, current_profile_path):
                     "enable_drive": config.get("enable_drive", False),
                     "use_email": config.get("use_email", False),
                     "email_max_results": config.get("email_max_results", 10),
+                    "browser_pool_size": config.get("browser_pool_size", 1),
+                    "browser_contexts_per_browser": config.get("browser_contexts_per_browser", 4),
+                    "browser_recycle_after": config.get("browser_recycle_after", 50),
+                    "pipeline_concurrency": config.get("pipeline_concurrency", {}),
+                    "pipeline_queue_size": config.get("pipeline_queue_size", 2),
+                    "filter_batch_size": config.get("filter_batch_size", 5),
+                    "filter_batch_wait": config.get("filter_batch_wait", 2.0),
+                    "local_prefilter": config.get("local_prefilter", True),
+                    "tailor_token_budget": config.get("tailor_token_budget", 2500),
+                    "llm_streaming": config.get("llm_streaming", True),
+                    "tailor_patch_mode": config.get("tailor_patch_mode", True),
+                    "scrape_workers": config.get("scrape_workers", 4),
+                    "scrape_window": config.get("scrape_window", 50),
+                    "scrape_cache": config.get("scrape_cache", True),
+                    "email_enrich_concurrency": config.get("email_enrich_concurrency", 3),
+                    "rate_limits": config.get("rate_limits", {}),
+                    "resource_allowlist": config.get("resource_allowlist", {}),
+                    "llm_cache": config.get("llm_cache", {}),
+                    "page_cache": config.get("page_cache", {}),
                 }
 
                 llm_settings = {
@@ -0,0 +1,118 @@
+import asyncio
+import traceback
+
+
+class Stage:
+    def __init__(self, name, handler, concurrency=1, batch_size=1, batch_wait=0.0):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency or 1))
+        self.batch_size = max(1, int(batch_size or 1))
+        self.batch_wait = batch_wait
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of async stages connected by bounded queues.
+
+    Each stage has its own worker count. A handler returns the item to pass on
+    to the next stage, or None to drop it. Batch stages (batch_size > 1) receive
+    a list of up to batch_size items, waiting at most batch_wait seconds for the
+    batch to fill, and return a list of the same length. stop() cancels the
+    feeder and every in-flight handler (used once the run target is met).
+    """
+
+    def __init__(self, queue_size=4, on_error=None):
+        self.queue_size = max(1, queue_size)
+        self.on_error = on_error
+        self.stages = []
+        self._driver = None
+        self._stopped = False
+
+    def add_stage(self, name, handler, concurrency=1, batch_size=1, batch_wait=0.0):
+        self.stages.append(Stage(name, handler, concurrency, batch_size, batch_wait))
+        return self
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def stop(self):
+        self._stopped = True
+        if self._driver is not None:
+            self._driver.cancel()
+
+    async def _next_batch(self, stage, inbox):
+        batch = [await inbox.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    batch.append(inbox.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(inbox.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return batch
+
+    async def _worker(self, index, queues):
+        stage = self.stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(queues) else None
+        while True:
+            if stage.batch_size > 1:
+                items = await self._next_batch(stage, inbox)
+            else:
+                items = [await inbox.get()]
+            try:
+                if stage.batch_size > 1:
+                    results = await stage.handler(items)
+                else:
+                    results = [await stage.handler(items[0])]
+                for result in results:
+                    if result is not None and outbox is not None:
+                        await outbox.put(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # One bad job must not take the whole run down
+                for item in items:
+                    if self.on_error:
+                        self.on_error(stage.name, item, e)
+                    else:
+                        traceback.print_exc()
+            finally:
+                for _ in items:
+                    inbox.task_done()
+
+    async def _drive(self, source, queues):
+        async for item in source:
+            await queues[0].put(item)
+        # Items only move forward, so joining the queues in order drains the chain
+        for queue in queues:
+            await queue.join()
+
+    async def run(self, source):
+        """Feeds every item from the async iterable `source` through all stages."""
+        # A batch stage's inbox must be able to hold a full batch
+        queues = [asyncio.Queue(maxsize=max(self.queue_size, stage.batch_size)) for stage in self.stages]
+        workers = [
+            asyncio.create_task(self._worker(index, queues))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.concurrency)
+        ]
+        self._driver = asyncio.create_task(self._drive(source, queues))
+        try:
+            await self._driver
+        except asyncio.CancelledError:
+            if not self._stopped:
+                raise
+        finally:
+            self._driver.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if hasattr(source, "aclose"):
+                await source.aclose()
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+# (requests per second, burst size) per job site
+DEFAULT_SITE_LIMITS = {
+    "linkedin": (0.5, 2),
+    "indeed": (1.0, 3),
+    "glassdoor": (0.5, 2),
+    "zip_recruiter": (0.5, 2),
+    "google": (1.0, 2),
+    "default": (1.0, 2),
+}
+
+# Hostname fragment -> site key used by jobspy
+SITE_HOSTS = {
+    "linkedin.": "linkedin",
+    "indeed.": "indeed",
+    "glassdoor.": "glassdoor",
+    "ziprecruiter.": "zip_recruiter",
+    "google.": "google",
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. A caller reserves a token immediately and is told
+    how long to wait for it, so async callers can sleep without holding the lock.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class SiteRateLimiter:
+    """Per-site token buckets shared by search_jobs (threads) and fetch_job_page_data (event loop)."""
+
+    def __init__(self, limits: Optional[dict] = None):
+        self.limits = dict(DEFAULT_SITE_LIMITS)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.waited = {}
+        if limits:
+            self.configure(limits)
+
+    def configure(self, limits: Optional[dict]):
+        """
+        Applies a profile's limits, e.g. {"linkedin": [0.25, 1]}, on top of
+        DEFAULT_SITE_LIMITS; overrides from an earlier run are dropped and all buckets reset.
+        """
+        with self._lock:
+            self.limits = dict(DEFAULT_SITE_LIMITS)
+            self._buckets = {}
+            for site, (rate, burst) in (limits or {}).items():
+                self.limits[site] = (float(rate), int(burst))
+
+    def reset_stats(self):
+        with self._lock:
+            self.waited = {}
+
+    def _bucket(self, site: str) -> TokenBucket:
+        site = site if site in self.limits else "default"
+        with self._lock:
+            if site not in self._buckets:
+                self._buckets[site] = TokenBucket(*self.limits[site])
+            return self._buckets[site]
+
+    def _record_wait(self, site, delay):
+        if delay > 0:
+            with self._lock:
+                self.waited[site] = self.waited.get(site, 0.0) + delay
+
+    def acquire(self, site: str):
+        """Blocking wait; only call from worker threads (e.g. jobspy scrapes)."""
+        delay = self._bucket(site).reserve()
+        self._record_wait(site, delay)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait(self, site: str):
+        """Non-blocking wait for the event loop; other sites keep running."""
+        delay = self._bucket(site).reserve()
+        self._record_wait(site, delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def site_for_url(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    for fragment, site in SITE_HOSTS.items():
+        if fragment in host:
+            return site
+    return "default"
+
+
+# Shared by every agent in the process; run_daily_workflow applies profile overrides
+site_rate_limiter = SiteRateLimiter()
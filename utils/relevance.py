@@ -0,0 +1,49 @@
+import math
+import re
+from collections import Counter
+
+
+def estimate_tokens(text) -> int:
+    """Rough LLM token count (~4 characters per token for English/JSON)."""
+    return (len(str(text or "")) + 3) // 4
+
+
+def mentioned_terms(text, terms) -> set:
+    """Terms (lower-cased skill names) that occur in `text` as whole words."""
+    text = str(text or "").lower()
+    return {
+        term for term in terms
+        if re.search(r"(?<![\w+#.])" + re.escape(term) + r"(?![\w+#])", text)
+    }
+
+
+class BM25:
+    """Okapi BM25 over pre-tokenized documents."""
+
+    def __init__(self, documents, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokens) for tokens in documents]
+        self.lengths = [len(tokens) for tokens in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freq = Counter()
+        for freqs in self.term_freqs:
+            doc_freq.update(freqs.keys())
+        count = len(self.term_freqs)
+        self.idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def scores(self, query_tokens) -> list:
+        query = set(query_tokens)
+        results = []
+        for freqs, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in query:
+                tf = freqs.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
@@ -0,0 +1,50 @@
+import re
+from urllib.parse import unquote, urlencode, urlparse, parse_qs, parse_qsl
+
+# LinkedIn job pages: /jobs/view/<id> or /jobs/view/<slug>-<id>
+LINKEDIN_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/?#]*?-)?(\d+)")
+# Query parameters that only track the click, never identify the posting
+TRACKING_PARAMS = {"refid", "trackingid", "trk", "trkinfo", "fbclid", "gclid"}
+
+
+def clean_url(url):
+    """
+    Unwraps security redirects AND fixes LinkedIn specific paths.
+    """
+    # 1. Handle Proofpoint (urldefense)
+    if "urldefense.proofpoint.com" in url:
+        parsed = urlparse(url)
+        query_params = parse_qs(parsed.query)
+        if 'u' in query_params:
+            encoded_url = query_params['u'][0]
+            decoded = encoded_url.replace('-', '%').replace('_', '/')
+            url = unquote(decoded)
+
+    # 2. Fix LinkedIn "/comm/" links to allow Guest Access
+    # Transforms: linkedin.com/comm/jobs/view/123 -> linkedin.com/jobs/view/123
+    if "/comm/jobs/view/" in url:
+        url = url.replace("/comm/jobs/view/", "/jobs/view/")
+
+    return url
+
+
+def canonical_job_url(url):
+    """
+    One key per job posting: redirects unwrapped, fragment and tracking
+    parameters dropped (the rest of the query kept, sorted), host lower-cased
+    and LinkedIn slugs reduced to the numeric id.
+    """
+    parsed = urlparse(clean_url(str(url or "")).strip())
+    host = (parsed.hostname or "").lower()
+    if "linkedin." in host:
+        match = LINKEDIN_JOB_ID_RE.search(parsed.path)
+        if match:
+            return f"https://www.linkedin.com/jobs/view/{match.group(1)}"
+    path = parsed.path.rstrip("/") or "/"
+    # Other boards identify postings in the query (Indeed ?jk=, Glassdoor ?jl=, Greenhouse ?gh_jid=)
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{parsed.scheme or 'https'}://{host}{path}{query}"